@@ -0,0 +1,140 @@
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+from collections import Counter, deque
+from datetime import datetime
+
+
+class RegistroAuditoria:
+    """Registro de auditoria com janela fixa em memória e gravação em segundo plano
+
+    As últimas `capacidade` entradas ficam num deque (anel) para consulta
+    rápida; contadores por ação cobrem toda a vida do processo. A gravação em
+    disco é feita por uma thread que drena uma fila em lotes e acrescenta
+    linhas JSONL ao arquivo, rotacionando-o ao passar de `max_bytes`
+    (auditoria.jsonl -> auditoria.jsonl.1 -> ...). `registrar` nunca faz E/S:
+    é seguro chamá-lo direto do event loop.
+    """
+
+    def __init__(self, caminho=None, capacidade=None):
+        self.caminho = caminho or os.getenv(
+            "BEMTEVI_AUDIT_PATH", os.path.join(os.getcwd(), "cache", "auditoria.jsonl")
+        )
+        self.capacidade = capacidade or int(os.getenv("BEMTEVI_AUDIT_CAPACIDADE", "1000"))
+        self.max_bytes = int(os.getenv("BEMTEVI_AUDIT_MAX_BYTES", str(10 * 1024 * 1024)))
+        self.arquivos = int(os.getenv("BEMTEVI_AUDIT_ARQUIVOS", "5"))
+        self.intervalo = float(os.getenv("BEMTEVI_AUDIT_INTERVALO", "1.0"))
+        self.tamanho_lote = int(os.getenv("BEMTEVI_AUDIT_LOTE", "200"))
+        self.stderr = os.getenv("BEMTEVI_AUDIT_STDERR", "1") == "1"
+        self.logger = logging.getLogger(__name__)
+
+        self._recentes = deque(maxlen=self.capacidade)
+        self._por_acao = Counter()
+        self._lock = threading.Lock()
+        self._fila = queue.Queue(maxsize=int(os.getenv("BEMTEVI_AUDIT_FILA", "10000")))
+        self._thread = None
+        self._parar = threading.Event()
+        self.total = 0
+        self.gravadas = 0
+        self.descartadas = 0
+        self.erros_gravacao = 0
+
+    def registrar(self, acao, dados):
+        """Registrar uma ação (memória + fila de gravação; sem E/S no chamador)"""
+        entrada = {"timestamp": datetime.now().isoformat(), "action": acao, "data": dados}
+        with self._lock:
+            self._recentes.append(entrada)
+            self._por_acao[acao] += 1
+            self.total += 1
+        try:
+            self._fila.put_nowait(entrada)
+        except queue.Full:
+            self.descartadas += 1  # Disco lento: a janela em memória continua completa
+        self._garantir_gravador()
+        return entrada
+
+    def recentes(self, quantidade=10, acao=None):
+        """Últimas entradas (mais recentes primeiro), opcionalmente de uma ação"""
+        with self._lock:
+            itens = list(self._recentes)
+        if acao:
+            itens = [item for item in itens if item["action"] == acao]
+        return itens[::-1][:quantidade]
+
+    def contagem(self):
+        """Total de registros por ação desde o início do processo"""
+        with self._lock:
+            return dict(self._por_acao.most_common())
+
+    def status(self):
+        with self._lock:
+            na_janela = len(self._recentes)
+        return {
+            "total": self.total,
+            "na_janela": na_janela,
+            "capacidade": self.capacidade,
+            "pendentes": self._fila.qsize(),
+            "gravadas": self.gravadas,
+            "descartadas": self.descartadas,
+            "erros_gravacao": self.erros_gravacao,
+            "caminho": self.caminho,
+        }
+
+    def _garantir_gravador(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._gravar_continuamente, name="auditoria", daemon=True)
+                    self._thread.start()
+
+    def _drenar_lote(self):
+        """Esperar até `intervalo` pela primeira entrada e juntar as seguintes sem bloquear"""
+        try:
+            lote = [self._fila.get(timeout=self.intervalo)]
+        except queue.Empty:
+            return []
+        while len(lote) < self.tamanho_lote:
+            try:
+                lote.append(self._fila.get_nowait())
+            except queue.Empty:
+                break
+        return lote
+
+    def _gravar_continuamente(self):
+        while not self._parar.is_set() or not self._fila.empty():
+            lote = self._drenar_lote()
+            if lote:
+                self._gravar(lote)
+
+    def _rotacionar(self):
+        for indice in range(self.arquivos - 1, 0, -1):
+            origem = f"{self.caminho}.{indice}"
+            if os.path.exists(origem):
+                os.replace(origem, f"{self.caminho}.{indice + 1}")
+        os.replace(self.caminho, f"{self.caminho}.1")
+
+    def _gravar(self, lote):
+        linhas = "".join(json.dumps(entrada, ensure_ascii=False, default=str) + "\n" for entrada in lote)
+        if self.stderr:
+            sys.stderr.write("".join(f">>> AUDIT: {entrada['action']}\n" for entrada in lote))
+        try:
+            diretorio = os.path.dirname(self.caminho)
+            if diretorio and not os.path.exists(diretorio):
+                os.makedirs(diretorio)
+            if os.path.exists(self.caminho) and os.path.getsize(self.caminho) >= self.max_bytes:
+                self._rotacionar()
+            with open(self.caminho, "a", encoding="utf-8") as arquivo:
+                arquivo.write(linhas)
+            self.gravadas += len(lote)
+        except OSError as e:
+            self.erros_gravacao += 1
+            self.logger.error(f"Erro ao gravar auditoria: {e}")
+
+    def fechar(self, timeout=5):
+        """Gravar o que estiver na fila e parar a thread"""
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
@@ -0,0 +1,131 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class CacheProcessos:
+    """Cache em memória (TTL + LRU) dos metadados de processos consultados
+
+    Guarda o título, a lista de peças (com hrefs) e o momento da consulta,
+    indexados por `numero_processo`. Entradas expiram após `ttl` segundos e,
+    quando o total estimado passa de `max_bytes`, as menos usadas recentemente
+    são descartadas.
+    """
+
+    def __init__(self, ttl=None, max_bytes=None):
+        self.ttl = ttl if ttl is not None else float(os.getenv("BEMTEVI_CACHE_TTL", "600"))
+        self.max_bytes = max_bytes if max_bytes is not None else int(os.getenv("BEMTEVI_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+        self.logger = logging.getLogger(__name__)
+        self._itens = OrderedDict()  # numero_processo -> (expira_em, tamanho, dados)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._expiradas = 0
+        self._descartadas = 0
+
+    @staticmethod
+    def _tamanho(dados):
+        """Tamanho aproximado da entrada em bytes (serialização JSON)"""
+        return len(json.dumps(dados, ensure_ascii=False, default=str).encode("utf-8"))
+
+    def _remover(self, numero_processo):
+        _, tamanho, _ = self._itens.pop(numero_processo)
+        self._bytes -= tamanho
+
+    def obter(self, numero_processo):
+        """Metadados do processo em cache, ou None se ausentes/expirados"""
+        with self._lock:
+            item = self._itens.get(numero_processo)
+            if item is None:
+                self._misses += 1
+                return None
+            if item[0] <= time.monotonic():
+                self._remover(numero_processo)
+                self._expiradas += 1
+                self._misses += 1
+                return None
+            self._itens.move_to_end(numero_processo)
+            self._hits += 1
+            return item[2]
+
+    def guardar(self, numero_processo, resultado):
+        """Guardar o resultado de consultar_processo"""
+        if not resultado:
+            return
+        dados = self._dados(resultado)
+        tamanho = self._tamanho(dados)
+        if tamanho > self.max_bytes:
+            self.logger.warning(f"Processo {numero_processo} excede o limite do cache ({tamanho} bytes)")
+            return
+
+        with self._lock:
+            if numero_processo in self._itens:
+                self._remover(numero_processo)
+            self._itens[numero_processo] = (time.monotonic() + self.ttl, tamanho, dados)
+            self._bytes += tamanho
+            while self._bytes > self.max_bytes:
+                numero_antigo = next(iter(self._itens))
+                self._remover(numero_antigo)
+                self._descartadas += 1
+
+    def _dados(self, resultado):
+        """Campos do resultado guardados no cache"""
+        return {
+            "titulo": resultado.get("titulo", ""),
+            "total_pecas": resultado.get("total_pecas", len(resultado.get("pecas", []))),
+            "pecas": resultado.get("pecas", []),
+            "url_atual": resultado.get("url_atual", ""),
+            "timestamp": resultado.get("timestamp", ""),
+            # Listagem parcial (extração incremental no navegador): onde continuar
+            "completo": resultado.get("completo", True),
+            "total_linhas": resultado.get("total_linhas"),
+            "proxima_linha": resultado.get("proxima_linha"),
+        }
+
+    def invalidar(self, numero_processo=None):
+        """Invalidar um processo (ou todo o cache); retorna quantas entradas saíram"""
+        with self._lock:
+            if numero_processo is None:
+                total = len(self._itens)
+                self._itens.clear()
+                self._bytes = 0
+                return total
+            if numero_processo in self._itens:
+                self._remover(numero_processo)
+                return 1
+            return 0
+
+    def status(self):
+        with self._lock:
+            return {
+                "itens": len(self._itens),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "expiradas": self._expiradas,
+                "descartadas": self._descartadas,
+            }
+
+
+class CacheDossies(CacheProcessos):
+    """Cache em memória (TTL + LRU) do dossiê combinado de cada processo
+
+    Guarda o resultado inteiro de acessar_dossie (todos os documentos da API
+    e o texto combinado). Configurado por BEMTEVI_DOSSIE_TTL e
+    BEMTEVI_DOSSIE_MAX_BYTES; os documentos em si continuam no store.
+    """
+
+    def __init__(self, ttl=None, max_bytes=None):
+        super().__init__(
+            ttl if ttl is not None else float(os.getenv("BEMTEVI_DOSSIE_TTL", "600")),
+            max_bytes if max_bytes is not None else int(os.getenv("BEMTEVI_DOSSIE_MAX_BYTES", str(64 * 1024 * 1024))),
+        )
+
+    def _dados(self, resultado):
+        return resultado
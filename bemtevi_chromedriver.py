@@ -0,0 +1,87 @@
+import json
+import logging
+import os
+import re
+import subprocess
+import time
+
+
+class CacheChromeDriver:
+    """Caminho e versão do chromedriver resolvidos, persistidos entre reinícios
+
+    Sem CHROMEDRIVER_PATH, o ChromeDriverManager consulta a rede (versão mais
+    recente) e o disco a cada chamada. O binário resolvido na primeira vez fica
+    registrado em BEMTEVI_CHROMEDRIVER_CACHE e é reaproveitado enquanto
+    existir e for executável; se o Chrome for atualizado e o driver deixar de
+    servir, `descartar` força uma nova resolução.
+    """
+
+    def __init__(self, caminho=None):
+        self.caminho = caminho or os.getenv(
+            "BEMTEVI_CHROMEDRIVER_CACHE", os.path.join(os.getcwd(), "cache", "chromedriver.json")
+        )
+        self.logger = logging.getLogger(__name__)
+
+    def carregar(self):
+        """Registro salvo ({binario, versao, resolvido_em}) se o binário ainda for utilizável"""
+        try:
+            with open(self.caminho, "r", encoding="utf-8") as arquivo:
+                registro = json.load(arquivo)
+        except (OSError, ValueError):
+            return None
+        binario = registro.get("binario", "")
+        if not binario or not os.access(binario, os.X_OK):
+            self.logger.info("ChromeDriver em cache não existe mais; resolvendo de novo")
+            return None
+        return registro
+
+    def salvar(self, binario, versao):
+        try:
+            diretorio = os.path.dirname(self.caminho)
+            if diretorio and not os.path.exists(diretorio):
+                os.makedirs(diretorio)
+            temporario = f"{self.caminho}.tmp"
+            with open(temporario, "w", encoding="utf-8") as arquivo:
+                json.dump({"binario": binario, "versao": versao, "resolvido_em": time.time()}, arquivo)
+            os.replace(temporario, self.caminho)
+        except OSError as e:
+            self.logger.warning(f"Não foi possível gravar o cache do ChromeDriver: {e}")
+
+    def descartar(self):
+        try:
+            if os.path.exists(self.caminho):
+                os.remove(self.caminho)
+        except OSError as e:
+            self.logger.error(f"Erro ao remover cache do ChromeDriver: {e}")
+
+    @staticmethod
+    def versao(binario):
+        """Versão informada por `chromedriver --version` ("" se não der para ler)"""
+        try:
+            saida = subprocess.run([binario, "--version"], capture_output=True, text=True, timeout=10).stdout
+        except (OSError, subprocess.SubprocessError):
+            return ""
+        encontrada = re.search(r"\d+(?:\.\d+)+", saida)
+        return encontrada.group(0) if encontrada else ""
+
+    def resolver(self, forcar=False):
+        """(binario, origem): origem é "container", "cache" ou "webdriver_manager"
+
+        CHROMEDRIVER_PATH tem precedência; depois o cache em disco; por fim o
+        ChromeDriverManager (importado só nesse caso), cujo resultado é salvo.
+        """
+        binario = os.getenv("CHROMEDRIVER_PATH")
+        if binario and os.path.exists(binario):
+            return binario, "container"
+
+        if not forcar:
+            registro = self.carregar()
+            if registro:
+                return registro["binario"], "cache"
+
+        from webdriver_manager.chrome import ChromeDriverManager
+        binario = ChromeDriverManager().install()
+        versao = self.versao(binario)
+        self.salvar(binario, versao)
+        self.logger.info(f"ChromeDriver {versao or '(versão desconhecida)'} resolvido e salvo em cache: {binario}")
+        return binario, "webdriver_manager"
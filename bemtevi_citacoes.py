@@ -0,0 +1,120 @@
+import re
+from collections import Counter, defaultdict
+from datetime import date
+
+MESES = {
+    "janeiro": 1, "fevereiro": 2, "março": 3, "marco": 3, "abril": 4, "maio": 5, "junho": 6,
+    "julho": 7, "agosto": 8, "setembro": 9, "outubro": 10, "novembro": 11, "dezembro": 12,
+}
+
+_NUMERO = r"(?:n[º°o.]{1,2}\s*)?"
+_DIPLOMA = (
+    r"CLT|CF(?:/88)?|CPC(?:/15)?|CC|CDC|CTN|ECA|Constitui[çc][ãa]o(?:\s+Federal)?"
+    r"|Lei\s+" + _NUMERO + r"[\d.]+(?:/\d{2,4})?"
+)
+# Um artigo com seus desdobramentos (caput, §, inciso, alínea)
+_ARTIGO = (
+    r"\d{1,4}(?:-[A-Z])?[º°o]?"
+    r"(?:,?\s*(?:e\s+)?(?:caput|§\s*\d+[º°o]?|par[áa]grafo\s+[úu]nico|inc(?:iso)?\.?\s+[IVXLC]+|[IVXLC]+\b|al[íi]nea\s+\"?[a-z]\"?))*"
+)
+# Início de cada artigo numa enumeração ("arts. 186 e 927", "artigos 5º, 6º e 7º")
+_NUMEROS_ARTIGO = re.compile(r"(?:^|,\s*(?:e\s+)?|\s+e\s+)(\d{1,4}(?:-[A-Z])?)", re.IGNORECASE)
+
+# Uma única expressão com uma alternativa nomeada por tipo de citação: o texto
+# é percorrido uma vez só, e a alternativa que casou (lastgroup) diz o tipo. O
+# lookahead inicial descarta em uma comparação as posições que não podem abrir
+# nenhuma citação (início de palavra com dígito, S, O, A ou R), o que evita
+# testar cada alternativa em cada caractere.
+PADRAO_CITACOES = re.compile(
+    r"(?=[\dSsOoAaRr])\b(?:"
+    r"(?P<cnj>\d{7}-\d{2}\.\d{4}\.\d\.\d{2}\.\d{4}\b)"
+    r"|(?P<sumula>S[úu]mula(?:\s+Vinculante)?\s+" + _NUMERO + r"(?P<sumula_num>\d+)"
+    r"(?:\s+d[oa]\s+(?P<sumula_tribunal>TST|STF|STJ))?)"
+    r"|(?P<oj>(?:OJ|Orienta[çc][ãa]o\s+Jurisprudencial)\s+" + _NUMERO + r"(?P<oj_num>\d+)"
+    r"(?:\s+da\s+(?:(?:SBDI|SDI)-?(?P<oj_sdi>[12]|I{1,2}\b)|(?P<oj_sdc>SDC)))?(?:\s+d[oa]\s+TST\b)?)"
+    r"|(?P<artigo>art(?:igo)?(?P<artigo_plural>s)?\.?\s+(?P<artigo_num>" + _ARTIGO
+    + r"(?(artigo_plural)(?:(?:\s*,\s*(?:e\s+)?|\s+e\s+)" + _ARTIGO + r")*))"
+    r"(?:,?\s+d[aoe]s?\s+(?P<artigo_diploma>" + _DIPLOMA + r"))?)"
+    r"|(?P<data>(?P<data_dia>[0-3]?\d)/(?P<data_mes>[01]?\d)/(?P<data_ano>(?:19|20)\d{2})\b"
+    r"|(?P<data_dia_ext>[0-3]?\d)º?\s+de\s+(?P<data_mes_ext>" + "|".join(MESES) + r")\s+de\s+(?P<data_ano_ext>(?:19|20)\d{2})\b)"
+    r"|(?P<valor>R\$\s?(?P<valor_num>\d{1,3}(?:\.\d{3})+(?:,\d{2})?|\d+(?:,\d{2})?)))",
+    re.IGNORECASE,
+)
+
+TIPOS = ("artigo", "sumula", "oj", "cnj", "data", "valor")
+
+
+def _normalizar(tipo, m):
+    """Forma canônica da citação (para agrupar variações de escrita)"""
+    if tipo == "sumula":
+        tribunal = (m.group("sumula_tribunal") or "TST").upper()
+        vinculante = " Vinculante" if "vinculante" in m.group("sumula").lower() else ""
+        return f"Súmula{vinculante} {int(m.group('sumula_num'))} do {tribunal}"
+    if tipo == "oj":
+        sdi = m.group("oj_sdi")
+        if m.group("oj_sdc"):
+            return f"OJ {int(m.group('oj_num'))} da SDC"
+        if sdi:
+            return f"OJ {int(m.group('oj_num'))} da SBDI-{len(sdi) if sdi.upper().startswith('I') else int(sdi)}"
+        return f"OJ {int(m.group('oj_num'))} do TST"
+    if tipo == "data":
+        if m.group("data_dia"):
+            dia, mes, ano = int(m.group("data_dia")), int(m.group("data_mes")), int(m.group("data_ano"))
+        else:
+            dia, mes, ano = int(m.group("data_dia_ext")), MESES[m.group("data_mes_ext").lower()], int(m.group("data_ano_ext"))
+        try:
+            return date(ano, mes, dia).isoformat()  # Descarta 31/02, 00/13 etc.
+        except ValueError:
+            return None
+    if tipo == "valor":
+        return float(m.group("valor_num").replace(".", "").replace(",", "."))
+    return m.group(tipo)
+
+
+def _artigos(m):
+    """Formas canônicas de cada artigo citado (uma enumeração dá um por artigo, com o mesmo diploma)"""
+    diploma = m.group("artigo_diploma")
+    if diploma:
+        diploma = re.sub(r"\s+", " ", diploma)
+        if diploma.lower().startswith("constitui") or diploma.upper().startswith("CF"):
+            diploma = "CF"
+        diploma = f" da {diploma.upper() if len(diploma) <= 6 else diploma}"
+    return [f"art. {numero.upper()}{diploma or ''}" for numero in _NUMEROS_ARTIGO.findall(m.group("artigo_num"))]
+
+
+def extrair_citacoes(texto):
+    """Artigos de lei, Súmulas, OJs, números CNJ, datas e valores, na ordem do texto
+
+    Cada citação é um dict com tipo, texto original, forma normalizada e
+    posição [inicio, fim) no texto. Uma enumeração ("arts. 186 e 927 do CC")
+    dá uma citação por artigo, todas com o trecho inteiro. Uma única passada pela expressão
+    pré-compilada, adequada a pacotes de AIRR com vários megabytes.
+    """
+    citacoes = []
+    for m in PADRAO_CITACOES.finditer(texto):
+        tipo = m.lastgroup if m.lastgroup in TIPOS else next(t for t in TIPOS if m.group(t))
+        for normalizado in _artigos(m) if tipo == "artigo" else [_normalizar(tipo, m)]:
+            if normalizado is None:
+                continue
+            citacoes.append({
+                "tipo": tipo,
+                "texto": m.group(tipo),
+                "normalizado": normalizado,
+                "inicio": m.start(),
+                "fim": m.end(),
+            })
+    return citacoes
+
+
+def agrupar_citacoes(citacoes):
+    """{tipo: [(normalizado, ocorrências, primeira posição)]}, do mais ao menos citado"""
+    contagem = defaultdict(Counter)
+    primeira = {}
+    for citacao in citacoes:
+        chave = (citacao["tipo"], citacao["normalizado"])
+        contagem[citacao["tipo"]][citacao["normalizado"]] += 1
+        primeira.setdefault(chave, citacao["inicio"])
+    return {
+        tipo: [(valor, total, primeira[(tipo, valor)]) for valor, total in contador.most_common()]
+        for tipo, contador in contagem.items()
+    }
@@ -1,25 +1,63 @@
+import asyncio
+import hashlib
 import json
 import logging
 import time
 import os
-import requests
 import sys
 from datetime import datetime
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
+# selenium, webdriver_manager e requests são importados no primeiro uso: o
+# servidor MCP responde ao handshake e ao list_tools sem carregar o navegador
+from bemtevi_chromedriver import CacheChromeDriver
+from bemtevi_wait import EsperaPagina
+from bemtevi_store import store_padrao
+from bemtevi_http import ClienteApiAsync, HEADERS_API, URL_BEMTEVI, URL_SERVICOS
+from bemtevi_documento import extrair_texto
+from bemtevi_documentos_api import DOCUMENTOS_API
+from bemtevi_metricas import medido, metricas
+from bemtevi_resiliencia import ApiIndisponivel, resiliencia_api
+from bemtevi_limite import limitador_taxa
+
+
+class SessaoRejeitada(Exception):
+    """A API recusou os cookies da sessão (HTTP 401/403): renovar o login e repetir"""
+
+    def __init__(self, status_http):
+        super().__init__(f"Sessão rejeitada pela API (HTTP {status_http})")
+        self.status_http = status_http
+
+
+def identificar_pecas(pecas):
+    """Atribuir `id_peca` estável a cada peça (hash de tipo, data e href)
+
+    Ao contrário do índice posicional, o id não muda quando peças são juntadas
+    ao processo. Listagem da API e tabela da página formatam tipo, data e href
+    de modo diferente, então os ids de uma não valem na outra. Peças
+    idênticas recebem sufixo pela ordem de ocorrência ("-2", "-3"...).
+    """
+    vistos = {}
+    for peca in pecas:
+        chave = f"{peca.get('tipo', '')}|{peca.get('data', '')}|{peca.get('href', '')}"
+        base = hashlib.sha1(chave.encode("utf-8")).hexdigest()[:12]
+        vistos[base] = vistos.get(base, 0) + 1
+        peca["id_peca"] = base if vistos[base] == 1 else f"{base}-{vistos[base]}"
+    return pecas
 
 class BemTeviClient:
     def __init__(self):
         self.driver = None
+        self.espera = None  # Motor de espera, criado junto com o navegador
         self.logged_in = False
         self.config = self.carregar_config()
         self.setup_logging()
+        import requests
         self.session = requests.Session()  # Para chamadas de API
+        self.session.headers.update(HEADERS_API)
+        self.session.mount("https://", requests.adapters.HTTPAdapter(
+            pool_maxsize=int(os.getenv("BEMTEVI_HTTP_MAX_CONEXOES", "20"))
+        ))
+        self.store = store_padrao()  # Documentos já obtidos (persistente entre reinícios)
+        self.http = None  # Transporte assíncrono (httpx), criado no primeiro uso
         self.logger.info("Cliente BemTevi inicializado")
 
     def carregar_config(self):
@@ -70,11 +108,16 @@ class BemTeviClient:
             self.logger = logging.getLogger(__name__)
             self.logger.warning(f"Não foi possível criar log file: {e}")
 
+    @medido("fase", "navegador.iniciar")
     def iniciar_navegador(self):
         """Inicializar navegador Chrome (adaptado para nuvem)"""
         try:
             self.logger.info("Iniciando navegador Chrome para ambiente cloud...")
             
+            from selenium import webdriver
+            from selenium.webdriver.chrome.options import Options
+            from selenium.webdriver.chrome.service import Service
+            
             chrome_options = Options()
             
             # ===== CONFIGURAÇÕES ESSENCIAIS PARA NUVEM =====
@@ -128,27 +171,38 @@ class BemTeviClient:
             chrome_options.add_experimental_option("useAutomationExtension", False)
             chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
             
-            # ===== CONFIGURAÇÃO DO DRIVER =====
-            # Remover caminho específico do Windows e usar container/WebDriverManager
-            chrome_driver_path = os.getenv("CHROMEDRIVER_PATH")
+            # Log de performance (eventos Network.* do CDP) para detectar rede ociosa
+            chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
             
-            if chrome_driver_path and os.path.exists(chrome_driver_path):
-                self.logger.info(f"Usando ChromeDriver do container: {chrome_driver_path}")
-                service = Service(chrome_driver_path)
-            else:
-                self.logger.info("Usando WebDriver Manager para ChromeDriver...")
-                service = Service(ChromeDriverManager().install())
+            # ===== CONFIGURAÇÃO DO DRIVER =====
+            # CHROMEDRIVER_PATH do container; senão o binário resolvido antes (cache em
+            # disco) e, só na primeira vez, o WebDriver Manager
+            cache_driver = CacheChromeDriver()
+            chrome_driver_path, origem = cache_driver.resolver()
+            self.logger.info(f"Usando ChromeDriver ({origem}): {chrome_driver_path}")
             
             # Timeouts configuráveis
             page_load_timeout = int(os.getenv("PAGE_LOAD_TIMEOUT", "60"))
             selenium_timeout = int(os.getenv("SELENIUM_TIMEOUT", "30"))
             
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
+            try:
+                self.driver = webdriver.Chrome(service=Service(chrome_driver_path), options=chrome_options)
+            except Exception as e:
+                if origem != "cache":
+                    raise
+                # Driver em cache incompatível (ex.: Chrome atualizado): resolver de novo uma vez
+                self.logger.warning(f"ChromeDriver em cache falhou ({e}); resolvendo de novo")
+                cache_driver.descartar()
+                chrome_driver_path, origem = cache_driver.resolver(forcar=True)
+                self.driver = webdriver.Chrome(service=Service(chrome_driver_path), options=chrome_options)
             
             # Configurar timeouts
             self.driver.set_page_load_timeout(page_load_timeout)
             self.driver.implicitly_wait(selenium_timeout)
             
+            # Esperas orientadas a eventos em vez de time.sleep fixos
+            self.espera = EsperaPagina(self.driver, self.logger, espera_implicita=selenium_timeout)
+            
             # Não fazer maximize_window em headless
             # self.driver.maximize_window()  # Comentado para headless
             
@@ -159,17 +213,23 @@ class BemTeviClient:
             self.logger.error(f"Erro ao iniciar navegador: {e}")
             return False
 
+    @medido("fase", "login")
     def fazer_login(self):
         """Fazer login no BemTevi (lógica original mantida)"""
         try:
             if not self.iniciar_navegador():
                 return False
             
+            from selenium.webdriver.common.by import By
+            from selenium.webdriver.support import expected_conditions as EC
+            from selenium.webdriver.support.ui import WebDriverWait
+            
             self.logger.info("Fazendo login no BemTevi...")
             
             # Navegar para BemTevi
-            self.driver.get("https://bemtevi.tst.jus.br/")
-            time.sleep(3)
+            limitador_taxa.aguardar(URL_BEMTEVI, "navegador")
+            self.driver.get(f"{URL_BEMTEVI}/")
+            self.espera.pagina_pronta("login.pagina")
             
             # Preencher usuário
             campo_usuario = WebDriverWait(self.driver, 10).until(
@@ -179,30 +239,22 @@ class BemTeviClient:
             campo_usuario.send_keys(self.config.get("username", ""))
             self.logger.info("Usuario preenchido")
             
-            time.sleep(1)
-            
             # Preencher senha
             campo_senha = self.driver.find_element(By.XPATH, "//input[@type='password']")
             campo_senha.clear()
             campo_senha.send_keys(self.config.get("password", ""))
             self.logger.info("Senha preenchida")
             
-            time.sleep(2)
-            
             # Aguardar spinner desaparecer se existir
-            try:
-                WebDriverWait(self.driver, 10).until(
-                    EC.invisibility_of_element_located((By.ID, "spinner"))
-                )
+            if self.espera.spinner_ausente("login.spinner", timeout=10):
                 self.logger.info("Spinner desapareceu")
-            except:
-                pass
             
             # Clicar no botão de login
             try:
                 botao_entrar = WebDriverWait(self.driver, 10).until(
                     EC.element_to_be_clickable((By.XPATH, "//input[@value='Entrar'] | //input[@id='button-login']"))
                 )
+                url_antes = self.driver.current_url
                 
                 try:
                     botao_entrar.click()
@@ -215,8 +267,12 @@ class BemTeviClient:
                 self.logger.error(f"Erro ao clicar no botão: {e}")
                 return False
             
-            # Aguardar carregamento após login
-            time.sleep(5)
+            # Aguardar carregamento após login: saída da tela de login e página estável
+            self.espera.aguardar(
+                lambda d: d.current_url != url_antes or not d.find_elements(By.XPATH, "//input[@type='password']"),
+                "login.redirecionamento"
+            )
+            self.espera.pagina_pronta("login.pos")
             
             # Verificar se login foi bem-sucedido
             if "5ª Turma" in self.driver.page_source or "bemtevi" in self.driver.current_url.lower():
@@ -237,17 +293,75 @@ class BemTeviClient:
             self.logger.error(f"Erro no login: {e}")
             return False
 
-    def _copiar_cookies_para_session(self):
-        """Copiar cookies do Selenium para requests.Session (original mantido)"""
+    def _copiar_cookies_para_session(self, cookies=None):
+        """Copiar cookies do Selenium (ou da lista informada) para requests.Session"""
         try:
-            if self.driver:
-                for cookie in self.driver.get_cookies():
+            if cookies is None and self.driver:
+                cookies = self.driver.get_cookies()
+            if cookies:
+                for cookie in cookies:
                     self.session.cookies.set(cookie['name'], cookie['value'])
+                if self.http:
+                    self.http.atualizar_cookies({c.name: c.value for c in self.session.cookies})
                 self.logger.info("Cookies copiados para sessão requests")
         except Exception as e:
             self.logger.error(f"Erro ao copiar cookies: {e}")
 
-    def consultar_processo(self, numero_processo):
+    def restaurar_sessao(self, cookies):
+        """Autenticar apenas a sessão HTTP com cookies salvos (sem navegador)"""
+        self._copiar_cookies_para_session(cookies)
+        self.logged_in = True
+        self.logger.info("Sessão HTTP restaurada sem abrir o navegador")
+
+    def entrar_com_cookies(self, cookies):
+        """Iniciar navegador reaproveitando cookies de uma sessão já autenticada (pool)"""
+        try:
+            if not cookies or not self.iniciar_navegador():
+                return False
+            
+            from selenium.webdriver.common.by import By
+            
+            # Cookies só podem ser definidos estando no domínio correspondente
+            limitador_taxa.aguardar(URL_BEMTEVI, "navegador")
+            self.driver.get(f"{URL_BEMTEVI}/")
+            self.espera.documento_pronto("cookies.pagina")
+            
+            campos = ("name", "value", "path", "domain", "secure", "httpOnly", "expiry", "sameSite")
+            for cookie in cookies:
+                try:
+                    self.driver.add_cookie({k: v for k, v in cookie.items() if k in campos})
+                except Exception:
+                    continue  # Cookie de outro domínio (vai apenas para a sessão requests)
+            
+            self.driver.refresh()
+            self.espera.pagina_pronta("cookies.recarga")
+            
+            # Ainda na tela de login = cookies rejeitados
+            with self.espera.sem_espera_implicita():
+                if self.driver.find_elements(By.XPATH, "//input[@type='password']"):
+                    self.logger.warning("Cookies compartilhados rejeitados pelo BemTevi")
+                    return False
+            
+            self.logged_in = True
+            self._copiar_cookies_para_session(cookies)
+            self.logger.info("Navegador autenticado com cookies compartilhados")
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"Erro ao entrar com cookies: {e}")
+            return False
+
+    def verificar_saude(self):
+        """Health check: navegador responde e sessão está autenticada"""
+        try:
+            if not self.driver or not self.logged_in:
+                return False
+            self.driver.execute_script("return document.readyState;")
+            return True
+        except Exception:
+            return False
+
+    def consultar_processo(self, numero_processo, inicio=0, maximo=None):
         """Consultar processo específico via URL direta (original mantido)"""
         try:
             if not self.logged_in:
@@ -256,17 +370,22 @@ class BemTeviClient:
             
             self.logger.info(f"Consultando processo: {numero_processo}")
             
-            # URL direta do processo
-            url_processo = f"https://bemtevi.tst.jus.br/report/processo/{numero_processo}"
-            self.driver.get(url_processo)
+            from selenium.webdriver.common.by import By
             
-            # Aguardar carregamento
-            time.sleep(5)
+            # URL direta do processo
+            url_processo = f"{URL_BEMTEVI}/report/processo/{numero_processo}"
+            limitador_taxa.aguardar(url_processo, "navegador")  # Fora da medição: espera não é navegação
+            with metricas.medir("fase", "navegacao.processo"):
+                self.driver.get(url_processo)
+                
+                # Aguardar carregamento: página estável e tabela de peças renderizada
+                self.espera.pagina_pronta("processo.pagina")
+                self.espera.elementos_presentes(By.XPATH, "//table//tr[td]", "processo.tabela")
             
             # Verificar se página carregou
             if "processo" in self.driver.page_source.lower() or numero_processo in self.driver.page_source:
                 self.logger.info(f"Processo {numero_processo} carregado com sucesso!")
-                return self.extrair_informacoes_processo()
+                return self.extrair_informacoes_processo(inicio, maximo)
             else:
                 self.logger.error(f"Processo {numero_processo} não encontrado")
                 return None
@@ -275,80 +394,164 @@ class BemTeviClient:
             self.logger.error(f"Erro ao consultar processo: {e}")
             return None
 
-    def extrair_informacoes_processo(self):
-        """Extrair informações do processo da página atual (original mantido)"""
+    # Extração da página do processo numa única ida ao WebDriver (ver extrair_informacoes_processo)
+    # Lê as linhas a partir de `inicio` até juntar `maximo` peças (null = todas)
+    SCRIPT_EXTRAIR_PECAS = """
+        var inicio = arguments[0], maximo = arguments[1];
+        var cabecalho = document.querySelector('h1, h2, h3');
+        var linhas = document.evaluate('//table//tr[td]', document, null,
+                                       XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        var pecas = [];
+        var i = inicio;
+        for (; i < linhas.snapshotLength; i++) {
+            if (maximo !== null && pecas.length >= maximo) { break; }
+            var linha = linhas.snapshotItem(i);
+            var colunas = linha.querySelectorAll('td');
+            if (colunas.length < 2) { continue; }
+            var tipo = colunas[0].innerText.trim();
+            if (tipo.length <= 2) { continue; }
+            var link = linha.querySelector('a');
+            pecas.push({
+                indice: i,
+                tipo: tipo,
+                data: colunas[1].innerText.trim(),
+                href: link ? (link.href || '') : '',
+                conteudo_tabela: colunas.length > 2 ? colunas[2].innerText.trim() : ''
+            });
+        }
+        return {
+            titulo: cabecalho ? cabecalho.innerText.trim() : '',
+            pecas: pecas,
+            total_linhas: linhas.snapshotLength,
+            proxima_linha: i,
+            corpo: (pecas.length || inicio) ? '' : (document.body ? document.body.innerText : ''),
+            url: window.location.href
+        };
+    """
+
+    def _extrair_pecas_script(self, inicio=0, maximo=None):
+        """Título, peças, texto da página e URL em uma única chamada execute_script
+
+        Retorna (titulo, pecas, corpo, url, paginacao), com paginacao =
+        {"total_linhas", "proxima_linha"} para continuar a leitura depois.
+        """
+        dados = self.driver.execute_script(self.SCRIPT_EXTRAIR_PECAS, inicio, maximo)
+        pecas = []
+        for item in dados.get("pecas") or []:
+            pecas.append({
+                "indice": item["indice"],
+                "tipo": item["tipo"],
+                "data": item["data"],
+                "href": item["href"],
+                "tem_link": bool(item["href"]),
+                "conteudo_tabela": item["conteudo_tabela"]
+            })
+        paginacao = {"total_linhas": dados.get("total_linhas", 0), "proxima_linha": dados.get("proxima_linha", 0)}
+        return dados.get("titulo") or "Processo TST", pecas, dados.get("corpo") or "", dados.get("url") or "", paginacao
+
+    def _extrair_pecas_legado(self, inicio=0, maximo=None):
+        """Extração elemento a elemento (original): várias idas ao WebDriver por linha da tabela"""
+        from selenium.webdriver.common.by import By
+        
+        # Extrair título/cabeçalho
+        titulo = ""
         try:
-            self.logger.info("Extraindo informações do processo...")
-            
-            time.sleep(3)
-            
-            # Extrair título/cabeçalho
-            titulo = ""
-            try:
+            with self.espera.sem_espera_implicita():
                 titulo_element = self.driver.find_element(By.XPATH, "//h1 | //h2 | //h3")
-                titulo = titulo_element.text.strip()
-            except:
-                titulo = "Processo TST"
+            titulo = titulo_element.text.strip()
+        except:
+            titulo = "Processo TST"
+        
+        # Extrair informações das peças/tabela
+        pecas = []
+        linhas_tabela = []
+        proxima_linha = inicio
+        try:
+            linhas_tabela = self.driver.find_elements(By.XPATH, "//table//tr[td]")
             
-            # Extrair informações das peças/tabela
-            pecas = []
-            try:
-                linhas_tabela = self.driver.find_elements(By.XPATH, "//table//tr[td]")
-                
-                for i, linha in enumerate(linhas_tabela[:20]):
-                    try:
-                        colunas = linha.find_elements(By.TAG_NAME, "td")
+            for i, linha in enumerate(linhas_tabela[inicio:], start=inicio):
+                if maximo is not None and len(pecas) >= maximo:
+                    break
+                proxima_linha = i + 1
+                try:
+                    colunas = linha.find_elements(By.TAG_NAME, "td")
+                    
+                    if len(colunas) >= 2:
+                        tipo_peca = colunas[0].text.strip()
+                        data_peca = colunas[1].text.strip() if len(colunas) > 1 else ""
                         
-                        if len(colunas) >= 2:
-                            tipo_peca = colunas[0].text.strip()
-                            data_peca = colunas[1].text.strip() if len(colunas) > 1 else ""
-                            
-                            # Procurar link na peça
-                            href = ""
-                            try:
+                        # Procurar link na peça
+                        href = ""
+                        try:
+                            with self.espera.sem_espera_implicita():
                                 link_elemento = linha.find_element(By.TAG_NAME, "a")
-                                href = link_elemento.get_attribute("href") or ""
-                            except:
-                                pass
-                            
-                            if tipo_peca and len(tipo_peca) > 2:
-                                peca = {
-                                    "indice": i,
-                                    "tipo": tipo_peca,
-                                    "data": data_peca,
-                                    "href": href,
-                                    "tem_link": bool(href)
-                                }
-                                pecas.append(peca)
-                                
-                    except Exception as e:
-                        continue
+                            href = link_elemento.get_attribute("href") or ""
+                        except:
+                            pass
                         
+                        if tipo_peca and len(tipo_peca) > 2:
+                            peca = {
+                                "indice": i,
+                                "tipo": tipo_peca,
+                                "data": data_peca,
+                                "href": href,
+                                "tem_link": bool(href)
+                            }
+                            pecas.append(peca)
+                            
+                except Exception as e:
+                    continue
+                    
+        except Exception as e:
+            self.logger.error(f"Erro ao extrair peças: {e}")
+        
+        corpo = ""
+        if not pecas and not inicio:
+            try:
+                corpo = self.driver.find_element(By.TAG_NAME, "body").text
+            except:
+                pass
+        paginacao = {"total_linhas": len(linhas_tabela), "proxima_linha": max(proxima_linha, inicio)}
+        return titulo, pecas, corpo, self.driver.current_url, paginacao
+
+    @medido("fase", "dom.processo")
+    def extrair_informacoes_processo(self, inicio=0, maximo=None):
+        """Extrair informações do processo da página atual
+
+        Lê a tabela a partir da linha `inicio` até juntar `maximo` peças
+        (None = todas). O resultado traz `proxima_linha` e `completo` para que
+        a leitura continue de onde parou.
+        """
+        try:
+            self.logger.info("Extraindo informações do processo...")
+            
+            try:
+                titulo, pecas, body_text, url_atual, paginacao = self._extrair_pecas_script(inicio, maximo)
             except Exception as e:
-                self.logger.error(f"Erro ao extrair peças: {e}")
+                self.logger.warning(f"Extração via script falhou ({e}); usando extração elemento a elemento")
+                titulo, pecas, body_text, url_atual, paginacao = self._extrair_pecas_legado(inicio, maximo)
             
             # Se não encontrou peças na tabela, extrair conteúdo geral
-            if not pecas:
-                try:
-                    body_text = self.driver.find_element(By.TAG_NAME, "body").text
-                    if body_text and len(body_text) > 100:
-                        peca = {
-                            "indice": 0,
-                            "tipo": "Conteúdo do processo",
-                            "data": datetime.now().strftime("%d/%m/%Y"),
-                            "conteudo_completo": body_text,
-                            "tem_link": False
-                        }
-                        pecas.append(peca)
-                except:
-                    pass
+            if not pecas and body_text and len(body_text) > 100:
+                peca = {
+                    "indice": 0,
+                    "tipo": "Conteúdo do processo",
+                    "data": datetime.now().strftime("%d/%m/%Y"),
+                    "conteudo_completo": body_text,
+                    "tem_link": False
+                }
+                pecas.append(peca)
             
+            identificar_pecas(pecas)
             resultado = {
                 "titulo": titulo,
                 "total_pecas": len(pecas),
                 "pecas": pecas,
-                "url_atual": self.driver.current_url,
-                "timestamp": datetime.now().isoformat()
+                "url_atual": url_atual,
+                "timestamp": datetime.now().isoformat(),
+                "total_linhas": paginacao["total_linhas"],
+                "proxima_linha": paginacao["proxima_linha"],
+                "completo": paginacao["proxima_linha"] >= paginacao["total_linhas"]
             }
             
             self.logger.info(f"Extraídas {len(pecas)} informações do processo")
@@ -358,180 +561,246 @@ class BemTeviClient:
             self.logger.error(f"Erro ao extrair informações: {e}")
             return None
 
-    def acessar_despacho_admissibilidade(self, numero_processo):
-        """Acessar despacho de admissibilidade via API específica (original mantido)"""
+    def _preparar_requisicao_api(self, numero_processo, tipo):
+        """Consultar o store antes da requisição: (armazenado, headers condicionais)"""
+        armazenado = self.store.obter(numero_processo, tipo)
+        headers = {}
+        if armazenado and not armazenado["fresco"]:
+            if armazenado["etag"]:
+                headers['If-None-Match'] = armazenado["etag"]
+            if armazenado["last_modified"]:
+                headers['If-Modified-Since'] = armazenado["last_modified"]
+        return armazenado, headers
+
+    def _concluir_requisicao_api(self, numero_processo, tipo, armazenado, status_code, texto, headers_resposta):
+        """Aplicar a resposta HTTP ao store e devolver (status_code, texto, origem)"""
+        if status_code == 304 and armazenado:
+            self.store.revalidado(numero_processo, tipo)
+            return 200, armazenado["corpo"], " (store local, revalidado)"
+        
+        # Resposta vazia não é guardada: o documento ainda pode ser juntado ao processo
+        if status_code == 200 and texto.strip() not in ("", "[]", "{}", "null"):
+            self.store.guardar(
+                numero_processo, tipo, "todos", texto,
+                content_type=headers_resposta.get("Content-Type"),
+                etag=headers_resposta.get("ETag"),
+                last_modified=headers_resposta.get("Last-Modified"),
+            )
+        return status_code, texto, ""
+
+    def _servir_desatualizado(self, numero_processo, tipo, armazenado, erro):
+        """API indisponível: servir a cópia vencida do store, se houver (senão propagar o erro)"""
+        if not armazenado:
+            raise erro
+        metricas.contar("resiliencia", f"{tipo}.desatualizado")
+        self.logger.warning(f"{tipo} de {numero_processo} servido do store sem revalidar: {erro}")
+        return 200, armazenado["corpo"], " (store local, desatualizado: API indisponível)"
+
+    @medido("fase", "http.documento")
+    def _buscar_documento_api(self, numero_processo, tipo, url_api):
+        """GET na API btv-servicos passando pelo store local
+
+        Documento fresco no store não gera requisição; documento vencido é
+        revalidado com If-None-Match/If-Modified-Since quando há validadores.
+        Retorna (status_code, texto, origem), onde origem é um sufixo para
+        `metodo_extracao` ("" quando veio da rede). Com a API indisponível
+        (ver ResilienciaApi), a cópia vencida do store é servida.
+        """
+        armazenado, headers = self._preparar_requisicao_api(numero_processo, tipo)
+        if armazenado and armazenado["fresco"]:
+            self.logger.info(f"{tipo} de {numero_processo} servido do store local")
+            return 200, armazenado["corpo"], " (store local)"
+        
+        try:
+            response = resiliencia_api.get(
+                tipo, url_api, lambda timeout: self.session.get(url_api, headers=headers, timeout=timeout)
+            )
+        except ApiIndisponivel as e:
+            return self._servir_desatualizado(numero_processo, tipo, armazenado, e)
+        return self._concluir_requisicao_api(
+            numero_processo, tipo, armazenado, response.status_code, response.text, response.headers
+        )
+
+    @medido("fase", "http.documento")
+    async def _buscar_documento_api_async(self, numero_processo, tipo, url_api):
+        """Versão assíncrona de `_buscar_documento_api` (httpx, direto no event loop)
+
+        Store (SQLite, zlib) e decodificação de corpos grandes rodam numa
+        thread do executor; só a requisição fica no event loop.
+        """
+        loop = asyncio.get_running_loop()
+        armazenado, headers = await loop.run_in_executor(None, self._preparar_requisicao_api, numero_processo, tipo)
+        if armazenado and armazenado["fresco"]:
+            self.logger.info(f"{tipo} de {numero_processo} servido do store local")
+            return 200, armazenado["corpo"], " (store local)"
+        
+        try:
+            response = await resiliencia_api.get_async(
+                tipo, url_api, lambda timeout: self._http().get(url_api, headers=headers, timeout=timeout)
+            )
+        except ApiIndisponivel as e:
+            return self._servir_desatualizado(numero_processo, tipo, armazenado, e)
+        return await loop.run_in_executor(None, lambda: self._concluir_requisicao_api(
+            numero_processo, tipo, armazenado, response.status_code, response.text, response.headers
+        ))
+
+    def _http(self):
+        """Transporte assíncrono compartilhado pelas chamadas de API deste cliente"""
+        if self.http is None:
+            self.http = ClienteApiAsync({c.name: c.value for c in self.session.cookies})
+        return self.http
+
+    def _url_listagem_pecas(self, numero_processo):
+        caminho = os.getenv("BEMTEVI_API_LISTAGEM_PATH", "pecas")
+        return f"{URL_SERVICOS}/pecas/api/v1/processos/{numero_processo}/{caminho}"
+
+    @staticmethod
+    def _primeiro_campo(item, campos):
+        for campo in campos:
+            valor = item.get(campo)
+            if valor not in (None, ""):
+                return str(valor).strip()
+        return ""
+
+    def _processar_listagem(self, numero_processo, url_api, status_code, texto_resposta):
+        """Converter a listagem JSON da API no mesmo formato de extrair_informacoes_processo"""
+        if status_code in (401, 403):
+            raise SessaoRejeitada(status_code)
+        if status_code != 200:
+            self.logger.info(f"Listagem via API indisponível (HTTP {status_code}); usando navegador")
+            return None
+        try:
+            dados = json.loads(texto_resposta)
+        except json.JSONDecodeError:
+            return None
+        
+        titulo = ""
+        itens = dados
+        if isinstance(dados, dict):
+            titulo = self._primeiro_campo(dados, ("titulo", "classe", "numero", "numeroProcesso"))
+            itens = next((dados[chave] for chave in ("pecas", "itens", "content", "documentos") if isinstance(dados.get(chave), list)), None)
+        if not isinstance(itens, list) or not itens:
+            return None
+        
+        pecas = []
+        for i, item in enumerate(itens):
+            if not isinstance(item, dict):
+                continue
+            tipo_peca = self._primeiro_campo(item, ("tipo", "tipoPeca", "tipoDocumento", "descricao", "nome", "titulo"))
+            if not tipo_peca or len(tipo_peca) <= 2:
+                continue
+            href = self._primeiro_campo(item, ("url", "href", "link", "urlDocumento"))
+            pecas.append({
+                "indice": i,
+                "tipo": tipo_peca,
+                "data": self._primeiro_campo(item, ("data", "dataJuntada", "dataPeca", "dataCriacao", "dataDocumento")),
+                "href": href,
+                "tem_link": bool(href)
+            })
+        
+        if not pecas:
+            return None
+        
+        identificar_pecas(pecas)
+        self.logger.info(f"Listagem via API: {len(pecas)} peças do processo {numero_processo}")
+        return {
+            "titulo": titulo or f"Processo {numero_processo}",
+            "total_pecas": len(pecas),
+            "pecas": pecas,
+            "url_atual": url_api,
+            "timestamp": datetime.now().isoformat(),
+            "completo": True,
+            "metodo_extracao": "API BemTevi - Listagem de peças"
+        }
+
+    @medido("fase", "http.listagem")
+    def listar_pecas_api(self, numero_processo):
+        """Listar peças e metadados do processo pela API JSON (None se indisponível)"""
         try:
-            self.logger.info(f"Acessando despacho de admissibilidade do processo: {numero_processo}")
+            if not self.logged_in:
+                return None
+            url_api = self._url_listagem_pecas(numero_processo)
+            response = resiliencia_api.get("listagem", url_api, lambda timeout: self.session.get(url_api, timeout=timeout))
+            return self._processar_listagem(numero_processo, url_api, response.status_code, response.text)
+        except SessaoRejeitada:
+            raise
+        except Exception as e:
+            self.logger.warning(f"Erro na listagem via API: {e}")
+            return None
+
+    @medido("fase", "http.listagem")
+    async def listar_pecas_api_async(self, numero_processo):
+        """Versão assíncrona de listar_pecas_api (httpx, direto no event loop)"""
+        try:
+            if not self.logged_in:
+                return None
+            url_api = self._url_listagem_pecas(numero_processo)
+            response = await resiliencia_api.get_async("listagem", url_api, lambda timeout: self._http().get(url_api, timeout=timeout))
+            return self._processar_listagem(numero_processo, url_api, response.status_code, response.text)
+        except SessaoRejeitada:
+            raise
+        except Exception as e:
+            self.logger.warning(f"Erro na listagem via API: {e}")
+            return None
+
+    def acessar_documento_api(self, documento, numero_processo):
+        """Acessar um documento registrado em DOCUMENTOS_API (despacho, AIRR...) pela API"""
+        tipo = DOCUMENTOS_API[documento]
+        try:
+            self.logger.info(f"Acessando {tipo.nome} do processo: {numero_processo}")
             
             if not self.logged_in:
                 return {"sucesso": False, "erro": "Precisa fazer login primeiro"}
             
-            # URL da API para despachos de admissibilidade
-            url_api = f"https://btv-servicos.tst.jus.br/pecas/api/v1/processos/{numero_processo}/decisoes-admissao/todos"
-            
-            # Fazer requisição para a API
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-                'Accept': 'application/json, text/plain, */*',
-                'Referer': 'https://bemtevi.tst.jus.br/',
-            }
-            
-            response = self.session.get(url_api, headers=headers, timeout=30)
-            
-            if response.status_code == 200:
-                try:
-                    dados = response.json()
-                    
-                    if dados and len(dados) > 0:
-                        # Processar dados do despacho
-                        despacho = dados[0] if isinstance(dados, list) else dados
-                        
-                        conteudo_texto = ""
-                        if isinstance(despacho, dict):
-                            # Extrair texto do despacho
-                            conteudo_texto = despacho.get('texto', '') or despacho.get('conteudo', '') or despacho.get('decisao', '')
-                            if not conteudo_texto:
-                                conteudo_texto = json.dumps(despacho, indent=2, ensure_ascii=False)
-                        else:
-                            conteudo_texto = str(despacho)
-                        
-                        self.logger.info(f"Despacho de admissibilidade extraído: {len(conteudo_texto)} caracteres")
-                        
-                        return {
-                            "sucesso": True,
-                            "tipo": "Despacho de Admissibilidade",
-                            "conteudo_completo": conteudo_texto,
-                            "dados_estruturados": dados,
-                            "tamanho_conteudo": len(conteudo_texto),
-                            "url_api": url_api,
-                            "metodo_extracao": "API BemTevi - Despachos de Admissão"
-                        }
-                    else:
-                        return {
-                            "sucesso": False,
-                            "erro": "Nenhum despacho de admissibilidade encontrado"
-                        }
-                        
-                except json.JSONDecodeError as e:
-                    # Se não for JSON, tratar como texto
-                    conteudo_texto = response.text
-                    if len(conteudo_texto) > 50:
-                        return {
-                            "sucesso": True,
-                            "tipo": "Despacho de Admissibilidade",
-                            "conteudo_completo": conteudo_texto,
-                            "tamanho_conteudo": len(conteudo_texto),
-                            "url_api": url_api,
-                            "metodo_extracao": "API BemTevi - Resposta texto"
-                        }
-                    else:
-                        return {"sucesso": False, "erro": f"Erro ao processar JSON: {e}"}
-            else:
-                return {
-                    "sucesso": False,
-                    "erro": f"Erro na API: HTTP {response.status_code} - {response.text[:200]}"
-                }
+            url_api = tipo.url(numero_processo)
+            resposta = self._buscar_documento_api(numero_processo, tipo.tipo_store, url_api)
+            return tipo.processar(url_api, *resposta)
                 
         except Exception as e:
-            self.logger.error(f"Erro ao acessar despacho de admissibilidade: {e}")
+            self.logger.error(f"Erro ao acessar {tipo.nome}: {e}")
             return {"sucesso": False, "erro": str(e)}
 
-    def acessar_airr(self, numero_processo):
-        """Acessar AIRR (Agravo de Instrumento em Recurso de Revista) via API específica (original mantido)"""
+    async def acessar_documento_api_async(self, documento, numero_processo):
+        """Versão assíncrona de `acessar_documento_api` (httpx, direto no event loop)"""
+        tipo = DOCUMENTOS_API[documento]
         try:
-            self.logger.info(f"Acessando AIRR do processo: {numero_processo}")
+            self.logger.info(f"Acessando {tipo.nome} do processo: {numero_processo}")
             
             if not self.logged_in:
                 return {"sucesso": False, "erro": "Precisa fazer login primeiro"}
             
-            # URL da API para petições AIRR
-            url_api = f"https://btv-servicos.tst.jus.br/pecas/api/v1/processos/{numero_processo}/peticoesAIRR/todos"
-            
-            # Fazer requisição para a API
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-                'Accept': 'application/json, text/plain, */*',
-                'Referer': 'https://bemtevi.tst.jus.br/',
-            }
-            
-            response = self.session.get(url_api, headers=headers, timeout=30)
-            
-            if response.status_code == 200:
-                try:
-                    dados = response.json()
-                    
-                    if dados and len(dados) > 0:
-                        # Se há múltiplas petições AIRR, juntar todas
-                        conteudo_completo = ""
-                        
-                        if isinstance(dados, list):
-                            for i, airr in enumerate(dados):
-                                conteudo_completo += f"\n\n=== AIRR {i+1} ===\n"
-                                if isinstance(airr, dict):
-                                    texto_airr = airr.get('texto', '') or airr.get('conteudo', '') or airr.get('peticao', '')
-                                    if not texto_airr:
-                                        texto_airr = json.dumps(airr, indent=2, ensure_ascii=False)
-                                    conteudo_completo += texto_airr
-                                else:
-                                    conteudo_completo += str(airr)
-                        else:
-                            if isinstance(dados, dict):
-                                conteudo_completo = dados.get('texto', '') or dados.get('conteudo', '') or dados.get('peticao', '')
-                                if not conteudo_completo:
-                                    conteudo_completo = json.dumps(dados, indent=2, ensure_ascii=False)
-                            else:
-                                conteudo_completo = str(dados)
-                        
-                        self.logger.info(f"AIRR extraído: {len(conteudo_completo)} caracteres")
-                        
-                        return {
-                            "sucesso": True,
-                            "tipo": "AIRR - Agravo de Instrumento em Recurso de Revista",
-                            "conteudo_completo": conteudo_completo,
-                            "dados_estruturados": dados,
-                            "tamanho_conteudo": len(conteudo_completo),
-                            "url_api": url_api,
-                            "total_airr": len(dados) if isinstance(dados, list) else 1,
-                            "metodo_extracao": "API BemTevi - Petições AIRR"
-                        }
-                    else:
-                        return {
-                            "sucesso": False,
-                            "erro": "Nenhuma petição AIRR encontrada"
-                        }
-                        
-                except json.JSONDecodeError as e:
-                    # Se não for JSON, tratar como texto
-                    conteudo_texto = response.text
-                    if len(conteudo_texto) > 50:
-                        return {
-                            "sucesso": True,
-                            "tipo": "AIRR - Agravo de Instrumento em Recurso de Revista",
-                            "conteudo_completo": conteudo_texto,
-                            "tamanho_conteudo": len(conteudo_texto),
-                            "url_api": url_api,
-                            "metodo_extracao": "API BemTevi - Resposta texto"
-                        }
-                    else:
-                        return {"sucesso": False, "erro": f"Erro ao processar JSON: {e}"}
-            else:
-                return {
-                    "sucesso": False,
-                    "erro": f"Erro na API: HTTP {response.status_code} - {response.text[:200]}"
-                }
+            url_api = tipo.url(numero_processo)
+            resposta = await self._buscar_documento_api_async(numero_processo, tipo.tipo_store, url_api)
+            # json.loads de respostas de vários MB: fora do event loop
+            return await asyncio.get_running_loop().run_in_executor(None, tipo.processar, url_api, *resposta)
                 
         except Exception as e:
-            self.logger.error(f"Erro ao acessar AIRR: {e}")
+            self.logger.error(f"Erro ao acessar {tipo.nome}: {e}")
             return {"sucesso": False, "erro": str(e)}
 
+    def acessar_despacho_admissibilidade(self, numero_processo):
+        """Acessar despacho de admissibilidade via API específica"""
+        return self.acessar_documento_api("despacho", numero_processo)
+
+    async def acessar_despacho_admissibilidade_async(self, numero_processo):
+        return await self.acessar_documento_api_async("despacho", numero_processo)
+
+    def acessar_airr(self, numero_processo):
+        """Acessar AIRR (Agravo de Instrumento em Recurso de Revista) via API específica"""
+        return self.acessar_documento_api("airr", numero_processo)
+
+    async def acessar_airr_async(self, numero_processo):
+        return await self.acessar_documento_api_async("airr", numero_processo)
+
+    @medido("fase", "navegacao.peca_clique")
     def acessar_peca(self, indice_peca):
         """Acessar uma peça específica e extrair TODO o conteúdo (original mantido)"""
         try:
             self.logger.info(f"Acessando peça índice {indice_peca}")
             
-            time.sleep(2)
+            from selenium.webdriver.common.by import By
             
-            linhas_tabela = self.driver.find_elements(By.XPATH, "//table//tr[td]")
+            linhas_tabela = self.espera.elementos_presentes(By.XPATH, "//table//tr[td]", "peca.tabela")
             
             if indice_peca >= len(linhas_tabela):
                 return {
@@ -557,46 +826,21 @@ class BemTeviClient:
                 
                 self.logger.info(f"Clicando no link da peça: {tipo_peca}")
                 
+                janelas_antes = len(self.driver.window_handles)
+                url_antes = self.driver.current_url
+                limitador_taxa.aguardar(url_antes, "navegador")  # O clique carrega a peça
                 link_conteudo.click()
-                time.sleep(4)
                 
-                janelas_antes = len(self.driver.window_handles)
-                if janelas_antes > 1:
+                # Link pode abrir nova aba ou navegar na mesma janela
+                self.espera.aguardar(
+                    lambda d: len(d.window_handles) > janelas_antes or d.current_url != url_antes,
+                    "peca.abertura"
+                )
+                if len(self.driver.window_handles) > janelas_antes:
                     self.driver.switch_to.window(self.driver.window_handles[-1])
-                    time.sleep(3)
-                
-                # Estratégias múltiplas para extrair conteúdo
-                conteudo_completo = ""
-                
-                # Estratégia 1: Procurar elementos específicos de documento
-                try:
-                    elementos_documento = self.driver.find_elements(By.XPATH, 
-                        "//div[@class='documento'] | //div[@class='conteudo'] | //div[@class='texto'] | "
-                        "//div[contains(@class, 'documento')] | //div[contains(@class, 'conteudo')] | "
-                        "//div[contains(@class, 'texto')] | //pre | //div[@id='documento'] | "
-                        "//div[@id='conteudo'] | //article | //main"
-                    )
-                    
-                    if elementos_documento:
-                        conteudo_partes = []
-                        for elem in elementos_documento:
-                            texto = elem.text.strip()
-                            if texto and len(texto) > 50:
-                                conteudo_partes.append(texto)
-                        
-                        if conteudo_partes:
-                            conteudo_completo = "\n\n".join(conteudo_partes)
-                
-                except Exception as e:
-                    self.logger.warning(f"Estratégia 1 falhou: {e}")
+                self.espera.pagina_pronta("peca.documento")
                 
-                # Estratégia 2: Body completo
-                if not conteudo_completo or len(conteudo_completo) < 100:
-                    try:
-                        body_element = self.driver.find_element(By.TAG_NAME, "body")
-                        conteudo_completo = body_element.text.strip()
-                    except Exception as e:
-                        self.logger.warning(f"Estratégia 2 falhou: {e}")
+                conteudo_completo = self._extrair_conteudo_documento()
                 
                 # Voltar para janela original
                 if len(self.driver.window_handles) > 1:
@@ -644,6 +888,159 @@ class BemTeviClient:
             self.logger.error(f"Erro ao acessar peça: {e}")
             return {"sucesso": False, "erro": str(e)}
 
+    @medido("fase", "dom.documento")
+    def _extrair_conteudo_documento(self):
+        """Extrair o texto do documento aberto na janela atual (estratégias múltiplas)"""
+        from selenium.webdriver.common.by import By
+        
+        conteudo_completo = ""
+        
+        # Estratégia 1: Procurar elementos específicos de documento
+        try:
+            with self.espera.sem_espera_implicita():
+                elementos_documento = self.driver.find_elements(By.XPATH, 
+                    "//div[@class='documento'] | //div[@class='conteudo'] | //div[@class='texto'] | "
+                    "//div[contains(@class, 'documento')] | //div[contains(@class, 'conteudo')] | "
+                    "//div[contains(@class, 'texto')] | //pre | //div[@id='documento'] | "
+                    "//div[@id='conteudo'] | //article | //main"
+                )
+            
+            if elementos_documento:
+                conteudo_partes = []
+                for elem in elementos_documento:
+                    texto = elem.text.strip()
+                    if texto and len(texto) > 50:
+                        conteudo_partes.append(texto)
+                
+                if conteudo_partes:
+                    conteudo_completo = "\n\n".join(conteudo_partes)
+        
+        except Exception as e:
+            self.logger.warning(f"Estratégia 1 falhou: {e}")
+        
+        # Estratégia 2: Body completo
+        if not conteudo_completo or len(conteudo_completo) < 100:
+            try:
+                body_element = self.driver.find_element(By.TAG_NAME, "body")
+                conteudo_completo = body_element.text.strip()
+            except Exception as e:
+                self.logger.warning(f"Estratégia 2 falhou: {e}")
+        
+        return conteudo_completo
+
+    HEADERS_PECA = {'Accept': 'text/html,application/xhtml+xml,application/pdf;q=0.9,*/*;q=0.8'}
+
+    def _processar_peca_http(self, peca, status_code, dados, content_type, url_final):
+        """Montar o resultado da peça baixada por HTTP (mesmo formato de acessar_peca)"""
+        if status_code != 200:
+            return {"sucesso": False, "erro": f"Erro HTTP {status_code}", "status_http": status_code}
+        if "login" in url_final.lower():
+            # Redirecionado para o login: sessão do requests/httpx não vale para o link
+            return {"sucesso": False, "erro": "Sessão não autorizada para o link da peça", "status_http": 401}
+        
+        texto, formato = extrair_texto(dados, content_type)
+        if not texto or len(texto) <= 50:
+            return {
+                "sucesso": False,
+                "erro": f"Conteúdo {formato} sem texto extraível fora do navegador",
+                "formato": formato
+            }
+        return {
+            "sucesso": True,
+            "tipo": peca.get("tipo", ""),
+            "data": peca.get("data", ""),
+            "conteudo_completo": texto,
+            "tamanho_conteudo": len(texto),
+            "url_atual": url_final,
+            "formato": formato,
+            "metodo_extracao": f"Download HTTP ({formato.upper()}) - conteúdo completo extraído"
+        }
+
+    @medido("fase", "http.peca")
+    def baixar_peca(self, peca):
+        """Baixar a peça pelo href com a sessão autenticada (sem navegador)
+
+        HTML é convertido em texto com as mesmas estratégias de
+        `_extrair_conteudo_documento`; PDF usa pypdf quando instalado.
+        """
+        href = peca.get("href", "")
+        if not href.startswith("http"):
+            return {"sucesso": False, "erro": "Peça sem link direto"}
+        try:
+            self.logger.info(f"Baixando peça {peca.get('indice')} por HTTP")
+            response = resiliencia_api.get(
+                "peca", href, lambda timeout: self.session.get(href, headers=self.HEADERS_PECA, timeout=timeout)
+            )
+            return self._processar_peca_http(
+                peca, response.status_code, response.content,
+                response.headers.get("Content-Type", ""), response.url
+            )
+        except ApiIndisponivel as e:
+            return {"sucesso": False, "erro": str(e), "indisponivel": True}
+        except Exception as e:
+            self.logger.error(f"Erro ao baixar peça: {e}")
+            return {"sucesso": False, "erro": str(e)}
+
+    @medido("fase", "http.peca")
+    async def baixar_peca_async(self, peca):
+        """Versão assíncrona de `baixar_peca` (httpx, direto no event loop)
+
+        Só a transferência fica no event loop: a extração do texto (HTML,
+        pypdf) de peças de vários MB roda numa thread do executor.
+        """
+        href = peca.get("href", "")
+        if not href.startswith("http"):
+            return {"sucesso": False, "erro": "Peça sem link direto"}
+        try:
+            self.logger.info(f"Baixando peça {peca.get('indice')} por HTTP")
+            response = await resiliencia_api.get_async(
+                "peca", href, lambda timeout: self._http().get(href, headers=self.HEADERS_PECA, timeout=timeout, follow_redirects=True)
+            )
+            return await asyncio.get_running_loop().run_in_executor(
+                None, self._processar_peca_http,
+                peca, response.status_code, response.content,
+                response.headers.get("Content-Type", ""), str(response.url)
+            )
+        except ApiIndisponivel as e:
+            return {"sucesso": False, "erro": str(e), "indisponivel": True}
+        except Exception as e:
+            self.logger.error(f"Erro ao baixar peça: {e}")
+            return {"sucesso": False, "erro": str(e)}
+
+    @medido("fase", "navegacao.peca_link")
+    def acessar_peca_por_href(self, peca):
+        """Acessar peça navegando direto ao href já listado (sem recarregar a página do processo)"""
+        try:
+            href = peca.get("href", "")
+            if not href.startswith("http"):
+                return {"sucesso": False, "erro": "Peça sem link direto"}
+            
+            self.logger.info(f"Acessando peça {peca.get('indice')} pelo link direto")
+            limitador_taxa.aguardar(href, "navegador")
+            self.driver.get(href)
+            self.espera.pagina_pronta("peca.documento")
+            
+            conteudo_completo = self._extrair_conteudo_documento()
+            
+            if conteudo_completo and len(conteudo_completo) > 50:
+                return {
+                    "sucesso": True,
+                    "tipo": peca.get("tipo", ""),
+                    "data": peca.get("data", ""),
+                    "conteudo_completo": conteudo_completo,
+                    "tamanho_conteudo": len(conteudo_completo),
+                    "url_atual": self.driver.current_url,
+                    "metodo_extracao": "Link direto - conteúdo completo extraído"
+                }
+            return {
+                "sucesso": False,
+                "erro": "Não foi possível extrair conteúdo significativo da peça"
+            }
+            
+        except Exception as e:
+            self.logger.error(f"Erro ao acessar peça pelo link: {e}")
+            return {"sucesso": False, "erro": str(e)}
+
     def fechar_navegador(self):
         """Fechar navegador"""
         try:
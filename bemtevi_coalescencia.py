@@ -0,0 +1,56 @@
+import asyncio
+from bemtevi_metricas import metricas
+
+
+class VooUnico:
+    """Coalescência de chamadas idênticas simultâneas (single-flight)
+
+    A primeira chamada com uma chave (operação + argumentos) executa a
+    operação numa tarefa própria; as que chegam enquanto ela está em andamento
+    aguardam a mesma tarefa em vez de repetir a requisição ou a navegação.
+    Quem desiste (cancelamento) não cancela a operação para os demais; quando
+    o último interessado desiste, a operação é cancelada (ex.: busca
+    antecipada abandonada não segue ocupando a rede). O resultado é compartilhado entre todos: deve ser tratado como somente
+    leitura. Concluída a tarefa, a chave sai da tabela; chamadas posteriores
+    dependem do cache/store, não daqui.
+    """
+
+    def __init__(self):
+        self._em_voo = {}  # chave -> asyncio.Task
+        self._aguardando = {}  # asyncio.Task -> chamadas ainda interessadas no resultado
+
+    async def executar(self, chave, funcao, *args):
+        """Executar `funcao(*args)` (corrotina) ou aguardar a execução idêntica em andamento"""
+        operacao = chave[0]
+        tarefa = self._em_voo.get(chave)
+        if tarefa is None:
+            tarefa = asyncio.create_task(funcao(*args), name=f"voo_unico:{operacao}")
+            self._em_voo[chave] = tarefa
+            tarefa.add_done_callback(lambda concluida: self._concluir(chave, concluida))
+            metricas.contar("coalescencia", f"{operacao}.executada")
+        else:
+            metricas.contar("coalescencia", f"{operacao}.compartilhada")
+        self._aguardando[tarefa] = self._aguardando.get(tarefa, 0) + 1
+        try:
+            return await asyncio.shield(tarefa)
+        except asyncio.CancelledError:
+            if not tarefa.done() and self._aguardando[tarefa] == 1:
+                tarefa.cancel()  # Ninguém mais espera por ela
+            raise
+        finally:
+            self._aguardando[tarefa] -= 1
+            if not self._aguardando[tarefa]:
+                del self._aguardando[tarefa]
+
+    def _concluir(self, chave, tarefa):
+        if self._em_voo.get(chave) is tarefa:
+            del self._em_voo[chave]
+        if not tarefa.cancelled():
+            tarefa.exception()  # Marca a exceção como lida se todos os interessados desistiram
+
+    def em_voo(self):
+        """Operações em andamento, por nome de operação"""
+        contagem = {}
+        for chave in self._em_voo:
+            contagem[chave[0]] = contagem.get(chave[0], 0) + 1
+        return contagem
@@ -0,0 +1,130 @@
+import io
+import logging
+import re
+from html.parser import HTMLParser
+
+try:
+    from pypdf import PdfReader
+except ImportError:  # Sem pypdf, peças em PDF continuam pelo navegador
+    PdfReader = None
+
+logger = logging.getLogger(__name__)
+
+TAGS_VAZIAS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+TAGS_BLOCO = {"p", "div", "br", "tr", "li", "h1", "h2", "h3", "h4", "h5", "h6", "pre", "article", "main", "section", "table"}
+TAGS_IGNORADAS = {"script", "style", "noscript", "head", "title"}
+CLASSES_DOCUMENTO = ("documento", "conteudo", "texto")
+
+
+class _ExtratorTextoHTML(HTMLParser):
+    """Separa o texto dos contêineres de documento do texto da página inteira
+
+    Espelha as estratégias de BemTeviClient._extrair_conteudo_documento: div
+    com classe/id documento/conteudo/texto, pre, article e main; o body
+    completo fica como alternativa.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self._pilha = []  # (tag, é_contêiner, é_ignorada)
+        self._conteineres_abertos = 0
+        self._ignoradas_abertas = 0
+        self.texto_pagina = []
+        self.texto_documento = []
+
+    @staticmethod
+    def _eh_conteiner(tag, atributos):
+        if tag in ("pre", "article", "main"):
+            return True
+        if tag != "div":
+            return False
+        classes = (atributos.get("class") or "").lower()
+        identificador = (atributos.get("id") or "").lower()
+        return identificador in ("documento", "conteudo") or any(c in classes for c in CLASSES_DOCUMENTO)
+
+    def _quebra(self):
+        self.texto_pagina.append("\n")
+        if self._conteineres_abertos:
+            self.texto_documento.append("\n")
+
+    def handle_starttag(self, tag, attrs):
+        if tag in TAGS_BLOCO:
+            self._quebra()
+        if tag in TAGS_VAZIAS:
+            return
+        conteiner = self._eh_conteiner(tag, dict(attrs))
+        ignorada = tag in TAGS_IGNORADAS
+        self._pilha.append((tag, conteiner, ignorada))
+        self._conteineres_abertos += conteiner
+        self._ignoradas_abertas += ignorada
+
+    def handle_endtag(self, tag):
+        if tag in TAGS_BLOCO:
+            self._quebra()
+        if not any(aberta == tag for aberta, _, _ in self._pilha):
+            return  # Fechamento sem abertura (HTML malformado)
+        while self._pilha:
+            aberta, conteiner, ignorada = self._pilha.pop()
+            self._conteineres_abertos -= conteiner
+            self._ignoradas_abertas -= ignorada
+            if aberta == tag:
+                break
+
+    def handle_data(self, data):
+        if self._ignoradas_abertas:
+            return
+        self.texto_pagina.append(data)
+        if self._conteineres_abertos:
+            self.texto_documento.append(data)
+
+
+def _normalizar(partes):
+    texto = "".join(partes)
+    texto = re.sub(r"[ \t\r\f\v]+", " ", texto)
+    texto = re.sub(r" ?\n ?", "\n", texto)
+    return re.sub(r"\n{3,}", "\n\n", texto).strip()
+
+
+def extrair_texto_html(html):
+    """Texto do documento numa página HTML (contêineres de documento ou body inteiro)"""
+    extrator = _ExtratorTextoHTML()
+    extrator.feed(html)
+    extrator.close()
+    documento = _normalizar(extrator.texto_documento)
+    if len(documento) >= 100:
+        return documento
+    return _normalizar(extrator.texto_pagina)
+
+
+def extrair_texto_pdf(dados):
+    """Texto de um PDF (None se pypdf não estiver instalado ou o PDF for ilegível)"""
+    if PdfReader is None:
+        logger.info("pypdf não instalado: PDF será lido pelo navegador")
+        return None
+    try:
+        leitor = PdfReader(io.BytesIO(dados))
+        return "\n\n".join((pagina.extract_text() or "").strip() for pagina in leitor.pages).strip()
+    except Exception as e:
+        logger.warning(f"Erro ao extrair texto do PDF: {e}")
+        return None
+
+
+def _decodificar(dados, content_type):
+    """Bytes -> str pelo charset do Content-Type (UTF-8 na falta dele)"""
+    charset = re.search(r"charset=[\"']?([\w.:-]+)", content_type)
+    try:
+        return dados.decode(charset.group(1) if charset else "utf-8", errors="replace")
+    except LookupError:
+        return dados.decode("utf-8", errors="replace")
+
+
+def extrair_texto(dados, content_type=""):
+    """Extrair texto de um corpo HTTP; retorna (texto, formato) ou (None, formato)"""
+    content_type = (content_type or "").lower()
+    if "pdf" in content_type or dados[:5] == b"%PDF-":
+        return extrair_texto_pdf(dados), "pdf"
+
+    texto = _decodificar(dados, content_type)
+    if "html" in content_type or "<html" in texto[:2000].lower():
+        return extrair_texto_html(texto), "html"
+    return texto.strip(), "texto"
@@ -0,0 +1,139 @@
+import json
+import logging
+from bemtevi_http import URL_SERVICOS
+
+logger = logging.getLogger(__name__)
+
+
+class TipoDocumentoApi:
+    """Endpoint de documento da API btv-servicos (uma entrada de DOCUMENTOS_API)
+
+    - chave: nome curto nas ferramentas, no índice de texto e na busca antecipada;
+    - caminho: sufixo da URL depois de /pecas/api/v1/processos/{numero}/;
+    - tipo_store: chave no store local e endpoint na ResilienciaApi (timeout, circuito);
+    - campos_texto: campos JSON com o texto, em ordem de preferência;
+    - rotulo_item: com ele, todos os itens da lista são juntados em seções
+      "=== {rotulo_item} n ===" e a quantidade vai em `campo_total`; sem ele,
+      só o primeiro item é usado.
+    """
+
+    def __init__(self, chave, nome, titulo, caminho, tipo_store, campos_texto, extracao, vazio,
+                 rotulo_item=None, campo_total=None):
+        self.chave = chave
+        self.nome = nome
+        self.titulo = titulo
+        self.caminho = caminho
+        self.tipo_store = tipo_store
+        self.campos_texto = campos_texto
+        self.extracao = extracao
+        self.vazio = vazio
+        self.rotulo_item = rotulo_item
+        self.campo_total = campo_total
+
+    def url(self, numero_processo):
+        return f"{URL_SERVICOS}/pecas/api/v1/processos/{numero_processo}/{self.caminho}"
+
+    def _texto_item(self, item):
+        if not isinstance(item, dict):
+            return str(item)
+        texto = next((item[campo] for campo in self.campos_texto if item.get(campo)), "")
+        return texto or json.dumps(item, indent=2, ensure_ascii=False)
+
+    def _texto(self, dados):
+        if not isinstance(dados, list):
+            return self._texto_item(dados)
+        if not self.rotulo_item:
+            return self._texto_item(dados[0])
+        return "".join(f"\n\n=== {self.rotulo_item} {i + 1} ===\n{self._texto_item(item)}" for i, item in enumerate(dados))
+
+    def processar(self, url_api, status_code, texto_resposta, origem):
+        """Montar o resultado a partir da resposta da API (JSON ou, se não for JSON, texto)"""
+        if status_code != 200:
+            return {
+                "sucesso": False,
+                "erro": f"Erro na API: HTTP {status_code} - {texto_resposta[:200]}",
+                "status_http": status_code
+            }
+        try:
+            dados = json.loads(texto_resposta)
+        except json.JSONDecodeError as e:
+            if len(texto_resposta) <= 50:
+                return {"sucesso": False, "erro": f"Erro ao processar JSON: {e}"}
+            return {
+                "sucesso": True,
+                "documento": self.chave,
+                "tipo": self.nome,
+                "conteudo_completo": texto_resposta,
+                "tamanho_conteudo": len(texto_resposta),
+                "url_api": url_api,
+                "metodo_extracao": f"API BemTevi - Resposta texto{origem}"
+            }
+        if not dados:
+            # Documento ainda não juntado ao processo: resposta definitiva, não falha de rede
+            return {"sucesso": False, "erro": self.vazio, "inexistente": True}
+
+        conteudo = self._texto(dados)
+        logger.info(f"{self.nome} extraído: {len(conteudo)} caracteres")
+        resultado = {
+            "sucesso": True,
+            "documento": self.chave,
+            "tipo": self.nome,
+            "conteudo_completo": conteudo,
+            "dados_estruturados": dados,
+            "tamanho_conteudo": len(conteudo),
+            "url_api": url_api,
+            "metodo_extracao": f"API BemTevi - {self.extracao}{origem}"
+        }
+        if self.campo_total:
+            resultado[self.campo_total] = len(dados) if isinstance(dados, list) else 1
+        return resultado
+
+    def total(self, resultado):
+        """Quantidade de itens juntados (1 quando o endpoint devolve um só documento)"""
+        return resultado.get(self.campo_total, 1) if self.campo_total else 1
+
+    def titulo_indice(self, resultado):
+        """Título do documento no índice de texto"""
+        return f"{self.titulo} ({self.total(resultado)})" if self.campo_total else self.titulo
+
+    def resumo(self, resultado):
+        """Resumo de uma linha do documento obtido (lote, dossiê)"""
+        resumo = f"{resultado.get('tamanho_conteudo', 0)} caracteres"
+        if self.campo_total:
+            resumo += f" em {self.total(resultado)} {self.rotulo_item}"
+        return resumo
+
+
+# Registro dos documentos da API, na ordem em que aparecem no dossiê.
+# Um novo endpoint é só mais uma entrada aqui
+DOCUMENTOS_API = {}
+
+
+def registrar_documento(tipo):
+    DOCUMENTOS_API[tipo.chave] = tipo
+    return tipo
+
+
+registrar_documento(TipoDocumentoApi(
+    chave="despacho",
+    nome="Despacho de Admissibilidade",
+    titulo="Despacho de admissibilidade",
+    caminho="decisoes-admissao/todos",
+    tipo_store="despacho_admissibilidade",
+    campos_texto=("texto", "conteudo", "decisao"),
+    extracao="Despachos de Admissão",
+    vazio="Nenhum despacho de admissibilidade encontrado",
+))
+
+registrar_documento(TipoDocumentoApi(
+    chave="airr",
+    nome="AIRR - Agravo de Instrumento em Recurso de Revista",
+    titulo="AIRR",
+    caminho="peticoesAIRR/todos",
+    tipo_store="airr",
+    campos_texto=("texto", "conteudo", "peticao"),
+    extracao="Petições AIRR",
+    vazio="Nenhuma petição AIRR encontrada",
+    rotulo_item="AIRR",
+    campo_total="total_airr",
+))
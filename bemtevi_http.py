@@ -0,0 +1,108 @@
+import asyncio
+import importlib.util
+import logging
+import os
+from urllib.parse import urlsplit
+
+# httpx (e h2) só são importados ao criar o primeiro ClienteApiAsync; aqui basta
+# saber se estão instalados. Sem httpx as chamadas de API continuam pelo requests (faixa 'api')
+HTTPX_INSTALADO = importlib.util.find_spec("httpx") is not None
+HTTP2_DISPONIVEL = importlib.util.find_spec("h2") is not None  # habilita HTTP/2 no httpx
+
+
+# Endereços do BemTevi e da API btv-servicos (configuráveis para apontar a um servidor local de testes)
+URL_BEMTEVI = os.getenv("BEMTEVI_URL", "https://bemtevi.tst.jus.br").rstrip("/")
+URL_SERVICOS = os.getenv("BEMTEVI_SERVICOS_URL", "https://btv-servicos.tst.jus.br").rstrip("/")
+
+HEADERS_API = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+    'Accept': 'application/json, text/plain, */*',
+    'Referer': f'{URL_BEMTEVI}/',
+}
+
+
+def http_assincrono_disponivel():
+    return HTTPX_INSTALADO
+
+
+class ClienteApiAsync:
+    """Transporte HTTP assíncrono para a API btv-servicos (e demais hosts do BemTevi)
+
+    Mantém um httpx.AsyncClient por host, cada um com seu próprio pool
+    keep-alive e limite de conexões, e HTTP/2 quando o pacote `h2` está
+    instalado. Headers fixos são montados uma única vez; os cookies da sessão
+    autenticada vão num header Cookie sem domínio, como no requests.Session.
+    """
+
+    def __init__(self, cookies=None):
+        if not HTTPX_INSTALADO:
+            raise RuntimeError("httpx não instalado: transporte assíncrono indisponível")
+        import httpx
+        self._httpx = httpx
+        self.logger = logging.getLogger(__name__)
+        self.limites = httpx.Limits(
+            max_connections=int(os.getenv("BEMTEVI_HTTP_MAX_CONEXOES", "20")),
+            max_keepalive_connections=int(os.getenv("BEMTEVI_HTTP_KEEPALIVE", "10")),
+            keepalive_expiry=float(os.getenv("BEMTEVI_HTTP_KEEPALIVE_EXPIRY", "30")),
+        )
+        self.timeout = httpx.Timeout(
+            float(os.getenv("BEMTEVI_HTTP_TIMEOUT", "30")),
+            connect=float(os.getenv("BEMTEVI_HTTP_CONNECT_TIMEOUT", "10")),
+        )
+        self._clientes = {}  # host -> httpx.AsyncClient
+        self._loop = None    # Event loop dos AsyncClient (para fechar a partir de outra thread)
+        self._headers = dict(HEADERS_API)
+        self.atualizar_cookies(cookies or {})
+
+    def atualizar_cookies(self, cookies):
+        """Definir os cookies da sessão ({nome: valor})"""
+        headers = dict(HEADERS_API)
+        if cookies:
+            headers['Cookie'] = "; ".join(f"{nome}={valor}" for nome, valor in cookies.items())
+        self._headers = headers
+        for cliente in self._clientes.values():
+            cliente.headers = headers
+
+    def _cliente(self, url):
+        """AsyncClient do host da URL (criado sob demanda, reaproveitado entre chamadas)"""
+        host = urlsplit(url).netloc
+        cliente = self._clientes.get(host)
+        if cliente is None:
+            self._loop = asyncio.get_running_loop()
+            cliente = self._httpx.AsyncClient(
+                headers=self._headers,
+                limits=self.limites,
+                timeout=self.timeout,
+                http2=HTTP2_DISPONIVEL,
+            )
+            self._clientes[host] = cliente
+            self.logger.info(f"Pool HTTP criado para {host} (HTTP/2: {'sim' if HTTP2_DISPONIVEL else 'não'})")
+        return cliente
+
+    async def get(self, url, headers=None, timeout=None, follow_redirects=False):
+        """GET assíncrono; `headers` complementa os headers fixos da sessão
+
+        `timeout` (segundos) substitui o de leitura; o de conexão é mantido.
+        """
+        kwargs = {"headers": headers} if headers else {}
+        if timeout is not None:
+            kwargs["timeout"] = self._httpx.Timeout(timeout, connect=min(self.timeout.connect, timeout))
+        return await self._cliente(url).get(url, follow_redirects=follow_redirects, **kwargs)
+
+    async def fechar(self):
+        clientes = list(self._clientes.values())
+        self._clientes.clear()
+        for cliente in clientes:
+            await cliente.aclose()
+
+    def descartar(self):
+        """Fechar os pools HTTP a partir de qualquer thread (ex.: cliente reciclado numa faixa)"""
+        if not self._clientes or self._loop is None or self._loop.is_closed():
+            return
+        try:
+            if asyncio.get_running_loop() is self._loop:
+                self._loop.create_task(self.fechar())
+                return
+        except RuntimeError:
+            pass  # Fora do event loop (thread do agendador)
+        asyncio.run_coroutine_threadsafe(self.fechar(), self._loop)
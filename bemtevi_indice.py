@@ -0,0 +1,184 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from bemtevi_metricas import medido
+
+
+class IndiceTexto:
+    """Índice local de texto completo (SQLite FTS5) dos documentos já obtidos
+
+    Cada documento (peça, despacho ou AIRR) é identificado por
+    (numero_processo, tipo, doc_id), como no store. A indexação é incremental:
+    um documento só é reescrito no índice quando o hash do texto muda. A busca
+    ordena por BM25 e devolve trechos destacados, sem nenhuma chamada ao
+    BemTevi. Acentos são ignorados na busca ("sumula" encontra "Súmula").
+    """
+
+    def __init__(self, caminho=None):
+        self.caminho = caminho or os.getenv(
+            "BEMTEVI_INDICE_PATH", os.path.join(os.getcwd(), "cache", "bemtevi_indice.sqlite3")
+        )
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+
+        diretorio = os.path.dirname(self.caminho)
+        if diretorio and not os.path.exists(diretorio):
+            os.makedirs(diretorio)
+
+        self._conexao = sqlite3.connect(self.caminho, check_same_thread=False)
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.execute("PRAGMA synchronous=NORMAL")
+        try:
+            self._conexao.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS textos USING fts5(
+                    titulo, conteudo, tokenize = 'unicode61 remove_diacritics 2'
+                )
+            """)
+            self.disponivel = True
+        except sqlite3.OperationalError as e:
+            self.logger.warning(f"SQLite sem FTS5; busca de texto desativada: {e}")
+            self.disponivel = False
+        self._conexao.execute("""
+            CREATE TABLE IF NOT EXISTS documentos_indexados (
+                numero_processo TEXT NOT NULL,
+                tipo TEXT NOT NULL,
+                doc_id TEXT NOT NULL,
+                id_texto INTEGER NOT NULL,
+                hash TEXT NOT NULL,
+                tamanho INTEGER NOT NULL,
+                indexado_em REAL NOT NULL,
+                PRIMARY KEY (numero_processo, tipo, doc_id)
+            )
+        """)
+        self._conexao.commit()
+        self.logger.info(f"Índice de texto em {self.caminho}")
+
+    @medido("fase", "indexacao")
+    def indexar(self, numero_processo, tipo, doc_id, titulo, conteudo):
+        """Indexar (ou reindexar, se o texto mudou) um documento; retorna True se escreveu"""
+        if not self.disponivel or not conteudo:
+            return False
+        hash_texto = hashlib.sha1(conteudo.encode("utf-8")).hexdigest()
+        with self._lock:
+            linha = self._conexao.execute(
+                "SELECT id_texto, hash FROM documentos_indexados "
+                "WHERE numero_processo = ? AND tipo = ? AND doc_id = ?",
+                (numero_processo, tipo, doc_id)
+            ).fetchone()
+            if linha and linha[1] == hash_texto:
+                return False
+            if linha:
+                self._conexao.execute("DELETE FROM textos WHERE rowid = ?", (linha[0],))
+            id_texto = self._conexao.execute(
+                "INSERT INTO textos (titulo, conteudo) VALUES (?, ?)", (titulo, conteudo)
+            ).lastrowid
+            self._conexao.execute(
+                "INSERT OR REPLACE INTO documentos_indexados "
+                "(numero_processo, tipo, doc_id, id_texto, hash, tamanho, indexado_em) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (numero_processo, tipo, doc_id, id_texto, hash_texto, len(conteudo), time.time())
+            )
+            self._conexao.commit()
+        return True
+
+    @staticmethod
+    def _consulta_literal(consulta):
+        """Cada palavra entre aspas: números de processo, pontuação etc. viram termos simples"""
+        return " ".join('"' + termo.replace('"', '""') + '"' for termo in consulta.split())
+
+    @medido("fase", "busca_texto")
+    def buscar(self, consulta, limite=20, numero_processo=None, tipo=None):
+        """Documentos que casam com a consulta, do mais ao menos relevante
+
+        A consulta aceita a sintaxe FTS5 (AND, OR, NOT, "frase", prefixo*);
+        se ela for inválida, cada palavra é buscada literalmente.
+        """
+        if not self.disponivel or not consulta.strip():
+            return []
+        sql = (
+            "SELECT d.numero_processo, d.tipo, d.doc_id, textos.titulo, "
+            "snippet(textos, 1, '**', '**', ' … ', 24), bm25(textos) "
+            "FROM textos JOIN documentos_indexados d ON d.id_texto = textos.rowid "
+            "WHERE textos MATCH ?"
+        )
+        filtros = []
+        if numero_processo:
+            sql += " AND d.numero_processo = ?"
+            filtros.append(numero_processo)
+        if tipo:
+            sql += " AND d.tipo = ?"
+            filtros.append(tipo)
+        sql += " ORDER BY bm25(textos) LIMIT ?"
+
+        with self._lock:
+            try:
+                linhas = self._conexao.execute(sql, [consulta] + filtros + [limite]).fetchall()
+            except sqlite3.OperationalError:
+                linhas = self._conexao.execute(
+                    sql, [self._consulta_literal(consulta)] + filtros + [limite]
+                ).fetchall()
+        return [
+            {
+                "numero_processo": numero,
+                "tipo": tipo_doc,
+                "doc_id": doc_id,
+                "titulo": titulo,
+                "trecho": trecho,
+                "relevancia": round(-pontuacao, 4),
+            }
+            for numero, tipo_doc, doc_id, titulo, trecho, pontuacao in linhas
+        ]
+
+    def remover(self, numero_processo=None):
+        """Remover do índice os documentos de um processo (ou todos)"""
+        if not self.disponivel:
+            return 0
+        with self._lock:
+            if numero_processo:
+                self._conexao.execute(
+                    "DELETE FROM textos WHERE rowid IN "
+                    "(SELECT id_texto FROM documentos_indexados WHERE numero_processo = ?)",
+                    (numero_processo,)
+                )
+                removidos = self._conexao.execute(
+                    "DELETE FROM documentos_indexados WHERE numero_processo = ?", (numero_processo,)
+                ).rowcount
+            else:
+                self._conexao.execute("DELETE FROM textos")
+                removidos = self._conexao.execute("DELETE FROM documentos_indexados").rowcount
+            self._conexao.commit()
+        return removidos
+
+    def status(self):
+        with self._lock:
+            documentos, processos, tamanho = self._conexao.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT numero_processo), COALESCE(SUM(tamanho), 0) "
+                "FROM documentos_indexados"
+            ).fetchone()
+        return {
+            "disponivel": self.disponivel,
+            "documentos": documentos,
+            "processos": processos,
+            "caracteres": tamanho,
+            "caminho": self.caminho,
+        }
+
+    def fechar(self):
+        with self._lock:
+            self._conexao.close()
+
+
+_indice_padrao = None
+_indice_lock = threading.Lock()
+
+
+def indice_padrao():
+    """Instância única do índice, compartilhada por todo o processo"""
+    global _indice_padrao
+    with _indice_lock:
+        if _indice_padrao is None:
+            _indice_padrao = IndiceTexto()
+        return _indice_padrao
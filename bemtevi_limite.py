@@ -0,0 +1,159 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+from bemtevi_metricas import metricas
+
+# Padrões por classe de operação: (requisições por segundo, rajada). Taxa 0 = sem limite
+LIMITES_PADRAO = {
+    "api": (5.0, 10),
+    "navegador": (1.0, 3),
+}
+
+
+class BaldeFichas:
+    """Token bucket de um (host, classe) com fila FIFO por reserva de horário
+
+    Implementado como GCRA: cada pedido reserva, sob lock, o próximo horário
+    livre e só então espera. A ordem de chegada é a ordem de liberação (fila
+    justa, sem que um chamador "fure" a fila ao acordar antes) e o mesmo
+    balde atende threads (faixas do agendador) e corrotinas (httpx). Até
+    `rajada` pedidos passam de imediato com o balde cheio; depois, um a cada
+    1/`taxa` segundos.
+    """
+
+    def __init__(self, host, classe, taxa, rajada):
+        self.host = host
+        self.classe = classe
+        self.taxa = taxa
+        self.rajada = max(int(rajada), 1)
+        self._intervalo = 1.0 / taxa if taxa > 0 else 0.0
+        self._tolerancia = (self.rajada - 1) * self._intervalo
+        self._livre_em = 0.0  # Horário teórico de chegada (TAT) do próximo pedido
+        self._lock = threading.Lock()
+        self.liberados = 0
+        self.atrasados = 0
+        self.espera_total = 0.0
+        self.na_fila = 0
+
+    def reservar(self):
+        """Reservar o próximo horário; devolve quantos segundos esperar até ele"""
+        if not self._intervalo:
+            return 0.0
+        with self._lock:
+            agora = time.monotonic()
+            momento = max(agora, self._livre_em - self._tolerancia)
+            self._livre_em = max(self._livre_em, momento) + self._intervalo
+            return momento - agora
+
+    def _registrar(self, espera):
+        with self._lock:
+            self.liberados += 1
+            if espera > 0:
+                self.atrasados += 1
+                self.espera_total += espera
+        rotulo = f"{self.classe}:{self.host}"
+        metricas.observar("limite", rotulo, espera)
+        if espera > 0:
+            metricas.contar("limite", f"{rotulo}.atrasada")
+
+    def aguardar(self):
+        """Esperar a vez (bloqueante, para as faixas do agendador)"""
+        espera = self.reservar()
+        if espera > 0:
+            with self._lock:
+                self.na_fila += 1
+            try:
+                time.sleep(espera)
+            finally:
+                with self._lock:
+                    self.na_fila -= 1
+        self._registrar(espera)
+
+    async def aguardar_async(self):
+        """Esperar a vez sem bloquear o event loop"""
+        espera = self.reservar()
+        if espera > 0:
+            with self._lock:
+                self.na_fila += 1
+            try:
+                await asyncio.sleep(espera)  # Cancelado, o horário reservado fica ocioso (não é devolvido)
+            finally:
+                with self._lock:
+                    self.na_fila -= 1
+        self._registrar(espera)
+
+    def status(self):
+        with self._lock:
+            return {
+                "taxa": self.taxa,
+                "rajada": self.rajada,
+                "liberados": self.liberados,
+                "atrasados": self.atrasados,
+                "espera_total": round(self.espera_total, 3),
+                "na_fila": self.na_fila,
+            }
+
+
+class LimitadorTaxa:
+    """Limite de requisições por host e classe de operação (navegação vs API JSON)
+
+    Cada (host, classe) tem seu BaldeFichas. Taxa e rajada vêm de
+    BEMTEVI_LIMITE_<CLASSE> e BEMTEVI_LIMITE_<CLASSE>_RAJADA (ex.:
+    BEMTEVI_LIMITE_API=5, BEMTEVI_LIMITE_API_RAJADA=10) e podem ser
+    sobrescritas por host em BEMTEVI_LIMITE_HOSTS, no formato
+    "host:classe=taxa/rajada;..." (ex.:
+    "btv-servicos.tst.jus.br:api=8/16;bemtevi.tst.jus.br:navegador=0.5/2").
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._padroes = {
+            classe: (
+                float(os.getenv(f"BEMTEVI_LIMITE_{classe.upper()}", str(taxa))),
+                int(os.getenv(f"BEMTEVI_LIMITE_{classe.upper()}_RAJADA", str(rajada))),
+            )
+            for classe, (taxa, rajada) in LIMITES_PADRAO.items()
+        }
+        self._por_host = self._ler_hosts(os.getenv("BEMTEVI_LIMITE_HOSTS", ""))
+        self._baldes = {}
+        self._lock = threading.Lock()
+
+    def _ler_hosts(self, configuracao):
+        limites = {}
+        for item in filter(None, (parte.strip() for parte in configuracao.split(";"))):
+            try:
+                chave, valor = item.split("=", 1)
+                host, classe = chave.rsplit(":", 1)
+                taxa, _, rajada = valor.partition("/")
+                limites[(host.strip(), classe.strip())] = (float(taxa), int(rajada or 1))
+            except ValueError:
+                self.logger.warning(f"BEMTEVI_LIMITE_HOSTS: item inválido ignorado: {item!r}")
+        return limites
+
+    def balde(self, url, classe):
+        """Balde do host da URL (aceita a URL completa ou só o host) para a classe"""
+        host = urlsplit(url).netloc or url
+        with self._lock:
+            balde = self._baldes.get((host, classe))
+            if balde is None:
+                taxa, rajada = self._por_host.get((host, classe)) or self._padroes.get(classe, (0.0, 1))
+                balde = self._baldes[(host, classe)] = BaldeFichas(host, classe, taxa, rajada)
+            return balde
+
+    def aguardar(self, url, classe):
+        self.balde(url, classe).aguardar()
+
+    async def aguardar_async(self, url, classe):
+        await self.balde(url, classe).aguardar_async()
+
+    def status(self):
+        with self._lock:
+            baldes = dict(self._baldes)
+        return {f"{classe}:{host}": balde.status() for (host, classe), balde in sorted(baldes.items())}
+
+
+# Compartilhado por todos os clientes: o limite é do host, não de cada navegador ou sessão
+limitador_taxa = LimitadorTaxa()
@@ -6,39 +6,623 @@ print(f">>> PYTHON PATH: {sys.executable}", file=sys.stderr)
 print(">>> TENTANDO IMPORTAR BIBLIOTECAS...", file=sys.stderr)
 import os
 import re
+import time
 from typing import Any, Dict
 from mcp.server import Server
 from mcp.types import Tool, TextContent
 import mcp.server.stdio
-from bemtevi_client import BemTeviClient
+from bemtevi_pool import PoolBemTevi
+from bemtevi_client import SessaoRejeitada, identificar_pecas
+from bemtevi_scheduler import Agendador
+from bemtevi_cache import CacheDossies, CacheProcessos
+from bemtevi_documentos_api import DOCUMENTOS_API
+from bemtevi_store import store_padrao
+from bemtevi_indice import indice_padrao
+from bemtevi_auditoria import RegistroAuditoria
+from bemtevi_metricas import medido, metricas
+from bemtevi_prefetch import PrefetchProcessos
+from bemtevi_coalescencia import VooUnico
+from bemtevi_renovacao import RenovadorSessao
+from bemtevi_resiliencia import resiliencia_api
+from bemtevi_limite import limitador_taxa
+from bemtevi_http import http_assincrono_disponivel
+from bemtevi_trechos import TAMANHO_TRECHO, manifesto, recortar, total_trechos
+from bemtevi_citacoes import agrupar_citacoes, extrair_citacoes
 from datetime import datetime
-import concurrent.futures
+from urllib.parse import urlsplit
 
 # Criar servidor MCP
 server = Server("BemTevi TST Integration Server")
 
-# Cliente global
-bemtevi_client = None
-audit_log = []
+# Pool global de clientes (navegadores pré-autenticados)
+bemtevi_pool = None
+
+# Restauração da sessão salva, iniciada em segundo plano por main() para não atrasar o handshake
+restauracao_sessao = None
+
+# Auditoria: janela fixa em memória + gravação JSONL rotativa em segundo plano
+auditoria = RegistroAuditoria()
+
+# Agendador compartilhado para todo o trabalho bloqueante (faixas api/navegador)
+agendador = Agendador()
+
+# Cache em memória dos metadados de processos (título, peças e hrefs)
+cache_processos = CacheProcessos()
+
+# Cache em memória do dossiê combinado (todos os documentos da API de um processo)
+cache_dossies = CacheDossies()
+
+# Store persistente de documentos (despachos, AIRR e peças) compartilhado com os clientes
+store_documentos = store_padrao()
+
+# Índice local de texto completo de tudo que já foi obtido (buscar_texto_bemtevi)
+indice_textos = indice_padrao()
+
+# Busca antecipada (opt-in) de despacho, AIRR e peças depois de consultar_processo
+prefetch = PrefetchProcessos()
+
+# Chamadas idênticas simultâneas (mesma operação e argumentos) compartilham uma única busca
+voo_unico = VooUnico()
+
+# Renovação da sessão: uma só para todas as chamadas com 401/403, e antes de expirar
+renovador = RenovadorSessao(agendador)
+
+# Peças lidas por vez da tabela do processo no navegador (extração incremental)
+LOTE_PECAS = int(os.getenv("BEMTEVI_LOTE_PECAS", "100"))
+# Tamanho padrão da página de listar_pecas_bemtevi
+LIMITE_LISTAGEM = int(os.getenv("BEMTEVI_LISTAGEM_LIMITE", "50"))
+
+# Argumentos de recorte aceitos pelas ferramentas que devolvem documentos inteiros
+PROPRIEDADES_RECORTE = {
+    "trecho": {
+        "type": "integer",
+        "description": f"Índice do trecho de {TAMANHO_TRECHO} caracteres a devolver (0, 1, 2...; ver manifesto_documento_bemtevi)"
+    },
+    "inicio": {
+        "type": "integer",
+        "description": "Primeiro caractere do intervalo a devolver (alternativa a 'trecho')"
+    },
+    "fim": {
+        "type": "integer",
+        "description": "Caractere final (exclusivo) do intervalo a devolver"
+    }
+}
+
+async def _restaurar_sessao():
+    """Sessão salva em disco: ferramentas de API funcionam sem conectar_bemtevi nem navegador"""
+    global bemtevi_pool
+
+    def restaurar():
+        pool = PoolBemTevi()
+        return pool if pool.restaurar() else None
+
+    try:
+        pool = await agendador.executar("api", restaurar)
+    except Exception as e:
+        print(f">>> ERROR: Falha ao restaurar sessão salva: {e}", file=sys.stderr)
+        return
+    if pool and bemtevi_pool is None:
+        bemtevi_pool = pool
+        print(">>> DEBUG: Sessão BemTevi restaurada do disco", file=sys.stderr)
 
 def _audit(action: str, data: dict):
-    """Registrar ação para auditoria"""
-    global audit_log
-    entry = {
-        "timestamp": datetime.now().isoformat(),
-        "action": action,
-        "data": data
+    """Registrar ação para auditoria (sem E/S no event loop)"""
+    auditoria.registrar(action, data)
+
+def _resumo_metricas() -> str:
+    """Seção de latências do status: p50/p95/p99 por ferramenta e por fase, e contadores"""
+    resposta = ""
+    for familia, titulo in (("ferramenta", "Latência por ferramenta"), ("fase", "Latência por fase")):
+        series = metricas.resumo(familia)
+        if not series:
+            continue
+        resposta += f"\n📈 **{titulo} (s):**\n"
+        for rotulo, valores in series.items():
+            resposta += f"- {rotulo}: {valores['chamadas']}x, p50 {valores['p50']}, p95 {valores['p95']}, p99 {valores['p99']}, máx {valores['maximo']}\n"
+    contadores = metricas.contadores()
+    if contadores:
+        resposta += "- Contadores: " + ", ".join(f"{nome} {total}" for nome, total in contadores.items()) + "\n"
+    if metricas.caminho_prometheus:
+        resposta += f"- Exportação Prometheus: {metricas.caminho_prometheus} (a cada {metricas.intervalo_prometheus:.0f}s)\n"
+    return resposta
+
+def _resumo_auditoria(arguments: dict) -> str:
+    """Seção de auditoria do status: contagem por ação e, se pedido, as entradas recentes"""
+    auditoria_status = auditoria.status()
+    resposta = f"\n📝 **Auditoria**: {auditoria_status['total']} registros ({auditoria_status['na_janela']}/{auditoria_status['capacidade']} em memória, {auditoria_status['gravadas']} gravados, {auditoria_status['pendentes']} pendentes, {auditoria_status['descartadas']} descartados)\n"
+    contagem = auditoria.contagem()
+    if contagem:
+        resposta += "- Por ação: " + ", ".join(f"{acao} {total}" for acao, total in contagem.items()) + "\n"
+    
+    quantidade = int(arguments.get("recentes") or 0)
+    if quantidade:
+        entradas = auditoria.recentes(quantidade, arguments.get("acao") or None)
+        resposta += f"\n**Últimos {len(entradas)} registros:**\n"
+        for entrada in entradas:
+            resposta += f"- {entrada['timestamp']} {entrada['action']}: {json.dumps(entrada['data'], ensure_ascii=False, default=str)}\n"
+    return resposta
+
+def _consultar_processo_navegador(numero_processo: str, inicio: int = 0, maximo: int = None):
+    """Consultar o processo renderizando a página no navegador (fallback da API)"""
+    with bemtevi_pool.cliente() as client:
+        return client.consultar_processo(numero_processo, inicio, maximo)
+
+def _mesclar_listagem(parcial: dict, continuacao: dict) -> dict:
+    """Juntar a continuação da leitura incremental à listagem parcial em cache"""
+    pecas = identificar_pecas(parcial["pecas"] + continuacao["pecas"])
+    return dict(continuacao, titulo=parcial["titulo"], pecas=pecas, total_pecas=len(pecas))
+
+def _listagem_suficiente(resultado: dict, minimo: int = None) -> bool:
+    """Listagem completa ou, se parcial, com pelo menos `minimo` peças"""
+    return resultado.get("completo", True) or (minimo is not None and len(resultado["pecas"]) >= minimo)
+
+async def _consultar_processo(numero_processo: str, usar_cache: bool = True, minimo: int = None):
+    """Metadados do processo: cache, depois API JSON e, só se ela falhar, o navegador
+    
+    `minimo` é quantas peças o chamador precisa (None = listagem completa). No
+    navegador a tabela é lida em lotes de LOTE_PECAS peças e a listagem
+    parcial fica no cache até ser completada pelas próximas chamadas.
+    Consultas simultâneas do mesmo processo compartilham uma única busca.
+    """
+    for rodada in range(2):
+        parcial = None
+        if usar_cache or rodada:
+            resultado = cache_processos.obter(numero_processo)
+            if resultado and _listagem_suficiente(resultado, minimo):
+                metricas.contar("cache", "processos.hit")
+                return resultado
+            metricas.contar("cache", "processos.parcial" if resultado else "processos.miss")
+            parcial = resultado
+        
+        resultado = await voo_unico.executar(
+            ("consultar_processo", numero_processo), _buscar_processo, numero_processo, parcial, minimo
+        )
+        # A busca compartilhada pode ter sido iniciada por quem precisava de menos
+        # peças: uma segunda rodada continua a partir da listagem parcial em cache
+        if not resultado or _listagem_suficiente(resultado, minimo):
+            return resultado
+    return resultado
+
+async def _buscar_processo(numero_processo: str, parcial: dict, minimo: int):
+    """Listagem pela API JSON ou, sem ela, pelo navegador continuando a listagem `parcial`"""
+    if parcial is None:
+        resultado = await _com_sessao(_listar_pecas_api, numero_processo)
+        if resultado and not _sessao_rejeitada(resultado):
+            cache_processos.guardar(numero_processo, resultado)
+            return resultado
+    
+    # Navegador: continuar de onde a listagem parcial parou, lendo só o necessário
+    inicio = parcial["proxima_linha"] if parcial else 0
+    maximo = None
+    if minimo is not None:
+        maximo = max(minimo - (len(parcial["pecas"]) if parcial else 0), LOTE_PECAS)
+    resultado = await agendador.executar("navegador", _consultar_processo_navegador, numero_processo, inicio, maximo)
+    if parcial:
+        if not resultado:
+            return parcial
+        resultado = _mesclar_listagem(parcial, resultado)
+    cache_processos.guardar(numero_processo, resultado)
+    return resultado
+
+async def _listar_pecas_api(numero_processo: str):
+    """Listagem pela API JSON (None se indisponível; dict com status_http se a sessão foi rejeitada)"""
+    client = bemtevi_pool.cliente_api()
+    try:
+        if http_assincrono_disponivel():
+            return await client.listar_pecas_api_async(numero_processo)
+        return await agendador.executar("api", client.listar_pecas_api, numero_processo)
+    except SessaoRejeitada as e:
+        return {"sucesso": False, "erro": str(e), "status_http": e.status_http}
+
+def _sessao_rejeitada(resultado) -> bool:
+    return isinstance(resultado, dict) and resultado.get("status_http") in (401, 403)
+
+async def _com_sessao(funcao, *args):
+    """Chamar `funcao(*args)` (corrotina que usa a sessão HTTP) renovando a sessão se rejeitada
+
+    Chamadas que chegam durante uma renovação esperam por ela. Um 401/403
+    dispara uma única renovação compartilhada por todas as chamadas
+    rejeitadas (ou nenhuma, se a sessão já foi trocada depois da requisição)
+    e a chamada é repetida uma vez com os cookies novos.
+    """
+    for tentativa in range(2):
+        await renovador.aguardar()
+        geracao = bemtevi_pool.geracao
+        resultado = await funcao(*args)
+        if tentativa or not _sessao_rejeitada(resultado):
+            return resultado
+        if not await renovador.renovar(bemtevi_pool, geracao):
+            return resultado
+    return resultado
+
+def _trabalhos_prefetch(numero_processo: str, processo: dict) -> list:
+    """Buscas antecipadas após a consulta: documentos da API (despacho, AIRR...) e as primeiras peças com link"""
+    trabalhos = [
+        (documento, lambda documento=documento: _acessar_documento_api(documento, numero_processo))
+        for documento in DOCUMENTOS_API
+    ]
+    pecas_com_link = [peca for peca in processo.get("pecas", []) if peca.get("href")]
+    for peca in pecas_com_link[:prefetch.pecas]:
+        trabalhos.append((
+            f"peca:{peca['id_peca']}",
+            lambda id_peca=peca["id_peca"]: _acessar_peca(numero_processo, id_peca=id_peca, so_http=True)
+        ))
+    return trabalhos
+
+async def _notificar_progresso(concluidos: int, total: int, mensagem: str):
+    """Enviar resultado parcial ao cliente MCP (progresso + log), quando suportado"""
+    try:
+        ctx = server.request_context
+    except LookupError:
+        return
+    try:
+        token = ctx.meta.progressToken if ctx.meta else None
+        if token is not None:
+            await ctx.session.send_progress_notification(token, concluidos, total)
+        await ctx.session.send_log_message(level="info", data=mensagem)
+    except Exception as e:
+        print(f">>> DEBUG: Notificação de progresso falhou: {e}", file=sys.stderr)
+
+async def _executar_item_lote(numero_processo: str, tipo: str, vagas: dict) -> dict:
+    """Executar um item do lote (processo + tipo de documento) isolando falhas
+
+    `vagas` tem um semáforo por faixa ("navegador" para peças, "api" para os
+    demais): o item só começa com vaga livre, para o lote não ocupar a fila
+    da faixa inteira e fazer as outras chamadas esperarem (ou serem rejeitadas).
+    """
+    async with vagas["navegador" if tipo == "pecas" else "api"]:
+        return await _executar_item_lote_isolado(numero_processo, tipo)
+
+async def _executar_item_lote_isolado(numero_processo: str, tipo: str) -> dict:
+    inicio = time.monotonic()
+    item = {"numero_processo": numero_processo, "tipo": tipo, "sucesso": False}
+    try:
+        if tipo == "pecas":
+            resultado = await _consultar_processo(numero_processo)
+            if resultado:
+                item.update(sucesso=True, resumo=f"{resultado['total_pecas']} peças")
+            else:
+                item["erro"] = "Processo não encontrado"
+        else:
+            resultado = await _acessar_documento_api(tipo, numero_processo)
+            if resultado.get("sucesso"):
+                item.update(sucesso=True, resumo=DOCUMENTOS_API[tipo].resumo(resultado))
+            else:
+                item["erro"] = resultado.get("erro", "Erro desconhecido")
+    except Exception as e:
+        item["erro"] = str(e)
+    item["tempo"] = round(time.monotonic() - inicio, 2)
+    return item
+
+async def _indexar_documento(numero_processo: str, tipo: str, doc_id: str, titulo: str, resultado: dict):
+    """Atualizar o índice de texto com um documento obtido (só reescreve se o texto mudou)"""
+    if not resultado.get("sucesso") or resultado.get("metodo_extracao", "").startswith("Fallback"):
+        return
+    try:
+        await agendador.executar(
+            "api", indice_textos.indexar,
+            numero_processo, tipo, doc_id, titulo, resultado.get("conteudo_completo", "")
+        )
+    except Exception as e:
+        print(f">>> DEBUG: Falha ao indexar {tipo} de {numero_processo}: {e}", file=sys.stderr)
+
+async def _acessar_documento_api(documento: str, numero_processo: str) -> dict:
+    """Documento da API btv-servicos (chave de DOCUMENTOS_API), indexado para buscar_texto_bemtevi"""
+    # Busca antecipada do mesmo documento em andamento: aproveitar em vez de repetir
+    antecipado = await prefetch.aguardar(numero_processo, documento)
+    if antecipado is not None:
+        return antecipado
+    
+    return await voo_unico.executar((documento, numero_processo), _obter_documento_api, documento, numero_processo)
+
+async def _obter_documento_api(documento: str, numero_processo: str) -> dict:
+    """Buscar (store ou rede) e indexar um documento da API btv-servicos"""
+    resultado = await _com_sessao(_chamar_documento_api, documento, numero_processo)
+    if resultado.get("sucesso"):
+        do_store = "(store local" in resultado.get("metodo_extracao", "")
+        metricas.contar("cache", "store_api.hit" if do_store else "store_api.miss")
+    titulo = DOCUMENTOS_API[documento].titulo_indice(resultado)
+    await _indexar_documento(numero_processo, documento, "todos", titulo, resultado)
+    return resultado
+
+async def _chamar_documento_api(documento: str, numero_processo: str) -> dict:
+    """Chamar a API btv-servicos direto no event loop (httpx); sem httpx, usa a faixa 'api'"""
+    client = bemtevi_pool.cliente_api()
+    if http_assincrono_disponivel():
+        return await client.acessar_documento_api_async(documento, numero_processo)
+    return await agendador.executar("api", client.acessar_documento_api, documento, numero_processo)
+
+async def _acessar_dossie(numero_processo: str, atualizar: bool = False) -> dict:
+    """Todos os documentos de DOCUMENTOS_API do processo num resultado combinado (em cache)"""
+    if not atualizar:
+        dossie = cache_dossies.obter(numero_processo)
+        metricas.contar("cache", "dossie.hit" if dossie else "dossie.miss")
+        if dossie:
+            return dict(dossie, do_cache=True)
+    return await voo_unico.executar(("dossie", numero_processo), _montar_dossie, numero_processo)
+
+async def _montar_dossie(numero_processo: str) -> dict:
+    """Buscar todos os documentos ao mesmo tempo: a latência é a do endpoint mais lento"""
+    inicio = time.monotonic()
+    resultados = await asyncio.gather(
+        *(_acessar_documento_api(documento, numero_processo) for documento in DOCUMENTOS_API),
+        return_exceptions=True
+    )
+    documentos = {}
+    partes = []
+    for documento, resultado in zip(DOCUMENTOS_API, resultados):
+        if isinstance(resultado, Exception):
+            resultado = {"sucesso": False, "erro": str(resultado)}
+        # Os dados estruturados ficam no store; o dossiê guarda só o texto
+        documentos[documento] = {chave: valor for chave, valor in resultado.items() if chave != "dados_estruturados"}
+        if resultado.get("sucesso"):
+            partes.append(f"=== {DOCUMENTOS_API[documento].nome} ===\n{resultado.get('conteudo_completo', '')}")
+    
+    conteudo = "\n\n".join(partes)
+    dossie = {
+        "sucesso": bool(partes),
+        "numero_processo": numero_processo,
+        "documentos": documentos,
+        "conteudo_completo": conteudo,
+        "tamanho_conteudo": len(conteudo),
+        "tempo": round(time.monotonic() - inicio, 2),
+        "gerado_em": datetime.now().isoformat(),
     }
-    audit_log.append(entry)
-    print(f">>> AUDIT: {action}", file=sys.stderr)
+    # Só o dossiê definitivo vai para o cache: nenhuma falha de rede nem cópia desatualizada
+    definitivo = all(
+        (resultado.get("sucesso") or resultado.get("inexistente"))
+        and "desatualizado" not in resultado.get("metodo_extracao", "")
+        for resultado in documentos.values()
+    )
+    if definitivo:
+        cache_dossies.guardar(numero_processo, dossie)
+    return dossie
+
+def _buscar_peca(processo: dict, indice_peca: int = None, id_peca: str = None):
+    """Localizar uma peça da listagem pelo id estável (preferido) ou pelo índice"""
+    if not processo:
+        return None
+    pecas = processo.get("pecas", [])
+    if id_peca:
+        return next((p for p in pecas if p.get("id_peca") == id_peca), None)
+    return next((p for p in pecas if p.get("indice") == indice_peca), None)
 
+def _ler_peca_store(numero_processo: str, href: str):
+    """Peça guardada no store, já decodificada em "resultado" (roda na faixa 'api'), ou None"""
+    armazenado = store_documentos.obter(numero_processo, "peca", href)
+    if armazenado:
+        armazenado["resultado"] = json.loads(armazenado["corpo"])
+    return armazenado
+
+def _invalidar_documentos(numero_processo: str = None) -> int:
+    """Apagar do store e do índice de texto os documentos do processo (ou todos); roda na faixa 'api'"""
+    removidos = store_documentos.invalidar(numero_processo)
+    indice_textos.remover(numero_processo)
+    return removidos
+
+def _status_armazenamento():
+    """Agregados do store e do índice de texto (COUNT/SUM no SQLite); roda na faixa 'api'"""
+    return store_documentos.status(), indice_textos.status()
+
+def _guardar_peca(numero_processo: str, peca: dict, resultado: dict):
+    """Guardar no store o conteúdo extraído de uma peça com link (chave: href)"""
+    if not peca or not peca.get("href") or not resultado.get("sucesso"):
+        return
+    if resultado.get("metodo_extracao", "").startswith("Fallback"):
+        return  # Texto da tabela não é o documento
+    store_documentos.guardar(
+        numero_processo, "peca", peca["href"],
+        json.dumps(resultado, ensure_ascii=False), content_type="application/json"
+    )
+
+async def _acessar_peca(numero_processo: str, indice_peca: int = None, id_peca: str = None, so_http: bool = False) -> dict:
+    """Peça do processo, indexada para buscar_texto_bemtevi"""
+    resultado, peca = await _obter_peca(numero_processo, indice_peca, id_peca, so_http)
+    if peca:
+        titulo = f"{peca.get('tipo', '')} ({peca.get('data', '')})"
+        await _indexar_documento(numero_processo, "peca", peca.get("id_peca") or peca.get("href", ""), titulo, resultado)
+    return resultado
+
+async def _obter_peca(numero_processo: str, indice_peca: int = None, id_peca: str = None, so_http: bool = False):
+    """Acessar peça: store, download HTTP pelo href e, só se falharem, o navegador
+    
+    Retorna (resultado, peça da listagem ou None). Com `so_http` (busca
+    antecipada) o navegador não é usado.
+    """
+    # Listagem (cache/API) antes de tudo: traz o href para acesso direto.
+    # Uma listagem parcial basta se já contém a peça; senão, lê o restante
+    processo = await _consultar_processo(numero_processo, minimo=0)
+    peca = _buscar_peca(processo, indice_peca, id_peca)
+    if not peca and processo and not processo.get("completo", True):
+        processo = await _consultar_processo(numero_processo)
+        peca = _buscar_peca(processo, indice_peca, id_peca)
+    if id_peca and not peca:
+        return {"sucesso": False, "erro": f"Peça {id_peca} não encontrada na listagem do processo"}, None
+    if processo and not peca:
+        # O índice é a posição na listagem (API), não a linha da tabela: sem a peça não há o que clicar
+        return {"sucesso": False, "erro": f"Peça {indice_peca} não encontrada na listagem do processo"}, None
+    
+    if peca and peca.get("id_peca"):
+        antecipado = await prefetch.aguardar(numero_processo, f"peca:{peca['id_peca']}")
+        if antecipado is not None and antecipado.get("sucesso"):
+            return antecipado, peca
+    
+    chave = ("acessar_peca", numero_processo, peca.get("id_peca") if peca else indice_peca, so_http)
+    resultado = await voo_unico.executar(chave, _obter_conteudo_peca, numero_processo, indice_peca, peca, so_http)
+    return resultado, peca
+
+async def _obter_conteudo_peca(numero_processo: str, indice_peca: int, peca: dict, so_http: bool) -> dict:
+    """Conteúdo da peça já localizada na listagem: store, download HTTP e navegador"""
+    if peca and peca.get("href"):
+        # SQLite, zlib e json.loads de peças de vários MB: na faixa 'api', fora do event loop
+        armazenado = await agendador.executar("api", _ler_peca_store, numero_processo, peca["href"])
+        metricas.contar("cache", "store_peca.hit" if armazenado and armazenado["fresco"] else "store_peca.miss")
+        if armazenado and armazenado["fresco"]:
+            resultado = armazenado["resultado"]
+            resultado["metodo_extracao"] = f"{resultado.get('metodo_extracao', '')} (store local)"
+            return resultado
+        
+        resultado = await _com_sessao(_baixar_peca, peca)
+        if resultado.get("sucesso"):
+            await agendador.executar("api", _guardar_peca, numero_processo, peca, resultado)
+            return resultado
+        if resultado.get("indisponivel") and armazenado:
+            # Circuito aberto ou tentativas esgotadas: a cópia vencida é melhor que esperar o navegador
+            metricas.contar("resiliencia", "peca.desatualizado")
+            resultado = armazenado["resultado"]
+            resultado["metodo_extracao"] = f"{resultado.get('metodo_extracao', '')} (store local, desatualizado: API indisponível)"
+            return resultado
+        print(f">>> DEBUG: Download HTTP da peça falhou ({resultado.get('erro')}), usando navegador", file=sys.stderr)
+    
+    if so_http:
+        return {"sucesso": False, "erro": "Peça sem download HTTP (busca antecipada não usa o navegador)"}
+    
+    return await agendador.executar("navegador", _acessar_peca_navegador, numero_processo, indice_peca, peca)
+
+async def _baixar_peca(peca: dict) -> dict:
+    """Download HTTP da peça direto no event loop (httpx); sem httpx, usa a faixa 'api'"""
+    client = bemtevi_pool.cliente_api()
+    if http_assincrono_disponivel():
+        return await client.baixar_peca_async(peca)
+    return await agendador.executar("api", client.baixar_peca, peca)
+
+def _chave_href(href: str):
+    """Caminho + query do link, sem host nem barra final (a API e a página divergem no host)"""
+    partes = urlsplit(href or "")
+    return (partes.path.rstrip("/"), partes.query) if partes.path else None
+
+def _localizar_na_pagina(pagina: dict, indice_peca: int, peca: dict):
+    """Linha da tabela da página correspondente à peça pedida, ou None
+
+    Com a peça da listagem, a linha é confirmada pelo id ou, se o id da API
+    não bater com o da página, pelo link; o `indice` da listagem da API é a
+    posição no JSON e não serve para a tabela. Sem listagem, o índice já é o
+    da própria tabela.
+    """
+    if not peca:
+        return _buscar_peca(pagina, indice_peca)
+    if peca.get("id_peca"):
+        alvo = _buscar_peca(pagina, id_peca=peca["id_peca"])
+        if alvo:
+            return alvo
+    chave = _chave_href(peca.get("href"))
+    if chave is None:
+        return None
+    return next((p for p in (pagina or {}).get("pecas", []) if _chave_href(p.get("href")) == chave), None)
+
+def _acessar_peca_navegador(numero_processo: str, indice_peca: int, peca: dict) -> dict:
+    """Acessar peça pelo navegador: link direto ou, sem ele, clique na página do processo"""
+    with bemtevi_pool.cliente() as client:
+        if peca and peca.get("href"):
+            resultado = client.acessar_peca_por_href(peca)
+            if resultado.get("sucesso"):
+                _guardar_peca(numero_processo, peca, resultado)
+                return resultado
+        
+        # Sem cache (ou sem link direto): carregar a página do processo e clicar na peça
+        resultado_processo = client.consultar_processo(numero_processo)
+        if resultado_processo:
+            cache_processos.guardar(numero_processo, resultado_processo)
+            alvo = _localizar_na_pagina(resultado_processo, indice_peca, peca)
+            if alvo is None:
+                # Nunca clicar numa linha "parecida": devolveria outro documento como sucesso
+                return {"sucesso": False, "erro": "Peça não localizada na página do processo"}
+            resultado = client.acessar_peca(alvo["indice"])
+            _guardar_peca(numero_processo, alvo, resultado)
+            return resultado
+    return {"sucesso": False, "erro": "Processo não encontrado"}
+
+def _recorte_solicitado(conteudo: str, arguments: dict):
+    """Aplicar trecho/inicio/fim pedidos; retorna (texto, linhas de cabeçalho do recorte)
+
+    Lança ValueError quando o trecho ou intervalo está fora do documento.
+    """
+    trecho, inicio, fim = arguments.get("trecho"), arguments.get("inicio"), arguments.get("fim")
+    if trecho is None and inicio is None and fim is None:
+        cabecalho = ""
+        if len(conteudo) > TAMANHO_TRECHO:
+            cabecalho = f"💡 Documento grande ({total_trechos(conteudo)} trechos): use `trecho` ou `manifesto_documento_bemtevi`\n"
+        return conteudo, cabecalho
+    
+    texto, inicio, fim = recortar(conteudo, trecho, inicio, fim)
+    if trecho is not None:
+        cabecalho = f"**Trecho**: {trecho} de 0–{total_trechos(conteudo) - 1} (caracteres {inicio}–{fim} de {len(conteudo)})\n"
+        proximo = f"`trecho={trecho + 1}`"
+    else:
+        cabecalho = f"**Intervalo**: caracteres {inicio}–{fim} de {len(conteudo)}\n"
+        proximo = f"`inicio={fim}`"
+    if fim < len(conteudo):
+        cabecalho += f"**Continuação**: {proximo}\n"
+    return texto, cabecalho
+
+ROTULOS_CITACOES = {
+    "artigo": "Dispositivos legais",
+    "sumula": "Súmulas",
+    "oj": "Orientações Jurisprudenciais",
+    "cnj": "Processos citados",
+    "data": "Datas",
+    "valor": "Valores",
+}
+
+# Óbices mais comuns ao seguimento do recurso de revista (destacados na análise estratégica)
+OBICES_RECURSAIS = {
+    "Súmula 126 do TST": "reexame de fatos e provas",
+    "Súmula 221 do TST": "falta de indicação expressa do dispositivo violado",
+    "Súmula 296 do TST": "divergência jurisprudencial não específica",
+    "Súmula 297 do TST": "ausência de prequestionamento",
+    "Súmula 333 do TST": "decisão conforme jurisprudência iterativa e atual do TST",
+    "Súmula 337 do TST": "divergência jurisprudencial não comprovada",
+    "Súmula 422 do TST": "fundamentos da decisão recorrida não impugnados",
+    "art. 896-A da CLT": "transcendência da causa",
+}
+
+def _formatar_valor(valor: float) -> str:
+    return "R$ " + f"{valor:,.2f}".replace(",", "_").replace(".", ",").replace("_", ".")
+
+def _listar_citacoes(grupos: dict, tipo: str, limite: int = 15) -> str:
+    """Linhas '- citação (Nx, posição P)' de um tipo, das mais citadas às menos"""
+    itens = grupos.get(tipo, [])
+    if not itens:
+        return "- Nenhuma identificada\n"
+    linhas = ""
+    for valor, total, inicio in itens[:limite]:
+        exibido = _formatar_valor(valor) if tipo == "valor" else valor
+        linhas += f"- {exibido} ({total}x, posição {inicio})\n"
+    if len(itens) > limite:
+        linhas += f"- ... e mais {len(itens) - limite}\n"
+    return linhas
+
+def _contexto(conteudo: str, inicio: int, fim: int, margem: int = 100) -> str:
+    """Trecho em volta de uma citação, numa linha só"""
+    trecho = conteudo[max(inicio - margem, 0):fim + margem]
+    return " ".join(trecho.split())
+
+@medido("fase", "analise")
 def _analisar_com_ia(conteudo: str, tipo_analise: str) -> str:
-    """Analisar conteúdo com IA - RETORNA CONTEÚDO COMPLETO COM ANÁLISE"""
+    """Analisar conteúdo com IA - RETORNA CONTEÚDO COMPLETO COM ANÁLISE
+    
+    A análise vem do extrator local de citações (bemtevi_citacoes): artigos,
+    Súmulas, OJs, números CNJ, datas e valores, com suas posições no texto.
+    """
     if not conteudo:
         return "Erro: Conteúdo vazio para análise"
     
+    inicio_analise = time.perf_counter()
+    citacoes = extrair_citacoes(conteudo)
+    grupos = agrupar_citacoes(citacoes)
+    tempo_analise = (time.perf_counter() - inicio_analise) * 1000
+    contagem = ", ".join(
+        f"{len(grupos.get(tipo, []))} {rotulo.lower()}" for tipo, rotulo in ROTULOS_CITACOES.items()
+    )
+    
     # Não resumir - entregar conteúdo completo com análise
     if tipo_analise == "resumo":
+        datas = sorted(valor for valor, _, _ in grupos.get("data", []))
+        valores = [valor for valor, _, _ in grupos.get("valor", [])]
+        fundamentos = sorted(
+            grupos.get("artigo", []) + grupos.get("sumula", []) + grupos.get("oj", []),
+            key=lambda item: -item[1]
+        )[:5]
         analise = f"""
 📋 **ANÁLISE RESUMIDA DA PEÇA**
 
@@ -48,15 +632,25 @@ def _analisar_com_ia(conteudo: str, tipo_analise: str) -> str:
 **ANÁLISE AUTOMÁTICA:**
 - Documento jurídico processual do BemTevi TST
 - Tamanho do conteúdo: {len(conteudo)} caracteres
+- Citações identificadas: {len(citacoes)} ({contagem}) em {tempo_analise:.1f} ms
+- Período mencionado: {f"{datas[0]} a {datas[-1]}" if datas else "sem datas identificadas"}
+- Maior valor mencionado: {_formatar_valor(max(valores)) if valores else "nenhum"}
 - Tipo de análise: Resumo executivo
 - Data da análise: {datetime.now().strftime("%d/%m/%Y %H:%M")}
 
-**OBSERVAÇÕES:**
-- Este é o conteúdo completo extraído da peça
-- Análise automática preliminar
-- Para análise mais detalhada, todos os dados estão disponíveis acima
-"""
+**PRINCIPAIS FUNDAMENTOS:**
+{"".join(f"- {valor} ({total}x)" + chr(10) for valor, total, _ in fundamentos) or "- Nenhum identificado" + chr(10)}
+**PROCESSOS CITADOS:**
+{_listar_citacoes(grupos, "cnj", 10)}"""
     elif tipo_analise == "argumentos":
+        primeiras = {}
+        for citacao in citacoes:
+            if citacao["tipo"] in ("artigo", "sumula", "oj"):
+                primeiras.setdefault(citacao["normalizado"], citacao)
+        contextos = "".join(
+            f"- **{normalizado}**: “{_contexto(conteudo, c['inicio'], c['fim'])}”\n"
+            for normalizado, c in list(primeiras.items())[:10]
+        )
         analise = f"""
 ⚖️ **ANÁLISE DE ARGUMENTOS - CONTEÚDO COMPLETO**
 
@@ -66,20 +660,22 @@ def _analisar_com_ia(conteudo: str, tipo_analise: str) -> str:
 **ANÁLISE DOS ARGUMENTOS:**
 - Documento analisado para identificação de argumentos jurídicos
 - Tamanho do texto: {len(conteudo)} caracteres
+- Citações identificadas: {len(citacoes)} ({contagem}) em {tempo_analise:.1f} ms
 - Tipo de análise: Argumentos e fundamentação
 - Data da análise: {datetime.now().strftime("%d/%m/%Y %H:%M")}
 
-**ESTRUTURA ARGUMENTATIVA IDENTIFICADA:**
-- Fundamentos jurídicos presentes no texto completo acima
-- Precedentes e jurisprudência (se citados)
-- Argumentação das partes (conforme texto integral)
-
-**RECOMENDAÇÕES:**
-- Revisar o texto completo acima para análise detalhada
-- Verificar citações legais e jurisprudência mencionada
-- Analisar contra-argumentos presentes
-"""
+**DISPOSITIVOS LEGAIS INVOCADOS:**
+{_listar_citacoes(grupos, "artigo")}
+**SÚMULAS:**
+{_listar_citacoes(grupos, "sumula")}
+**ORIENTAÇÕES JURISPRUDENCIAIS:**
+{_listar_citacoes(grupos, "oj")}
+**FUNDAMENTOS EM CONTEXTO (primeira ocorrência):**
+{contextos or "- Nenhum fundamento identificado" + chr(10)}"""
     else:  # estrategia
+        citados = {valor for tipo in ("sumula", "artigo") for valor, _, _ in grupos.get(tipo, [])}
+        obices = "".join(f"- **{citacao}**: {motivo}\n" for citacao, motivo in OBICES_RECURSAIS.items() if citacao in citados)
+        datas = sorted(valor for valor, _, _ in grupos.get("data", []))
         analise = f"""
 🎯 **ANÁLISE ESTRATÉGICA - TEXTO COMPLETO**
 
@@ -89,19 +685,19 @@ def _analisar_com_ia(conteudo: str, tipo_analise: str) -> str:
 **ANÁLISE ESTRATÉGICA:**
 - Documento processual completo disponível acima
 - Tamanho: {len(conteudo)} caracteres
+- Citações identificadas: {len(citacoes)} ({contagem}) em {tempo_analise:.1f} ms
 - Tipo de análise: Estratégia processual
 - Data da análise: {datetime.now().strftime("%d/%m/%Y %H:%M")}
 
-**ESTRATÉGIA PROCESSUAL:**
-- Identificar pontos fortes baseados no texto completo
-- Mapear possíveis vulnerabilidades
-- Definir próximos passos processuais
+**ÓBICES RECURSAIS CITADOS:**
+{obices or "- Nenhum óbice sumular típico identificado" + chr(10)}
+**PRECEDENTES A ENFRENTAR:**
+{_listar_citacoes(grupos, "sumula", 10)}{_listar_citacoes(grupos, "oj", 10) if grupos.get("oj") else ""}
+**MARCOS TEMPORAIS:**
+- Data mais recente mencionada: {datas[-1] if datas else "nenhuma"} (conferir prazos a partir da publicação)
 
-**AÇÕES SUGERIDAS:**
-- Revisar jurisprudência aplicável mencionada no texto
-- Preparar teses de defesa/ataque baseadas no conteúdo integral
-- Avaliar possibilidade de recursos conforme argumentação presente
-"""
+**VALORES EM DISCUSSÃO:**
+{_listar_citacoes(grupos, "valor", 10)}"""
     
     return analise
 
@@ -114,7 +710,12 @@ async def handle_list_tools() -> list[Tool]:
             description="Conecta ao sistema BemTevi do TST",
             inputSchema={
                 "type": "object",
-                "properties": {},
+                "properties": {
+                    "forcar_login": {
+                        "type": "boolean",
+                        "description": "Ignorar a sessão salva e refazer o login no navegador"
+                    }
+                },
                 "required": []
             }
         ),
@@ -134,13 +735,21 @@ async def handle_list_tools() -> list[Tool]:
         ),
         Tool(
             name="listar_pecas_bemtevi",
-            description="Lista todas as peças de um processo no BemTevi",
+            description="Lista as peças de um processo no BemTevi (paginado por offset/limit)",
             inputSchema={
                 "type": "object",
                 "properties": {
                     "numero_processo": {
                         "type": "string",
                         "description": "Número do processo"
+                    },
+                    "offset": {
+                        "type": "integer",
+                        "description": "Posição da primeira peça da página (padrão: 0)"
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": f"Quantidade de peças por página (padrão: {LIMITE_LISTAGEM}, máximo: 500)"
                     }
                 },
                 "required": ["numero_processo"]
@@ -159,9 +768,14 @@ async def handle_list_tools() -> list[Tool]:
                     "indice_peca": {
                         "type": "integer",
                         "description": "Índice da peça (0, 1, 2, etc.)"
-                    }
+                    },
+                    "id_peca": {
+                        "type": "string",
+                        "description": "Identificador estável da peça (de listar_pecas_bemtevi); tem precedência sobre indice_peca"
+                    },
+                    **PROPRIEDADES_RECORTE
                 },
-                "required": ["numero_processo", "indice_peca"]
+                "required": ["numero_processo"]
             }
         ),
         Tool(
@@ -173,7 +787,8 @@ async def handle_list_tools() -> list[Tool]:
                     "numero_processo": {
                         "type": "string",
                         "description": "Número do processo"
-                    }
+                    },
+                    **PROPRIEDADES_RECORTE
                 },
                 "required": ["numero_processo"]
             }
@@ -187,7 +802,27 @@ async def handle_list_tools() -> list[Tool]:
                     "numero_processo": {
                         "type": "string",
                         "description": "Número do processo"
-                    }
+                    },
+                    **PROPRIEDADES_RECORTE
+                },
+                "required": ["numero_processo"]
+            }
+        ),
+        Tool(
+            name="acessar_dossie_bemtevi",
+            description="Acessa de uma vez todos os documentos da API do processo (" + ", ".join(tipo.nome for tipo in DOCUMENTOS_API.values()) + "), buscados ao mesmo tempo e combinados num só texto",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "numero_processo": {
+                        "type": "string",
+                        "description": "Número do processo"
+                    },
+                    "atualizar": {
+                        "type": "boolean",
+                        "description": "Ignorar o dossiê em cache e montá-lo de novo (padrão: false)"
+                    },
+                    **PROPRIEDADES_RECORTE
                 },
                 "required": ["numero_processo"]
             }
@@ -206,13 +841,17 @@ async def handle_list_tools() -> list[Tool]:
                         "type": "integer",
                         "description": "Índice da peça (0, 1, 2, etc.)"
                     },
+                    "id_peca": {
+                        "type": "string",
+                        "description": "Identificador estável da peça (de listar_pecas_bemtevi); tem precedência sobre indice_peca"
+                    },
                     "tipo_analise": {
                         "type": "string",
                         "description": "Tipo de análise: resumo, argumentos, estrategia",
                         "enum": ["resumo", "argumentos", "estrategia"]
                     }
                 },
-                "required": ["numero_processo", "indice_peca", "tipo_analise"]
+                "required": ["numero_processo", "tipo_analise"]
             }
         ),
         Tool(
@@ -253,12 +892,113 @@ async def handle_list_tools() -> list[Tool]:
                 "required": ["numero_processo", "tipo_analise"]
             }
         ),
+        Tool(
+            name="consultar_lote_bemtevi",
+            description="Consulta vários processos de uma vez (peças, despacho e/ou AIRR em paralelo), com resultado por item",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "numeros_processo": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Lista de números de processo"
+                    },
+                    "tipos": {
+                        "type": "array",
+                        "items": {"type": "string", "enum": ["pecas", *DOCUMENTOS_API]},
+                        "description": "Documentos a buscar por processo (padrão: " + ", ".join(["pecas", *DOCUMENTOS_API]) + ")"
+                    }
+                },
+                "required": ["numeros_processo"]
+            }
+        ),
+        Tool(
+            name="manifesto_documento_bemtevi",
+            description="Tamanho total, quantidade de trechos e seções de uma peça, despacho ou AIRR (para buscar por partes)",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "numero_processo": {
+                        "type": "string",
+                        "description": "Número do processo"
+                    },
+                    "documento": {
+                        "type": "string",
+                        "enum": ["peca", *DOCUMENTOS_API],
+                        "description": "Documento a descrever"
+                    },
+                    "indice_peca": {
+                        "type": "integer",
+                        "description": "Índice da peça (quando documento = peca)"
+                    },
+                    "id_peca": {
+                        "type": "string",
+                        "description": "Identificador estável da peça (quando documento = peca)"
+                    }
+                },
+                "required": ["numero_processo", "documento"]
+            }
+        ),
+        Tool(
+            name="buscar_texto_bemtevi",
+            description="Busca texto (súmulas, artigos, termos) em todas as peças, despachos e AIRR já obtidos, sem acessar o BemTevi",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "consulta": {
+                        "type": "string",
+                        "description": "Termos a buscar; aceita \"frase exata\", AND, OR, NOT e prefixo* (ex: \"súmula 126\")"
+                    },
+                    "numero_processo": {
+                        "type": "string",
+                        "description": "Restringir a um processo (opcional)"
+                    },
+                    "tipo": {
+                        "type": "string",
+                        "enum": ["peca", *DOCUMENTOS_API],
+                        "description": "Restringir a um tipo de documento (opcional)"
+                    },
+                    "limite": {
+                        "type": "integer",
+                        "description": "Máximo de resultados (padrão: 20)"
+                    }
+                },
+                "required": ["consulta"]
+            }
+        ),
+        Tool(
+            name="invalidar_cache_bemtevi",
+            description="Invalida o cache de processos (um processo específico ou todos)",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "numero_processo": {
+                        "type": "string",
+                        "description": "Número do processo (omitir para limpar todo o cache)"
+                    },
+                    "incluir_documentos": {
+                        "type": "boolean",
+                        "description": "Também remover despachos, AIRR e peças do store local e do índice de texto"
+                    }
+                },
+                "required": []
+            }
+        ),
         Tool(
             name="status_bemtevi",
             description="Verifica status da conexão com BemTevi",
             inputSchema={
                 "type": "object",
-                "properties": {},
+                "properties": {
+                    "recentes": {
+                        "type": "integer",
+                        "description": "Quantidade de registros de auditoria recentes a exibir (padrão: 0)"
+                    },
+                    "acao": {
+                        "type": "string",
+                        "description": "Filtrar os registros recentes por ação (ex: acessar_peca)"
+                    }
+                },
                 "required": []
             }
         )
@@ -274,29 +1014,47 @@ async def handle_list_tools() -> list[Tool]:
 
 @server.call_tool()
 async def handle_call_tool(name: str, arguments: dict) -> list[TextContent]:
+    """Executar ferramenta, medindo a latência por ferramenta"""
+    with metricas.medir("ferramenta", name):
+        return await _executar_ferramenta(name, arguments)
+
+async def _executar_ferramenta(name: str, arguments: dict) -> list[TextContent]:
     """Executar ferramenta"""
-    global bemtevi_client
+    global bemtevi_pool
     
     print(f">>> DEBUG: call_tool() chamada: {name}", file=sys.stderr)
     
+    # A primeira ferramenta pode chegar antes de a sessão salva terminar de ser restaurada.
+    # shield: cancelar esta chamada não pode cancelar a restauração (o pool ficaria None)
+    if restauracao_sessao is not None and not restauracao_sessao.done():
+        await asyncio.shield(restauracao_sessao)
+    
+    # Processo em uso: a busca antecipada dele não é abandonada
+    if arguments.get("numero_processo"):
+        prefetch.tocar(arguments["numero_processo"])
+    
     try:
         if name == "conectar_bemtevi":
             print(">>> DEBUG: Executando conectar_bemtevi", file=sys.stderr)
             
+            usar_sessao_salva = not arguments.get("forcar_login", False)
+            
             def fazer_login_sync():
                 print(">>> DEBUG: Iniciando login em thread separada", file=sys.stderr)
-                client = BemTeviClient()
-                sucesso = client.fazer_login()
-                return client, sucesso
+                pool = PoolBemTevi()
+                sucesso = pool.iniciar(usar_sessao_salva)
+                return pool, sucesso
             
-            # Executar em thread separada para evitar bloqueio
-            loop = asyncio.get_event_loop()
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                client, sucesso = await loop.run_in_executor(executor, fazer_login_sync)
+            # Executar na faixa de navegador do agendador para evitar bloqueio
+            pool, sucesso = await agendador.executar("navegador", fazer_login_sync)
             
             if sucesso:
-                bemtevi_client = client
-                _audit("conectar_bemtevi", {"sucesso": True})
+                pool_antigo, bemtevi_pool = bemtevi_pool, pool
+                if pool_antigo:
+                    # Espera os checkouts em andamento voltarem e fecha o cliente HTTP (bloqueante: fora do event loop)
+                    await agendador.executar("api", pool_antigo.fechar)
+                cache_processos.invalidar()
+                _audit("conectar_bemtevi", {"sucesso": True, "navegadores": pool.status()["ativos"], "sessao_restaurada": pool.sessao_restaurada})
                 return [TextContent(type="text", text="✅ **Conectado ao BemTevi TST com sucesso!**\n\n🚀 Sistema pronto para consultas de processos, peças e análises com IA.\n\n💡 **Recursos disponíveis:**\n- Acesso direto a despachos de admissibilidade\n- Acesso direto a AIRR via APIs específicas\n- Análise completa de conteúdo com IA")]
             else:
                 return [TextContent(type="text", text="❌ Falha ao conectar com o BemTevi TST. Verifique as credenciais.")]
@@ -304,117 +1062,121 @@ async def handle_call_tool(name: str, arguments: dict) -> list[TextContent]:
         elif name == "consultar_processo_bemtevi":
             print(">>> DEBUG: Executando consultar_processo_bemtevi", file=sys.stderr)
             
-            if not bemtevi_client:
+            if not bemtevi_pool:
                 return [TextContent(type="text", text="❌ Erro: Faça login primeiro usando 'conectar_bemtevi'")]
             
             numero_processo = arguments.get("numero_processo", "")
             
-            def consultar_sync():
-                return bemtevi_client.consultar_processo(numero_processo)
-            
-            loop = asyncio.get_event_loop()
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                resultado = await loop.run_in_executor(executor, consultar_sync)
+            # Consulta explícita sempre atualiza o cache
+            resultado = await _consultar_processo(numero_processo, usar_cache=False)
             
             if resultado:
                 _audit("consultar_processo", {"numero_processo": numero_processo})
-                return [TextContent(type="text", text=f"✅ **Processo {numero_processo} consultado com sucesso!**\n\n📋 **Encontradas {resultado['total_pecas']} peças**\n\n💡 Use as funções específicas para acessar:\n- Despachos de admissibilidade\n- AIRR (Agravos)\n- Peças individuais")]
+                antecipadas = prefetch.agendar(numero_processo, _trabalhos_prefetch(numero_processo, resultado))
+                resposta = f"✅ **Processo {numero_processo} consultado com sucesso!**\n\n📋 **Encontradas {resultado['total_pecas']} peças**\n\n💡 Use as funções específicas para acessar:\n- Despachos de admissibilidade\n- AIRR (Agravos)\n- Peças individuais"
+                if antecipadas:
+                    resposta += f"\n\n⚡ {antecipadas} documento(s) sendo buscado(s) em segundo plano (despacho, AIRR e peças)"
+                return [TextContent(type="text", text=resposta)]
             else:
                 return [TextContent(type="text", text=f"❌ Processo {numero_processo} não encontrado ou erro na consulta.")]
         
         elif name == "listar_pecas_bemtevi":
             print(">>> DEBUG: Executando listar_pecas_bemtevi", file=sys.stderr)
             
-            if not bemtevi_client:
+            if not bemtevi_pool:
                 return [TextContent(type="text", text="❌ Erro: Faça login primeiro usando 'conectar_bemtevi'")]
             
             numero_processo = arguments.get("numero_processo", "")
+            offset = max(int(arguments.get("offset") or 0), 0)
+            limit = min(max(int(arguments.get("limit") or LIMITE_LISTAGEM), 1), 500)
             
-            def listar_pecas_sync():
-                resultado = bemtevi_client.consultar_processo(numero_processo)
-                return resultado['pecas'] if resultado else []
-            
-            loop = asyncio.get_event_loop()
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                pecas = await loop.run_in_executor(executor, listar_pecas_sync)
+            # Só as peças até o fim da página: no navegador a tabela é lida incrementalmente
+            processo = await _consultar_processo(numero_processo, minimo=offset + limit)
+            todas = processo['pecas'] if processo else []
+            pecas = todas[offset:offset + limit]
             
             if pecas:
-                resultado = f"📋 **Processo {numero_processo} possui {len(pecas)} peças:**\n\n"
+                completo = processo.get("completo", True)
+                total = f"{len(todas)}" if completo else f"{len(todas)}+ (tabela com {processo.get('total_linhas')} linhas)"
+                resultado = f"📋 **Processo {numero_processo} possui {total} peças** (exibindo {offset + 1}–{offset + len(pecas)}):\n\n"
                 for peca in pecas:
-                    resultado += f"**Peça {peca['indice']}**: {peca['tipo']} ({peca['data']})\n"
+                    resultado += f"**Peça {peca['indice']}** (`{peca.get('id_peca', '')}`): {peca['tipo']} ({peca['data']})\n"
                     if peca['tem_link']:
                         resultado += f"   ↳ Link disponível para acesso ao conteúdo completo\n"
                 
+                if offset + len(pecas) < len(todas) or not completo:
+                    resultado += f"\n➡️ **Próxima página**: `offset={offset + len(pecas)}`, `limit={limit}`\n"
+                
                 resultado += f"\n💡 **Comandos disponíveis:**\n"
-                resultado += f"- `acessar_peca_bemtevi` para ver conteúdo completo\n"
+                resultado += f"- `acessar_peca_bemtevi` (com `id_peca` ou `indice_peca`) para ver conteúdo completo\n"
                 resultado += f"- `acessar_despacho_admissibilidade_bemtevi` para despachos\n"
                 resultado += f"- `acessar_airr_bemtevi` para agravos\n"
+                resultado += f"- `acessar_dossie_bemtevi` para todos os documentos da API de uma vez\n"
                 resultado += f"- `analisar_*_bemtevi` para análises com IA"
                 
-                _audit("listar_pecas", {"numero_processo": numero_processo, "total_pecas": len(pecas)})
+                _audit("listar_pecas", {"numero_processo": numero_processo, "offset": offset, "total_pecas": len(pecas)})
                 return [TextContent(type="text", text=resultado)]
+            elif todas:
+                return [TextContent(type="text", text=f"❌ Offset {offset} além do fim da listagem ({len(todas)} peças) do processo {numero_processo}")]
             else:
                 return [TextContent(type="text", text=f"❌ Nenhuma peça encontrada para o processo {numero_processo}")]
         
         elif name == "acessar_peca_bemtevi":
             print(">>> DEBUG: Executando acessar_peca_bemtevi", file=sys.stderr)
             
-            if not bemtevi_client:
+            if not bemtevi_pool:
                 return [TextContent(type="text", text="❌ Erro: Faça login primeiro usando 'conectar_bemtevi'")]
             
             numero_processo = arguments.get("numero_processo", "")
             indice_peca = arguments.get("indice_peca", 0)
+            id_peca = arguments.get("id_peca")
             
-            def acessar_peca_sync():
-                # Primeiro consultar o processo para garantir que está na página certa
-                resultado_processo = bemtevi_client.consultar_processo(numero_processo)
-                if resultado_processo:
-                    return bemtevi_client.acessar_peca(indice_peca)
-                return {"sucesso": False, "erro": "Processo não encontrado"}
-            
-            loop = asyncio.get_event_loop()
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                resultado = await loop.run_in_executor(executor, acessar_peca_sync)
+            resultado = await _acessar_peca(numero_processo, indice_peca, id_peca)
             
             if resultado.get("sucesso"):
                 conteudo = resultado.get("conteudo_completo", "")
                 tamanho = resultado.get("tamanho_conteudo", len(conteudo))
+                try:
+                    texto, recorte = _recorte_solicitado(conteudo, arguments)
+                except ValueError as e:
+                    return [TextContent(type="text", text=f"❌ {e}")]
                 
                 _audit("acessar_peca", {
                     "numero_processo": numero_processo,
                     "indice_peca": indice_peca,
+                    "id_peca": id_peca,
                     "tamanho_conteudo": tamanho
                 })
                 
-                resposta = f"📑 **CONTEÚDO COMPLETO DA PEÇA {indice_peca}**\n\n"
+                resposta = f"📑 **CONTEÚDO COMPLETO DA PEÇA {id_peca or indice_peca}**\n\n"
                 resposta += f"**Tipo**: {resultado.get('tipo', 'N/A')}\n"
                 resposta += f"**Data**: {resultado.get('data', 'N/A')}\n"
                 resposta += f"**Tamanho**: {tamanho} caracteres\n"
-                resposta += f"**Método de extração**: {resultado.get('metodo_extracao', 'N/A')}\n\n"
-                resposta += f"**TEXTO INTEGRAL:**\n\n{conteudo}"
+                resposta += f"**Método de extração**: {resultado.get('metodo_extracao', 'N/A')}\n"
+                resposta += f"{recorte}\n"
+                resposta += f"**TEXTO INTEGRAL:**\n\n{texto}"
                 
                 return [TextContent(type="text", text=resposta)]
             else:
-                return [TextContent(type="text", text=f"❌ Erro ao acessar peça {indice_peca}: {resultado.get('erro', 'Erro desconhecido')}")]
+                return [TextContent(type="text", text=f"❌ Erro ao acessar peça {id_peca or indice_peca}: {resultado.get('erro', 'Erro desconhecido')}")]
         
         elif name == "acessar_despacho_admissibilidade_bemtevi":
             print(">>> DEBUG: Executando acessar_despacho_admissibilidade_bemtevi", file=sys.stderr)
             
-            if not bemtevi_client:
+            if not bemtevi_pool:
                 return [TextContent(type="text", text="❌ Erro: Faça login primeiro usando 'conectar_bemtevi'")]
             
             numero_processo = arguments.get("numero_processo", "")
             
-            def acessar_despacho_sync():
-                return bemtevi_client.acessar_despacho_admissibilidade(numero_processo)
-            
-            loop = asyncio.get_event_loop()
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                resultado = await loop.run_in_executor(executor, acessar_despacho_sync)
+            resultado = await _acessar_documento_api("despacho", numero_processo)
             
             if resultado.get("sucesso"):
                 conteudo = resultado.get("conteudo_completo", "")
                 tamanho = resultado.get("tamanho_conteudo", len(conteudo))
+                try:
+                    texto, recorte = _recorte_solicitado(conteudo, arguments)
+                except ValueError as e:
+                    return [TextContent(type="text", text=f"❌ {e}")]
                 
                 _audit("acessar_despacho_admissibilidade", {
                     "numero_processo": numero_processo,
@@ -425,8 +1187,9 @@ async def handle_call_tool(name: str, arguments: dict) -> list[TextContent]:
                 resposta += f"**Processo**: {numero_processo}\n"
                 resposta += f"**Tamanho**: {tamanho} caracteres\n"
                 resposta += f"**Método**: {resultado.get('metodo_extracao', 'N/A')}\n"
-                resposta += f"**URL API**: {resultado.get('url_api', 'N/A')}\n\n"
-                resposta += f"**CONTEÚDO COMPLETO:**\n\n{conteudo}"
+                resposta += f"**URL API**: {resultado.get('url_api', 'N/A')}\n"
+                resposta += f"{recorte}\n"
+                resposta += f"**CONTEÚDO COMPLETO:**\n\n{texto}"
                 
                 return [TextContent(type="text", text=resposta)]
             else:
@@ -435,22 +1198,21 @@ async def handle_call_tool(name: str, arguments: dict) -> list[TextContent]:
         elif name == "acessar_airr_bemtevi":
             print(">>> DEBUG: Executando acessar_airr_bemtevi", file=sys.stderr)
             
-            if not bemtevi_client:
+            if not bemtevi_pool:
                 return [TextContent(type="text", text="❌ Erro: Faça login primeiro usando 'conectar_bemtevi'")]
             
             numero_processo = arguments.get("numero_processo", "")
             
-            def acessar_airr_sync():
-                return bemtevi_client.acessar_airr(numero_processo)
-            
-            loop = asyncio.get_event_loop()
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                resultado = await loop.run_in_executor(executor, acessar_airr_sync)
+            resultado = await _acessar_documento_api("airr", numero_processo)
             
             if resultado.get("sucesso"):
                 conteudo = resultado.get("conteudo_completo", "")
                 tamanho = resultado.get("tamanho_conteudo", len(conteudo))
                 total_airr = resultado.get("total_airr", 1)
+                try:
+                    texto, recorte = _recorte_solicitado(conteudo, arguments)
+                except ValueError as e:
+                    return [TextContent(type="text", text=f"❌ {e}")]
                 
                 _audit("acessar_airr", {
                     "numero_processo": numero_processo,
@@ -463,68 +1225,94 @@ async def handle_call_tool(name: str, arguments: dict) -> list[TextContent]:
                 resposta += f"**Total de AIRR**: {total_airr}\n"
                 resposta += f"**Tamanho**: {tamanho} caracteres\n"
                 resposta += f"**Método**: {resultado.get('metodo_extracao', 'N/A')}\n"
-                resposta += f"**URL API**: {resultado.get('url_api', 'N/A')}\n\n"
-                resposta += f"**CONTEÚDO COMPLETO:**\n\n{conteudo}"
+                resposta += f"**URL API**: {resultado.get('url_api', 'N/A')}\n"
+                resposta += f"{recorte}\n"
+                resposta += f"**CONTEÚDO COMPLETO:**\n\n{texto}"
                 
                 return [TextContent(type="text", text=resposta)]
             else:
                 return [TextContent(type="text", text=f"❌ Erro ao acessar AIRR: {resultado.get('erro', 'Erro desconhecido')}")]
         
+        elif name == "acessar_dossie_bemtevi":
+            print(">>> DEBUG: Executando acessar_dossie_bemtevi", file=sys.stderr)
+            
+            if not bemtevi_pool:
+                return [TextContent(type="text", text="❌ Erro: Faça login primeiro usando 'conectar_bemtevi'")]
+            
+            numero_processo = arguments.get("numero_processo", "")
+            dossie = await _acessar_dossie(numero_processo, bool(arguments.get("atualizar")))
+            
+            resposta = f"📚 **DOSSIÊ DO PROCESSO {numero_processo}**\n\n"
+            for documento, tipo in DOCUMENTOS_API.items():
+                resultado = dossie["documentos"].get(documento, {})
+                if resultado.get("sucesso"):
+                    resposta += f"- ✅ {tipo.nome}: {tipo.resumo(resultado)} ({resultado.get('metodo_extracao', 'N/A')})\n"
+                else:
+                    resposta += f"- ❌ {tipo.nome}: {resultado.get('erro', 'Erro desconhecido')}\n"
+            origem = f"cache (montado em {dossie['gerado_em']})" if dossie.get("do_cache") else f"{dossie['tempo']}s, {len(DOCUMENTOS_API)} buscas simultâneas"
+            resposta += f"\n**Tamanho**: {dossie['tamanho_conteudo']} caracteres\n**Obtido**: {origem}\n"
+            
+            _audit("acessar_dossie", {
+                "numero_processo": numero_processo,
+                "documentos": sum(1 for resultado in dossie["documentos"].values() if resultado.get("sucesso")),
+                "tamanho_conteudo": dossie["tamanho_conteudo"],
+                "do_cache": bool(dossie.get("do_cache"))
+            })
+            if not dossie["sucesso"]:
+                return [TextContent(type="text", text=resposta + "\n❌ Nenhum documento obtido")]
+            
+            try:
+                texto, recorte = _recorte_solicitado(dossie["conteudo_completo"], arguments)
+            except ValueError as e:
+                return [TextContent(type="text", text=f"❌ {e}")]
+            resposta += f"{recorte}\n**CONTEÚDO COMPLETO:**\n\n{texto}"
+            return [TextContent(type="text", text=resposta)]
+        
         elif name == "analisar_peca_bemtevi":
             print(">>> DEBUG: Executando analisar_peca_bemtevi", file=sys.stderr)
             
-            if not bemtevi_client:
+            if not bemtevi_pool:
                 return [TextContent(type="text", text="❌ Erro: Faça login primeiro usando 'conectar_bemtevi'")]
             
             numero_processo = arguments.get("numero_processo", "")
             indice_peca = arguments.get("indice_peca", 0)
+            id_peca = arguments.get("id_peca")
             tipo_analise = arguments.get("tipo_analise", "resumo")
             
-            def analisar_peca_sync():
-                # Primeiro consultar o processo
-                resultado_processo = bemtevi_client.consultar_processo(numero_processo)
-                if resultado_processo:
-                    return bemtevi_client.acessar_peca(indice_peca)
-                return {"sucesso": False, "erro": "Processo não encontrado"}
-            
-            loop = asyncio.get_event_loop()
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                resultado_peca = await loop.run_in_executor(executor, analisar_peca_sync)
+            resultado_peca = await _acessar_peca(numero_processo, indice_peca, id_peca)
             
             if resultado_peca.get("sucesso"):
                 conteudo = resultado_peca.get("conteudo_completo", "")
-                analise = _analisar_com_ia(conteudo, tipo_analise)
+                # Várias passadas de regex em textos de vários MB: fora do event loop
+                analise = await agendador.executar("api", _analisar_com_ia, conteudo, tipo_analise)
                 
                 _audit("analisar_peca", {
                     "numero_processo": numero_processo,
                     "indice_peca": indice_peca,
+                    "id_peca": id_peca,
                     "tipo_analise": tipo_analise,
                     "tamanho_conteudo": len(conteudo)
                 })
                 
                 return [TextContent(type="text", text=analise)]
             else:
-                return [TextContent(type="text", text=f"❌ Erro ao analisar peça {indice_peca}: {resultado_peca.get('erro', 'Erro desconhecido')}")]
+                return [TextContent(type="text", text=f"❌ Erro ao analisar peça {id_peca or indice_peca}: {resultado_peca.get('erro', 'Erro desconhecido')}")]
         
         elif name == "analisar_despacho_admissibilidade_bemtevi":
             print(">>> DEBUG: Executando analisar_despacho_admissibilidade_bemtevi", file=sys.stderr)
             
-            if not bemtevi_client:
+            if not bemtevi_pool:
                 return [TextContent(type="text", text="❌ Erro: Faça login primeiro usando 'conectar_bemtevi'")]
             
             numero_processo = arguments.get("numero_processo", "")
             tipo_analise = arguments.get("tipo_analise", "resumo")
             
-            def analisar_despacho_sync():
-                return bemtevi_client.acessar_despacho_admissibilidade(numero_processo)
-            
-            loop = asyncio.get_event_loop()
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                resultado_despacho = await loop.run_in_executor(executor, analisar_despacho_sync)
+            resultado_despacho = await _acessar_documento_api("despacho", numero_processo)
             
             if resultado_despacho.get("sucesso"):
                 conteudo = resultado_despacho.get("conteudo_completo", "")
-                analise = _analisar_com_ia(conteudo, tipo_analise)
+                # Várias passadas de regex em textos de vários MB: fora do event loop
+                analise = await agendador.executar("api", _analisar_com_ia, conteudo, tipo_analise)
                 
                 _audit("analisar_despacho_admissibilidade", {
                     "numero_processo": numero_processo,
@@ -539,22 +1327,18 @@ async def handle_call_tool(name: str, arguments: dict) -> list[TextContent]:
         elif name == "analisar_airr_bemtevi":
             print(">>> DEBUG: Executando analisar_airr_bemtevi", file=sys.stderr)
             
-            if not bemtevi_client:
+            if not bemtevi_pool:
                 return [TextContent(type="text", text="❌ Erro: Faça login primeiro usando 'conectar_bemtevi'")]
             
             numero_processo = arguments.get("numero_processo", "")
             tipo_analise = arguments.get("tipo_analise", "resumo")
             
-            def analisar_airr_sync():
-                return bemtevi_client.acessar_airr(numero_processo)
-            
-            loop = asyncio.get_event_loop()
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                resultado_airr = await loop.run_in_executor(executor, analisar_airr_sync)
+            resultado_airr = await _acessar_documento_api("airr", numero_processo)
             
             if resultado_airr.get("sucesso"):
                 conteudo = resultado_airr.get("conteudo_completo", "")
-                analise = _analisar_com_ia(conteudo, tipo_analise)
+                # Várias passadas de regex em textos de vários MB: fora do event loop
+                analise = await agendador.executar("api", _analisar_com_ia, conteudo, tipo_analise)
                 
                 _audit("analisar_airr", {
                     "numero_processo": numero_processo,
@@ -566,19 +1350,194 @@ async def handle_call_tool(name: str, arguments: dict) -> list[TextContent]:
             else:
                 return [TextContent(type="text", text=f"❌ Erro ao analisar AIRR: {resultado_airr.get('erro', 'Erro desconhecido')}")]
         
+        elif name == "consultar_lote_bemtevi":
+            print(">>> DEBUG: Executando consultar_lote_bemtevi", file=sys.stderr)
+            
+            if not bemtevi_pool:
+                return [TextContent(type="text", text="❌ Erro: Faça login primeiro usando 'conectar_bemtevi'")]
+            
+            # Remover duplicados preservando a ordem
+            numeros = list(dict.fromkeys(n.strip() for n in arguments.get("numeros_processo", []) if n and n.strip()))
+            validos = ["pecas", *DOCUMENTOS_API]
+            tipos = [t for t in arguments.get("tipos") or validos if t in validos]
+            limite_lote = int(os.getenv("BEMTEVI_LOTE_MAX", "100"))
+            
+            if not numeros or not tipos:
+                return [TextContent(type="text", text="❌ Informe ao menos um número de processo e um tipo válido")]
+            if len(numeros) > limite_lote:
+                return [TextContent(type="text", text=f"❌ Lote com {len(numeros)} processos excede o limite de {limite_lote}")]
+            
+            # Fan-out limitado à capacidade de cada faixa; o resto espera a vez aqui, não na fila da faixa
+            vagas = {faixa: asyncio.Semaphore(agendador.capacidade(faixa)) for faixa in ("api", "navegador")}
+            tarefas = [asyncio.create_task(_executar_item_lote(numero, tipo, vagas)) for numero in numeros for tipo in tipos]
+            inicio = time.monotonic()
+            itens = []
+            
+            # Cada item é reportado assim que termina, sem esperar o lote inteiro
+            for tarefa in asyncio.as_completed(tarefas):
+                item = await tarefa
+                itens.append(item)
+                situacao = f"✅ {item['resumo']}" if item["sucesso"] else f"❌ {item['erro']}"
+                await _notificar_progresso(len(itens), len(tarefas), f"{item['numero_processo']} [{item['tipo']}]: {situacao}")
+            
+            sucessos = sum(1 for item in itens if item["sucesso"])
+            _audit("consultar_lote", {"processos": len(numeros), "tipos": tipos, "itens": len(itens), "sucessos": sucessos})
+            
+            resposta = f"📦 **LOTE: {len(numeros)} processo(s) × {len(tipos)} tipo(s)**\n\n"
+            resposta += f"**Concluídos**: {sucessos}/{len(itens)} em {time.monotonic() - inicio:.1f}s\n\n"
+            for numero in numeros:
+                resposta += f"**{numero}**\n"
+                for item in sorted((i for i in itens if i["numero_processo"] == numero), key=lambda i: tipos.index(i["tipo"])):
+                    situacao = f"✅ {item['resumo']}" if item["sucesso"] else f"❌ {item['erro']}"
+                    resposta += f"- {item['tipo']}: {situacao} ({item['tempo']}s)\n"
+            resposta += "\n💡 Conteúdos ficam em cache: use `acessar_*_bemtevi` para lê-los sem nova busca"
+            
+            return [TextContent(type="text", text=resposta)]
+        
+        elif name == "manifesto_documento_bemtevi":
+            print(">>> DEBUG: Executando manifesto_documento_bemtevi", file=sys.stderr)
+            
+            if not bemtevi_pool:
+                return [TextContent(type="text", text="❌ Erro: Faça login primeiro usando 'conectar_bemtevi'")]
+            
+            numero_processo = arguments.get("numero_processo", "")
+            documento = arguments.get("documento", "")
+            
+            # Mesmo caminho das ferramentas de acesso: o conteúdo sai do store quando já foi obtido
+            if documento == "peca":
+                resultado = await _acessar_peca(numero_processo, arguments.get("indice_peca", 0), arguments.get("id_peca"))
+            elif documento in DOCUMENTOS_API:
+                resultado = await _acessar_documento_api(documento, numero_processo)
+            else:
+                return [TextContent(type="text", text=f"❌ Documento inválido: {documento}")]
+            
+            if not resultado.get("sucesso"):
+                return [TextContent(type="text", text=f"❌ Erro ao obter documento: {resultado.get('erro', 'Erro desconhecido')}")]
+            
+            dados = manifesto(resultado.get("conteudo_completo", ""))
+            resposta = f"🗂️ **MANIFESTO - {documento.upper()} do processo {numero_processo}**\n\n"
+            resposta += f"**Tamanho**: {dados['caracteres']} caracteres ({dados['bytes']} bytes UTF-8)\n"
+            resposta += f"**Trechos**: {dados['total_trechos']} de até {dados['tamanho_trecho']} caracteres (0 a {dados['total_trechos'] - 1})\n"
+            resposta += f"**Método**: {resultado.get('metodo_extracao', 'N/A')}\n"
+            if dados["secoes"]:
+                resposta += f"\n**Seções:**\n"
+                for secao in dados["secoes"]:
+                    resposta += f"- {secao['titulo']}: caractere {secao['inicio']} (trecho {secao['trecho']})\n"
+            
+            _audit("manifesto_documento", {"numero_processo": numero_processo, "documento": documento, "caracteres": dados["caracteres"]})
+            return [TextContent(type="text", text=resposta)]
+        
+        elif name == "buscar_texto_bemtevi":
+            print(">>> DEBUG: Executando buscar_texto_bemtevi", file=sys.stderr)
+            
+            consulta = arguments.get("consulta", "")
+            limite = min(max(int(arguments.get("limite") or 20), 1), 100)
+            
+            # Só o índice local: funciona mesmo sem conexão com o BemTevi.
+            # MATCH/snippet do FTS5 num índice grande: na faixa 'api', fora do event loop
+            inicio = time.perf_counter()
+            resultados = await agendador.executar(
+                "api", indice_textos.buscar,
+                consulta, limite, arguments.get("numero_processo") or None, arguments.get("tipo") or None
+            )
+            tempo_ms = (time.perf_counter() - inicio) * 1000
+            
+            _audit("buscar_texto", {"consulta": consulta, "resultados": len(resultados)})
+            if not resultados:
+                indice_status = await agendador.executar("api", indice_textos.status)
+                return [TextContent(type="text", text=f"🔎 Nenhum resultado para \"{consulta}\" em {indice_status['documentos']} documentos indexados ({tempo_ms:.1f} ms)")]
+            
+            resposta = f"🔎 **{len(resultados)} resultado(s) para \"{consulta}\"** ({tempo_ms:.1f} ms)\n\n"
+            for posicao, item in enumerate(resultados, 1):
+                documento = f"peça `{item['doc_id']}`" if item["tipo"] == "peca" else item["tipo"]
+                resposta += f"**{posicao}. Processo {item['numero_processo']}** - {documento}: {item['titulo']} (relevância {item['relevancia']})\n"
+                resposta += f"   ↳ {item['trecho']}\n\n"
+            return [TextContent(type="text", text=resposta)]
+        
+        elif name == "invalidar_cache_bemtevi":
+            print(">>> DEBUG: Executando invalidar_cache_bemtevi", file=sys.stderr)
+            
+            numero_processo = arguments.get("numero_processo") or None
+            removidos = cache_processos.invalidar(numero_processo)
+            removidos += cache_dossies.invalidar(numero_processo)
+            prefetch.cancelar(numero_processo)
+            if arguments.get("incluir_documentos"):
+                removidos += await agendador.executar("api", _invalidar_documentos, numero_processo)
+            
+            _audit("invalidar_cache", {"numero_processo": numero_processo, "removidos": removidos})
+            alvo = f"do processo {numero_processo}" if numero_processo else "completo"
+            return [TextContent(type="text", text=f"🧹 **Cache {alvo} invalidado** ({removidos} entrada(s) removida(s))")]
+        
         elif name == "status_bemtevi":
             print(">>> DEBUG: Executando status_bemtevi", file=sys.stderr)
             
-            if bemtevi_client and bemtevi_client.logged_in:
-                status = {
-                    "conectado": True,
-                    "navegador_ativo": bemtevi_client.driver is not None,
-                    "sistema": "BemTevi TST",
-                    "total_auditorias": len(audit_log)
-                }
-                return [TextContent(type="text", text=f"✅ **Status BemTevi**: Conectado e ativo\n\n📊 **Operações realizadas**: {len(audit_log)}\n🌐 **Sistema**: BemTevi TST\n💻 **Navegador**: {'Ativo' if bemtevi_client.driver else 'Inativo'}\n\n🚀 **APIs específicas disponíveis:**\n- Despachos de admissibilidade\n- AIRR (Agravos)\n- Análises com IA")]
+            if bemtevi_pool and bemtevi_pool.logged_in:
+                pool_status = bemtevi_pool.status()
+                sessao = "restaurada do disco" if pool_status["sessao_restaurada"] else "login no navegador"
+                if pool_status["sessao_expira_em"]:
+                    sessao += f", expira em {(pool_status['sessao_expira_em'] - time.time()) / 60:.0f} min"
+                renovacao = renovador.status(bemtevi_pool)
+                if renovacao["em_andamento"]:
+                    sessao += ", renovando agora"
+                elif renovacao["proxima_proativa"]:
+                    sessao += f", renovação automática em {max(renovacao['proxima_proativa'] - time.time(), 0) / 60:.0f} min"
+                if renovacao["renovacoes"] or renovacao["falhas"]:
+                    sessao += f" ({renovacao['renovacoes']} renovação(ões), {renovacao['falhas']} falha(s))"
+                resposta = f"✅ **Status BemTevi**: Conectado e ativo\n\n📊 **Operações realizadas**: {auditoria.total}\n🌐 **Sistema**: BemTevi TST\n💻 **Navegadores**: {pool_status['ativos']}/{pool_status['tamanho']} ativos ({pool_status['livres']} livres, {pool_status['em_uso']} em uso, {pool_status['reciclagens']} reciclagens)\n🔑 **Sessão**: {sessao}\n\n🚀 **APIs específicas disponíveis:**\n- Despachos de admissibilidade\n- AIRR (Agravos)\n- Análises com IA"
+
+                resposta += "\n\n🧵 **Agendador (faixas):**\n"
+                for faixa, estado in agendador.status().items():
+                    resposta += f"- {faixa}: {estado['em_execucao']}/{estado['workers']} em execução, {estado['na_fila']}/{estado['limite_fila']} na fila, {estado['concluidas']} concluídas, {estado['rejeitadas']} rejeitadas, espera média {estado['espera_media']}s (máx {estado['espera_max']}s), execução média {estado['execucao_media']}s (máx {estado['execucao_max']}s)\n"
+
+                cache_status = cache_processos.status()
+                resposta += f"\n🗂️ **Cache de processos**: {cache_status['itens']} itens, {cache_status['bytes']}/{cache_status['max_bytes']} bytes, {cache_status['hits']} hits, {cache_status['misses']} misses, {cache_status['descartadas']} descartados (TTL {cache_status['ttl']:.0f}s)\n"
+                dossies_status = cache_dossies.status()
+                resposta += f"📚 **Cache de dossiês**: {dossies_status['itens']} itens, {dossies_status['bytes']} bytes, {dossies_status['hits']} hits, {dossies_status['misses']} misses (TTL {dossies_status['ttl']:.0f}s)\n"
+
+                store_status, indice_status = await agendador.executar("api", _status_armazenamento)
+                resposta += f"💾 **Store de documentos**: {store_status['documentos']} documentos, {store_status['bytes']} bytes ({store_status['bytes_comprimidos']} comprimidos)\n"
+                resposta += f"🔎 **Índice de texto**: {indice_status['documentos']} documentos de {indice_status['processos']} processos, {indice_status['caracteres']} caracteres{'' if indice_status['disponivel'] else ' (FTS5 indisponível)'}\n"
+
+                prefetch_status = prefetch.status()
+                if prefetch_status["ativo"]:
+                    pendentes = "; ".join(f"{numero}: {', '.join(rotulos)}" for numero, rotulos in prefetch_status["processos"].items()) or "nenhuma pendente"
+                    resposta += f"⚡ **Busca antecipada**: até {prefetch_status['concorrencia']} simultâneas, {prefetch_status['pecas']} peças por processo ({pendentes})\n"
+                else:
+                    resposta += "⚡ **Busca antecipada**: desativada (BEMTEVI_PREFETCH=1 para ativar)\n"
+
+                em_voo = voo_unico.em_voo()
+                resposta += "🔗 **Buscas em andamento (coalescidas)**: " + (", ".join(f"{operacao} {total}" for operacao, total in em_voo.items()) or "nenhuma") + "\n"
+
+                circuitos = []
+                for endpoint, circuito in resiliencia_api.status().items():
+                    descricao = f"{endpoint} {circuito['estado']}"
+                    if circuito["estado"] == "aberto":
+                        descricao += f" (sonda em {circuito['reabre_em']:.0f}s, {circuito['rejeitadas']} rejeitadas)"
+                    elif circuito["falhas"]:
+                        descricao += f" ({circuito['falhas']} falha(s) seguidas)"
+                    if circuito["aberturas"]:
+                        descricao += f", {circuito['aberturas']} abertura(s)"
+                    circuitos.append(descricao)
+                limites = [
+                    f"{balde} {valores['taxa']:g}/s (rajada {valores['rajada']}): {valores['liberados']} liberadas, {valores['atrasados']} atrasadas ({valores['espera_total']:.1f}s), {valores['na_fila']} na fila"
+                    for balde, valores in limitador_taxa.status().items()
+                ]
+                resposta += "🚦 **Limite de taxa por host**: " + ("; ".join(limites) or "nenhuma requisição ainda") + "\n"
+                resposta += f"🛡️ **Circuitos da API** (timeouts, {resiliencia_api.tentativas} tentativas): " + ("; ".join(circuitos) or "nenhuma chamada ainda") + "\n"
+
+                esperas = bemtevi_pool.resumo_esperas()
+                if esperas:
+                    resposta += "\n\n⏱️ **Tempo de espera por etapa (s):**\n"
+                    for etapa, tempos in esperas.items():
+                        resposta += f"- {etapa}: {tempos['chamadas']}x, média {tempos['media']}, máx {tempos['maximo']}, estouros {tempos['estouros']}\n"
+
+                resposta += _resumo_metricas()
+                resposta += _resumo_auditoria(arguments)
+                return [TextContent(type="text", text=resposta)]
             else:
-                return [TextContent(type="text", text="❌ **Status BemTevi**: Desconectado\n\n💡 Use 'conectar_bemtevi' para conectar")]
+                resposta = "❌ **Status BemTevi**: Desconectado\n\n💡 Use 'conectar_bemtevi' para conectar\n"
+                resposta += _resumo_auditoria(arguments)
+                return [TextContent(type="text", text=resposta)]
         
         else:
             return [TextContent(type="text", text=f"❌ Ferramenta '{name}' não reconhecida")]
@@ -596,12 +1555,25 @@ async def main():
     print(">>> DEBUG: main() iniciada", file=sys.stderr)
     print(">>> DEBUG: Aguardando conexões do Claude...", file=sys.stderr)
     
-    async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
-        await server.run(
-            read_stream,
-            write_stream,
-            server.create_initialization_options()
-        )
+    # Restaurar a sessão salva em paralelo ao handshake (PBKDF2, requests e cliente
+    # ficam fora do caminho do initialize/list_tools)
+    global restauracao_sessao
+    restauracao_sessao = asyncio.create_task(_restaurar_sessao())
+    # Renovar a sessão antes de expirar, para nenhuma chamada pagar o login
+    renovador.iniciar_proativa(lambda: bemtevi_pool)
+    
+    try:
+        async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
+            await server.run(
+                read_stream,
+                write_stream,
+                server.create_initialization_options()
+            )
+    finally:
+        # Gravar a auditoria pendente (e as métricas, se exportadas) antes de sair
+        auditoria.fechar()
+        if metricas.caminho_prometheus:
+            metricas.exportar_prometheus()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,188 @@
+import functools
+import inspect
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Limites superiores (segundos) dos buckets, no estilo dos histogramas do Prometheus:
+# progressão geométrica de razão 1,5 de 1 ms a ~190 s (erro de percentil abaixo de 50%)
+BUCKETS_PADRAO = tuple(round(0.001 * 1.5 ** i, 6) for i in range(31))
+
+
+class HistogramaLatencia:
+    """Histograma de latência com buckets fixos (memória constante por série)
+
+    Os percentis são estimados por interpolação linear dentro do bucket,
+    como o histogram_quantile do Prometheus; o máximo é exato.
+    """
+
+    def __init__(self, buckets=BUCKETS_PADRAO):
+        self.buckets = buckets
+        self.contagens = [0] * (len(buckets) + 1)  # último = acima do maior limite (+Inf)
+        self.total = 0
+        self.soma = 0.0
+        self.maximo = 0.0
+
+    def observar(self, segundos):
+        self.contagens[bisect_left(self.buckets, segundos)] += 1
+        self.total += 1
+        self.soma += segundos
+        self.maximo = max(self.maximo, segundos)
+
+    def percentil(self, p):
+        if not self.total:
+            return 0.0
+        alvo = p * self.total
+        acumulado = 0
+        for indice, contagem in enumerate(self.contagens):
+            if contagem and acumulado + contagem >= alvo:
+                inferior = self.buckets[indice - 1] if indice else 0.0
+                superior = self.buckets[indice] if indice < len(self.buckets) else self.maximo
+                return min(inferior + (superior - inferior) * (alvo - acumulado) / contagem, self.maximo)
+            acumulado += contagem
+        return self.maximo
+
+    def resumo(self):
+        return {
+            "chamadas": self.total,
+            "media": round(self.soma / self.total, 4) if self.total else 0.0,
+            "p50": round(self.percentil(0.50), 4),
+            "p95": round(self.percentil(0.95), 4),
+            "p99": round(self.percentil(0.99), 4),
+            "maximo": round(self.maximo, 4),
+        }
+
+
+class Metricas:
+    """Latência por ferramenta e por fase (navegador, login, navegação, DOM, HTTP...)
+
+    Séries são identificadas por (família, rótulo): família "ferramenta" com o
+    nome da ferramenta MCP, família "fase" com a etapa interna. Contadores
+    simples (ex.: acertos e faltas de cache) ficam em (família, evento).
+    Com BEMTEVI_METRICAS_PROM definido, uma thread grava periodicamente o
+    formato texto do Prometheus nesse arquivo (para o textfile collector).
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._histogramas = {}  # (familia, rotulo) -> HistogramaLatencia
+        self._contadores = {}   # (familia, evento) -> int
+        self.caminho_prometheus = os.getenv("BEMTEVI_METRICAS_PROM", "")
+        self.intervalo_prometheus = float(os.getenv("BEMTEVI_METRICAS_INTERVALO", "15"))
+        self._exportador = None
+
+    def observar(self, familia, rotulo, segundos):
+        with self._lock:
+            histograma = self._histogramas.get((familia, rotulo))
+            if histograma is None:
+                histograma = self._histogramas[(familia, rotulo)] = HistogramaLatencia()
+            histograma.observar(segundos)
+        self._garantir_exportador()
+
+    @contextmanager
+    def medir(self, familia, rotulo):
+        """Medir o bloco (inclusive com await dentro) e registrar mesmo se ele falhar"""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(familia, rotulo, time.perf_counter() - inicio)
+
+    def contar(self, familia, evento, quantidade=1):
+        with self._lock:
+            self._contadores[(familia, evento)] = self._contadores.get((familia, evento), 0) + quantidade
+
+    def resumo(self, familia):
+        """{rótulo: {chamadas, media, p50, p95, p99, maximo}} de uma família, por rótulo"""
+        with self._lock:
+            return {
+                rotulo: histograma.resumo()
+                for (fam, rotulo), histograma in sorted(self._histogramas.items())
+                if fam == familia
+            }
+
+    def contadores(self):
+        with self._lock:
+            return {f"{familia}.{evento}": total for (familia, evento), total in sorted(self._contadores.items())}
+
+    def texto_prometheus(self):
+        """Todas as séries no formato de exposição texto do Prometheus"""
+        linhas = []
+        with self._lock:
+            familias = sorted({familia for familia, _ in self._histogramas})
+            for familia in familias:
+                nome = f"bemtevi_{familia}_segundos"
+                linhas.append(f"# HELP {nome} Latência por {familia} em segundos")
+                linhas.append(f"# TYPE {nome} histogram")
+                for (fam, rotulo), histograma in sorted(self._histogramas.items()):
+                    if fam != familia:
+                        continue
+                    rotulo = rotulo.replace("\\", "\\\\").replace('"', '\\"')
+                    acumulado = 0
+                    for limite, contagem in zip(histograma.buckets, histograma.contagens):
+                        acumulado += contagem
+                        linhas.append(f'{nome}_bucket{{{familia}="{rotulo}",le="{limite}"}} {acumulado}')
+                    linhas.append(f'{nome}_bucket{{{familia}="{rotulo}",le="+Inf"}} {histograma.total}')
+                    linhas.append(f'{nome}_sum{{{familia}="{rotulo}"}} {histograma.soma:.6f}')
+                    linhas.append(f'{nome}_count{{{familia}="{rotulo}"}} {histograma.total}')
+            familias = sorted({familia for familia, _ in self._contadores})
+            for familia in familias:
+                nome = f"bemtevi_{familia}_total"
+                linhas.append(f"# TYPE {nome} counter")
+                for (fam, evento), total in sorted(self._contadores.items()):
+                    if fam == familia:
+                        linhas.append(f'{nome}{{evento="{evento}"}} {total}')
+        return "\n".join(linhas) + "\n"
+
+    def exportar_prometheus(self, caminho=None):
+        """Gravar o texto do Prometheus de forma atômica (o coletor nunca lê arquivo pela metade)"""
+        caminho = caminho or self.caminho_prometheus
+        diretorio = os.path.dirname(caminho)
+        if diretorio and not os.path.exists(diretorio):
+            os.makedirs(diretorio)
+        temporario = f"{caminho}.tmp"
+        with open(temporario, "w", encoding="utf-8") as arquivo:
+            arquivo.write(self.texto_prometheus())
+        os.replace(temporario, caminho)
+
+    def _garantir_exportador(self):
+        if not self.caminho_prometheus or self._exportador is not None:
+            return
+        with self._lock:
+            if self._exportador is None:
+                self._exportador = threading.Thread(target=self._exportar_periodicamente, name="metricas", daemon=True)
+                self._exportador.start()
+
+    def _exportar_periodicamente(self):
+        while True:
+            time.sleep(self.intervalo_prometheus)
+            try:
+                self.exportar_prometheus()
+            except OSError as e:
+                self.logger.error(f"Erro ao exportar métricas: {e}")
+
+
+# Instância única: clientes, pool, agendador e servidor registram no mesmo lugar
+metricas = Metricas()
+
+
+def medido(familia, rotulo):
+    """Decorador: medir cada chamada da função (síncrona ou assíncrona) em `metricas`"""
+    def decorar(funcao):
+        if inspect.iscoroutinefunction(funcao):
+            @functools.wraps(funcao)
+            async def envolver_async(*args, **kwargs):
+                with metricas.medir(familia, rotulo):
+                    return await funcao(*args, **kwargs)
+            return envolver_async
+
+        @functools.wraps(funcao)
+        def envolver(*args, **kwargs):
+            with metricas.medir(familia, rotulo):
+                return funcao(*args, **kwargs)
+        return envolver
+    return decorar
@@ -0,0 +1,338 @@
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from bemtevi_client import BemTeviClient
+from bemtevi_session import SessaoPersistida
+
+
+def tamanho_pool_padrao():
+    """Tamanho do pool: BEMTEVI_POOL_SIZE ou número de núcleos (máx. 4)"""
+    return int(os.getenv("BEMTEVI_POOL_SIZE", str(min(4, os.cpu_count() or 1))))
+
+
+class _InstanciaPool:
+    """Cliente do pool com metadados para reciclagem"""
+
+    def __init__(self, client, geracao=0):
+        self.client = client
+        self.criado_em = time.monotonic()
+        self.usos = 0
+        self.geracao = geracao  # Sessão com que o navegador foi autenticado
+
+
+class PoolBemTevi:
+    """Pool de BemTeviClient com N navegadores Chrome pré-autenticados
+
+    O primeiro cliente faz o login completo; os demais são aquecidos com os
+    mesmos cookies, sem repetir o fluxo de login. As chamadas de API usam um
+    cliente só HTTP (sem navegador, fora do checkout) com os cookies da sessão
+    atual. Com uma sessão salva em disco válida, nenhum navegador é aberto no
+    início e eles sobem no primeiro checkout. Cada chamada faz checkout de
+    uma instância exclusiva (a página de um navegador nunca é compartilhada),
+    que passa por health check antes do uso e é reciclada ao ficar doente ou
+    atingir o limite de usos/idade. `fechar` espera as instâncias em uso
+    voltarem antes de fechar os navegadores.
+    """
+
+    def __init__(self, tamanho=None):
+        self.tamanho = tamanho or tamanho_pool_padrao()
+        self.max_usos = int(os.getenv("BEMTEVI_POOL_MAX_USOS", "100"))
+        self.max_idade = float(os.getenv("BEMTEVI_POOL_MAX_IDADE", "3600"))
+        self.timeout_checkout = float(os.getenv("BEMTEVI_POOL_TIMEOUT", "120"))
+        self.logger = logging.getLogger(__name__)
+        self.api = None  # Cliente só HTTP (sem navegador) que atende as chamadas de API
+        self.cookies = []
+        self._livres = queue.LifoQueue()  # LIFO: reaproveita o navegador mais "quente"
+        self._instancias = []
+        self._lock = threading.Lock()
+        self._devolvido = threading.Condition(self._lock)
+        self._em_uso = 0
+        self._fechando = False
+        self._reciclagens = 0
+        self._checkouts = 0
+        self._aquecido = False
+        self.sessao_restaurada = False
+        self.geracao = 0  # Incrementada a cada novo conjunto de cookies (login ou renovação)
+        self.sessao = SessaoPersistida(os.getenv("BEMTEVI_USERNAME", ""), os.getenv("BEMTEVI_PASSWORD", ""))
+
+    @property
+    def logged_in(self):
+        return bool(self.api and self.api.logged_in)
+
+    def iniciar(self, usar_sessao_salva=True):
+        """Autenticar o pool: reaproveita a sessão salva ou faz login e aquece os navegadores"""
+        if usar_sessao_salva and self.restaurar():
+            return True
+
+        principal = BemTeviClient()
+        if not principal.fazer_login():
+            principal.fechar_navegador()
+            return False
+
+        self._atualizar_cookies(principal.driver.get_cookies())
+        self.api = self._criar_api(self.cookies)
+        self._registrar(principal)
+
+        with self._lock:
+            self._aquecido = True
+        self._aquecer()
+        return True
+
+    def restaurar(self, cookies=None):
+        """Autenticar apenas a sessão HTTP com os cookies salvos em disco (ou os informados), sem abrir navegador"""
+        cookies = cookies or self.sessao.carregar()
+        if not cookies:
+            return False
+
+        self.api = self._criar_api(cookies)
+        self.cookies = cookies
+        self.geracao += 1
+        self.sessao_restaurada = True
+        self.logger.info("Pool BemTevi autenticado com sessão salva (navegadores sob demanda)")
+        return True
+
+    def renovar_sessao(self):
+        """Login completo via Selenium quando a sessão atual é rejeitada pelo servidor"""
+        self.logger.info("Sessão rejeitada: refazendo login via Selenium")
+        self.sessao.descartar()
+
+        client = BemTeviClient()
+        if not client.fazer_login():
+            client.fechar_navegador()
+            return False
+        self._atualizar_cookies(client.driver.get_cookies())
+
+        # O navegador recém-autenticado entra no pool se houver vaga
+        with self._lock:
+            vaga = len(self._instancias) < self.tamanho
+        if vaga:
+            self._registrar(client)
+        else:
+            client.fechar_navegador()
+        return True
+
+    def _criar_api(self, cookies):
+        """Cliente só HTTP autenticado com os cookies (nunca abre navegador)"""
+        client = BemTeviClient()
+        client.restaurar_sessao(cookies)
+        return client
+
+    def _atualizar_cookies(self, cookies):
+        """Propagar cookies de um novo login: cliente de API e disco
+
+        Navegadores autenticados com a sessão anterior são reciclados no
+        próximo checkout (geração diferente).
+        """
+        self.cookies = cookies
+        self.geracao += 1
+        self.sessao.salvar(cookies)
+        if self.api:
+            self.api._copiar_cookies_para_session(cookies)
+
+    def _aquecer(self):
+        """Completar o pool até `tamanho` navegadores, em paralelo"""
+        with self._lock:
+            faltantes = self.tamanho - len(self._instancias)
+        if faltantes > 0:
+            with ThreadPoolExecutor(max_workers=faltantes) as executor:
+                list(executor.map(lambda _: self._criar_cliente(), range(faltantes)))
+
+        with self._lock:
+            total = len(self._instancias)
+            if not total:
+                self._aquecido = False  # Permite nova tentativa no próximo checkout
+        self.logger.info(f"Pool BemTevi pronto com {total}/{self.tamanho} navegadores")
+
+    def _garantir_navegadores(self):
+        """Sessão restaurada: subir os navegadores em segundo plano no primeiro checkout"""
+        with self._lock:
+            if self._aquecido:
+                return
+            self._aquecido = True
+        threading.Thread(target=self._aquecer, name="bemtevi-aquecimento", daemon=True).start()
+
+    def _registrar(self, client):
+        """Adicionar cliente ao pool e disponibilizá-lo para checkout"""
+        instancia = _InstanciaPool(client, self.geracao)
+        with self._lock:
+            if not self._fechando:
+                self._instancias.append(instancia)
+                self._livres.put(instancia)
+                return instancia
+        client.fechar_navegador()  # Aquecimento terminou depois de o pool fechar
+        return None
+
+    def _criar_cliente(self):
+        """Criar navegador reaproveitando os cookies; refaz o login se forem rejeitados"""
+        client = BemTeviClient()
+        if client.entrar_com_cookies(self.cookies):
+            self._registrar(client)
+            return client
+
+        client.fechar_navegador()
+        client = BemTeviClient()
+        if client.fazer_login():
+            self._atualizar_cookies(client.driver.get_cookies())
+            self._registrar(client)
+            return client
+
+        client.fechar_navegador()
+        self.logger.error("Não foi possível adicionar navegador ao pool")
+        return None
+
+    def _precisa_reciclar(self, instancia):
+        if instancia.usos >= self.max_usos:
+            return True
+        if time.monotonic() - instancia.criado_em >= self.max_idade:
+            return True
+        if instancia.geracao != self.geracao:
+            return True
+        return not instancia.client.verificar_saude()
+
+    def _reciclar(self, instancia):
+        """Substituir uma instância doente ou velha por um navegador novo"""
+        self.logger.info(f"Reciclando navegador do pool (usos={instancia.usos})")
+        with self._lock:
+            if instancia in self._instancias:
+                self._instancias.remove(instancia)
+            self._reciclagens += 1
+        instancia.client.fechar_navegador()
+
+        client = BemTeviClient()
+        if not client.entrar_com_cookies(self.cookies):
+            client.fechar_navegador()
+            client = BemTeviClient()
+            if not client.fazer_login():
+                client.fechar_navegador()
+                raise RuntimeError("Falha ao reciclar navegador do pool")
+            self._atualizar_cookies(client.driver.get_cookies())
+
+        nova = _InstanciaPool(client, self.geracao)
+        with self._lock:
+            fechando = self._fechando
+            if not fechando:
+                self._instancias.append(nova)
+        if fechando:
+            client.fechar_navegador()
+            raise RuntimeError("Pool BemTevi fechado")
+        return nova
+
+    @contextmanager
+    def cliente(self):
+        """Checkout exclusivo de um navegador; devolvido ao pool ao sair do bloco"""
+        if self._fechando:
+            raise RuntimeError("Pool BemTevi fechado")
+        self._garantir_navegadores()
+        try:
+            instancia = self._livres.get(timeout=self.timeout_checkout)
+        except queue.Empty:
+            raise RuntimeError(f"Nenhum navegador livre no pool após {self.timeout_checkout:.0f}s")
+        if instancia is None or self._fechando:
+            # Pool fechado enquanto esperava: a instância já foi (ou será) fechada por `fechar`.
+            # O marcador volta para a fila e acorda o próximo que estiver esperando
+            self._livres.put(None)
+            raise RuntimeError("Pool BemTevi fechado")
+
+        try:
+            if self._precisa_reciclar(instancia):
+                instancia = self._reciclar(instancia)
+        except Exception:
+            # Mantém a capacidade do pool: a vaga volta e será reciclada no próximo checkout
+            self._devolver(instancia)
+            raise
+
+        with self._lock:
+            self._checkouts += 1
+            self._em_uso += 1
+        try:
+            yield instancia.client
+        finally:
+            instancia.usos += 1
+            self._devolver(instancia)
+            with self._devolvido:
+                self._em_uso -= 1
+                self._devolvido.notify_all()
+
+    def _devolver(self, instancia):
+        """Devolver a instância à fila de livres (com o pool fechado, `fechar` já cuidou dela)"""
+        with self._lock:
+            if self._fechando:
+                return
+            if instancia not in self._instancias:
+                self._instancias.append(instancia)
+            self._livres.put(instancia)
+
+    def cliente_api(self):
+        """Cliente só HTTP cuja sessão autenticada atende as chamadas de API (sem checkout de navegador)"""
+        return self.api
+
+    def resumo_esperas(self):
+        """Agregar os tempos de espera por etapa de todos os navegadores"""
+        agregado = {}
+        with self._lock:
+            instancias = list(self._instancias)
+        for instancia in instancias:
+            espera = instancia.client.espera
+            if not espera:
+                continue
+            for etapa, tempos in espera.tempos.items():
+                total = agregado.setdefault(etapa, {"chamadas": 0, "total": 0.0, "maximo": 0.0, "estouros": 0})
+                total["chamadas"] += tempos["chamadas"]
+                total["total"] += tempos["total"]
+                total["maximo"] = max(total["maximo"], tempos["maximo"])
+                total["estouros"] += tempos["estouros"]
+        for tempos in agregado.values():
+            tempos["media"] = round(tempos["total"] / tempos["chamadas"], 3) if tempos["chamadas"] else 0.0
+            tempos["total"] = round(tempos["total"], 3)
+            tempos["maximo"] = round(tempos["maximo"], 3)
+        return agregado
+
+    def status(self):
+        """Estado atual do pool"""
+        with self._lock:
+            total = len(self._instancias)
+            checkouts = self._checkouts
+            reciclagens = self._reciclagens
+            em_uso = self._em_uso
+        return {
+            "tamanho": self.tamanho,
+            "ativos": total,
+            "livres": 0 if self._fechando else self._livres.qsize(),  # Fechado: só o marcador
+            "em_uso": em_uso,
+            "checkouts": checkouts,
+            "reciclagens": reciclagens,
+            "sessao_restaurada": self.sessao_restaurada,
+            "sessao_expira_em": self.sessao.expira_em,
+        }
+
+    def fechar(self):
+        """Fechar todos os navegadores do pool, depois de as instâncias em uso voltarem
+
+        Novos checkouts são recusados; as chamadas em andamento têm até
+        BEMTEVI_POOL_TIMEOUT segundos para terminar (bloqueante: rodar numa faixa).
+        """
+        prazo = time.monotonic() + self.timeout_checkout
+        with self._devolvido:
+            self._fechando = True
+            while self._em_uso and time.monotonic() < prazo:
+                self._devolvido.wait(prazo - time.monotonic())
+            if self._em_uso:
+                self.logger.warning(f"Fechando o pool com {self._em_uso} navegador(es) ainda em uso")
+            instancias = list(self._instancias)
+            self._instancias.clear()
+            # Livres também saem da fila: quem ainda espera em `get` não recebe navegador fechado
+            while True:
+                try:
+                    self._livres.get_nowait()
+                except queue.Empty:
+                    break
+            self._livres.put(None)  # Marcador de fechamento para quem espera em `get`
+        for instancia in instancias:
+            instancia.client.fechar_navegador()
+        if self.api and self.api.http:
+            self.api.http.descartar()
+        self.logger.info("Pool BemTevi fechado")
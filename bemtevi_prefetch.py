@@ -0,0 +1,150 @@
+import asyncio
+import functools
+import logging
+import os
+from collections import OrderedDict
+from bemtevi_metricas import metricas
+
+
+class PrefetchProcessos:
+    """Busca antecipada (opt-in) dos documentos pedidos depois de consultar_processo
+
+    Com BEMTEVI_PREFETCH=1, cada consulta de processo dispara em segundo plano
+    as buscas que o fluxo normal faria a seguir (despacho, AIRR e,
+    opcionalmente, as primeiras BEMTEVI_PREFETCH_PECAS peças), que deixam o
+    resultado no store. No máximo BEMTEVI_PREFETCH_CONCORRENCIA buscas correm
+    ao mesmo tempo, somando todos os processos.
+
+    Um processo é considerado abandonado, e suas buscas pendentes são
+    canceladas, quando nenhuma ferramenta o usa por BEMTEVI_PREFETCH_ABANDONO
+    segundos ou quando outros BEMTEVI_PREFETCH_PROCESSOS processos são
+    consultados depois dele. Uma ferramenta que chega com a busca já em
+    andamento aguarda o mesmo resultado (`aguardar`) em vez de repetir a
+    requisição; se a busca ainda espera vaga, ela é cancelada e a
+    ferramenta busca na hora, sem ficar atrás de outras buscas antecipadas.
+    """
+
+    def __init__(self):
+        self.ativo = os.getenv("BEMTEVI_PREFETCH", "0") == "1"
+        self.pecas = int(os.getenv("BEMTEVI_PREFETCH_PECAS", "0"))
+        self.concorrencia = int(os.getenv("BEMTEVI_PREFETCH_CONCORRENCIA", "2"))
+        self.max_processos = int(os.getenv("BEMTEVI_PREFETCH_PROCESSOS", "2"))
+        self.abandono = float(os.getenv("BEMTEVI_PREFETCH_ABANDONO", "300"))
+        self.logger = logging.getLogger(__name__)
+        self._limite = asyncio.Semaphore(self.concorrencia)
+        self._processos = OrderedDict()  # numero -> {"tarefas": {rotulo: Task}, "timer": TimerHandle}
+        self._iniciadas = set()  # Tarefas que já passaram do semáforo (requisição em andamento)
+
+    def agendar(self, numero_processo, trabalhos):
+        """Iniciar as buscas [(rótulo, fábrica de corrotina)] ainda não em andamento"""
+        if not self.ativo:
+            return 0
+        processo = self._processos.pop(numero_processo, None) or {"tarefas": {}, "timer": None}
+        self._processos[numero_processo] = processo  # Mais recente no fim
+        novas = 0
+        for rotulo, fabrica in trabalhos:
+            if rotulo in processo["tarefas"]:
+                continue
+            tarefa = asyncio.create_task(
+                self._executar(fabrica), name=f"prefetch:{numero_processo}:{rotulo}"
+            )
+            tarefa.add_done_callback(functools.partial(self._concluida, numero_processo, rotulo))
+            processo["tarefas"][rotulo] = tarefa
+            novas += 1
+        metricas.contar("prefetch", "iniciado", novas)
+        self.tocar(numero_processo)
+
+        while len(self._processos) > self.max_processos:
+            self.cancelar(next(iter(self._processos)), "substituido")
+        return novas
+
+    async def _executar(self, fabrica):
+        async with self._limite:
+            self._iniciadas.add(asyncio.current_task())
+            return await fabrica()
+
+    def _concluida(self, numero_processo, rotulo, tarefa):
+        self._iniciadas.discard(tarefa)
+        processo = self._processos.get(numero_processo)
+        if processo and processo["tarefas"].get(rotulo) is tarefa:
+            del processo["tarefas"][rotulo]
+            if not processo["tarefas"]:
+                self._descartar(numero_processo)
+        if tarefa.cancelled():
+            return  # Contado em `cancelar`
+        erro = tarefa.exception()
+        resultado = None if erro else tarefa.result()
+        if erro or (isinstance(resultado, dict) and not resultado.get("sucesso")):
+            metricas.contar("prefetch", "falhou")
+            self.logger.info(f"Busca antecipada {rotulo} de {numero_processo} falhou: {erro or resultado.get('erro')}")
+        else:
+            metricas.contar("prefetch", "concluido")
+
+    def tocar(self, numero_processo):
+        """Processo em uso: adiar o cancelamento por abandono"""
+        processo = self._processos.get(numero_processo)
+        if not processo:
+            return
+        self._processos.move_to_end(numero_processo)
+        if processo["timer"]:
+            processo["timer"].cancel()
+        processo["timer"] = asyncio.get_running_loop().call_later(
+            self.abandono, self.cancelar, numero_processo, "abandonado"
+        )
+
+    def _descartar(self, numero_processo):
+        processo = self._processos.pop(numero_processo, None)
+        if processo and processo["timer"]:
+            processo["timer"].cancel()
+        return processo
+
+    def cancelar(self, numero_processo=None, motivo="invalidado"):
+        """Cancelar as buscas pendentes de um processo (ou de todos)"""
+        numeros = [numero_processo] if numero_processo else list(self._processos)
+        canceladas = 0
+        for numero in numeros:
+            processo = self._descartar(numero)
+            if not processo:
+                continue
+            for tarefa in processo["tarefas"].values():
+                if not tarefa.done():
+                    tarefa.cancel()
+                    canceladas += 1
+        if canceladas:
+            metricas.contar("prefetch", f"cancelado.{motivo}", canceladas)
+            self.logger.info(f"{canceladas} busca(s) antecipada(s) cancelada(s) ({motivo})")
+        return canceladas
+
+    async def aguardar(self, numero_processo, rotulo):
+        """Resultado da busca antecipada em andamento, ou None se não houver
+
+        Cancelar quem aguarda não cancela a busca (ela continua para o
+        store); se a busca for cancelada, o chamador segue o caminho normal.
+        """
+        processo = self._processos.get(numero_processo)
+        tarefa = processo["tarefas"].get(rotulo) if processo else None
+        if tarefa is None or tarefa is asyncio.current_task():
+            return None
+        if tarefa not in self._iniciadas:
+            # Ainda na fila do semáforo: a ferramenta assume a busca em vez de esperar a vez
+            tarefa.cancel()
+            metricas.contar("prefetch", "assumido")
+            return None
+        try:
+            resultado = await asyncio.shield(tarefa)
+        except asyncio.CancelledError:
+            if tarefa.cancelled():
+                return None
+            raise
+        except Exception:
+            return None
+        metricas.contar("prefetch", "aproveitado")
+        return resultado
+
+    def status(self):
+        return {
+            "ativo": self.ativo,
+            "pecas": self.pecas,
+            "concorrencia": self.concorrencia,
+            "processos": {numero: sorted(processo["tarefas"]) for numero, processo in self._processos.items()},
+        }
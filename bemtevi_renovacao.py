@@ -0,0 +1,116 @@
+import asyncio
+import logging
+import os
+import time
+from bemtevi_metricas import metricas
+
+
+class RenovadorSessao:
+    """Renovação da sessão BemTevi sem derrubar as chamadas em andamento
+
+    Uma única renovação (login via Selenium na faixa 'navegador') atende todas
+    as chamadas que receberam 401/403 ao mesmo tempo; chamadas novas esperam
+    por ela antes de ir à rede em vez de falhar. Cada sessão tem uma geração
+    (PoolBemTevi.geracao): uma rejeição de requisição feita com uma geração
+    já substituída só provoca a repetição, não um novo login.
+
+    Com a expiração conhecida (cookies ou BEMTEVI_SESSAO_TTL), a renovação é
+    feita em segundo plano BEMTEVI_SESSAO_RENOVAR_ANTES segundos antes de a
+    sessão vencer, para que nenhuma chamada pague o login. Uma renovação que
+    falha ou não adia a expiração é repetida com espera exponencial, de
+    BEMTEVI_SESSAO_RENOVAR_ESPERA até BEMTEVI_SESSAO_RENOVAR_ESPERA_MAX
+    segundos, em vez de refazer o login a cada minuto.
+    """
+
+    def __init__(self, agendador):
+        self.agendador = agendador
+        self.antecedencia = float(os.getenv("BEMTEVI_SESSAO_RENOVAR_ANTES", "600"))
+        self.intervalo_falha = float(os.getenv("BEMTEVI_SESSAO_RENOVAR_ESPERA", "60"))
+        self.intervalo_falha_max = float(os.getenv("BEMTEVI_SESSAO_RENOVAR_ESPERA_MAX", "1800"))
+        self.logger = logging.getLogger(__name__)
+        self._tarefa = None      # Renovação em andamento
+        self._proativa = None    # Laço de renovação antes da expiração
+        self.renovacoes = 0
+        self.falhas = 0
+        self.ultima = None
+
+    @property
+    def em_andamento(self):
+        return self._tarefa is not None and not self._tarefa.done()
+
+    async def aguardar(self):
+        """Esperar a renovação em andamento, se houver (chamadas que chegam durante o login)"""
+        if self.em_andamento:
+            try:
+                await asyncio.shield(self._tarefa)
+            except Exception:
+                pass  # A própria chamada vai receber o 401 e decidir
+
+    async def renovar(self, pool, geracao_vista=None, motivo="rejeitada"):
+        """Renovar a sessão (coalescido); True se há uma sessão mais nova que `geracao_vista`"""
+        if geracao_vista is not None and pool.geracao != geracao_vista:
+            return True  # Outra chamada já renovou depois desta requisição
+        if not self.em_andamento:
+            self._tarefa = asyncio.create_task(self._executar(pool, motivo), name="renovacao_sessao")
+        else:
+            metricas.contar("sessao", "renovacao.compartilhada")
+        try:
+            return await asyncio.shield(self._tarefa)
+        except Exception as e:
+            self.logger.error(f"Erro ao renovar sessão: {e}")
+            return False
+
+    async def _executar(self, pool, motivo):
+        self.logger.info(f"Renovando sessão BemTevi ({motivo})")
+        with metricas.medir("fase", "sessao.renovacao"):
+            sucesso = await self.agendador.executar("navegador", pool.renovar_sessao)
+        metricas.contar("sessao", f"renovacao.{motivo}.{'ok' if sucesso else 'falha'}")
+        if sucesso:
+            self.renovacoes += 1
+            self.ultima = time.time()
+        else:
+            self.falhas += 1
+        return sucesso
+
+    def proxima_proativa(self, pool):
+        """Momento (epoch) da próxima renovação proativa, ou None sem expiração conhecida"""
+        expira_em = pool.sessao.expira_em if pool else None
+        return expira_em - self.antecedencia if expira_em else None
+
+    def iniciar_proativa(self, obter_pool):
+        """Laço em segundo plano que renova antes da expiração (obter_pool: pool atual ou None)"""
+        if self._proativa is None or self._proativa.done():
+            self._proativa = asyncio.create_task(self._renovar_antes_de_expirar(obter_pool), name="renovacao_proativa")
+
+    async def _renovar_antes_de_expirar(self, obter_pool):
+        seguidas = 0  # Renovações proativas seguidas sem efeito
+        while True:
+            pool = obter_pool()
+            momento = self.proxima_proativa(pool)
+            if momento is None:
+                await asyncio.sleep(self.intervalo_falha)
+                continue
+            espera = momento - time.time()
+            if espera > 0:
+                # Acordar periodicamente: a sessão pode ser trocada (conectar_bemtevi, renovação reativa)
+                await asyncio.sleep(min(espera, 300))
+                continue
+            sucesso = await self.renovar(pool, motivo="proativa")
+            if sucesso and (self.proxima_proativa(pool) or 0) > time.time():
+                seguidas = 0
+                continue
+            # Falhou ou não adiou a expiração (ex.: cookie de validade curta): não insistir em laço
+            seguidas += 1
+            metricas.contar("sessao", "renovacao.proativa.sem_efeito")
+            await asyncio.sleep(min(self.intervalo_falha * 2 ** (seguidas - 1), self.intervalo_falha_max))
+
+    def status(self, pool=None):
+        momento = self.proxima_proativa(pool)
+        return {
+            "em_andamento": self.em_andamento,
+            "renovacoes": self.renovacoes,
+            "falhas": self.falhas,
+            "ultima": self.ultima,
+            "proxima_proativa": momento,
+            "geracao": pool.geracao if pool else None,
+        }
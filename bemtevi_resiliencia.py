@@ -0,0 +1,255 @@
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from bemtevi_limite import limitador_taxa
+from bemtevi_metricas import metricas
+
+# Timeout de leitura (segundos) por endpoint; conexão usa BEMTEVI_HTTP_CONNECT_TIMEOUT.
+# Sobrescrevível por BEMTEVI_TIMEOUT_<ENDPOINT> (ex.: BEMTEVI_TIMEOUT_AIRR=40)
+TIMEOUTS_PADRAO = {
+    "despacho_admissibilidade": 20.0,
+    "airr": 20.0,
+    "listagem": 15.0,
+    "peca": 30.0,
+}
+
+# Respostas que indicam indisponibilidade passageira (vale repetir o GET)
+STATUS_REPETIVEIS = (429, 500, 502, 503, 504)
+
+
+class ApiIndisponivel(Exception):
+    """Endpoint indisponível: circuito aberto ou tentativas esgotadas"""
+
+    def __init__(self, endpoint, motivo):
+        super().__init__(f"API indisponível ({endpoint}): {motivo}")
+        self.endpoint = endpoint
+        self.motivo = motivo
+
+
+class Disjuntor:
+    """Circuit breaker de um endpoint: fechado → aberto → meio-aberto → fechado
+
+    Depois de `limite` falhas seguidas o circuito abre e as chamadas falham
+    na hora (o chamador serve o store desatualizado, se houver). Passados
+    `espera` segundos, uma única chamada de sonda vai à rede: sucesso fecha o
+    circuito, falha reabre por mais `espera` segundos. Sonda cancelada
+    (`abortar`) também reabre; sonda sem resultado em `prazo_sonda` segundos
+    é dada como perdida e a próxima chamada vira a nova sonda.
+    """
+
+    FECHADO, ABERTO, MEIO_ABERTO = "fechado", "aberto", "meio-aberto"
+    SONDA = "sonda"  # Retorno de `permitir` para a chamada de sonda (verdadeiro)
+
+    def __init__(self, endpoint, limite, espera, prazo_sonda):
+        self.endpoint = endpoint
+        self.limite = limite
+        self.espera = espera
+        self.prazo_sonda = prazo_sonda
+        self.estado = self.FECHADO
+        self.falhas = 0
+        self.aberto_ate = 0.0
+        self.sonda_ate = 0.0
+        self.aberturas = 0
+        self.rejeitadas = 0
+        self._lock = threading.Lock()
+
+    def permitir(self):
+        """True se a chamada pode ir à rede; SONDA se ela é a sonda do meio-aberto"""
+        with self._lock:
+            if self.estado == self.FECHADO:
+                return True
+            agora = time.monotonic()
+            if (self.estado == self.ABERTO and agora >= self.aberto_ate) or (
+                self.estado == self.MEIO_ABERTO and agora >= self.sonda_ate
+            ):
+                self.estado = self.MEIO_ABERTO  # Esta chamada é a sonda
+                self.sonda_ate = agora + self.prazo_sonda
+                return self.SONDA
+            self.rejeitadas += 1
+            return False
+
+    def abortar(self):
+        """Sonda terminou sem resultado (cancelada): voltar a aberto em vez de ficar meio-aberto"""
+        with self._lock:
+            if self.estado == self.MEIO_ABERTO:
+                self.estado = self.ABERTO
+                self.aberto_ate = time.monotonic() + self.espera
+
+    def sucesso(self):
+        with self._lock:
+            if self.estado != self.FECHADO:
+                logging.getLogger(__name__).info(f"Circuito {self.endpoint} fechado: API respondeu")
+            self.estado = self.FECHADO
+            self.falhas = 0
+
+    def falha(self):
+        with self._lock:
+            self.falhas += 1
+            if self.estado == self.MEIO_ABERTO or self.falhas >= self.limite:
+                if self.estado != self.ABERTO:
+                    self.aberturas += 1
+                    metricas.contar("resiliencia", f"{self.endpoint}.circuito_aberto")
+                    logging.getLogger(__name__).warning(
+                        f"Circuito {self.endpoint} aberto por {self.espera:.0f}s após {self.falhas} falha(s)"
+                    )
+                self.estado = self.ABERTO
+                self.aberto_ate = time.monotonic() + self.espera
+
+    def status(self):
+        with self._lock:
+            return {
+                "estado": self.estado,
+                "falhas": self.falhas,
+                "reabre_em": max(self.aberto_ate - time.monotonic(), 0) if self.estado == self.ABERTO else 0,
+                "aberturas": self.aberturas,
+                "rejeitadas": self.rejeitadas,
+            }
+
+
+class ResilienciaApi:
+    """Timeouts por endpoint, repetição com jitter e circuit breaker para os GETs da API
+
+    Só GETs (idempotentes) passam por aqui. Falhas de transporte (timeout,
+    conexão) e respostas 429/5xx são repetidas até BEMTEVI_HTTP_TENTATIVAS
+    vezes no total, com backoff exponencial de jitter completo (sorteio entre
+    0 e BEMTEVI_HTTP_BACKOFF·2^n, no máximo BEMTEVI_HTTP_BACKOFF_MAX; um
+    Retry-After numérico é respeitado dentro desse teto). A chamada inteira
+    (esperas e tentativas) cabe em BEMTEVI_HTTP_PRAZO segundos: o timeout de
+    cada tentativa é limitado ao tempo restante e uma tentativa que não teria
+    ao menos BEMTEVI_HTTP_TENTATIVA_MIN segundos não é feita. (No requests e
+    no httpx o timeout de leitura vale por leitura, não pela resposta toda.)
+    Outras respostas (inclusive 401/403
+    e 404) voltam ao chamador sem repetição.
+
+    Cada endpoint tem seu Disjuntor (BEMTEVI_DISJUNTOR_FALHAS falhas seguidas
+    abrem o circuito por BEMTEVI_DISJUNTOR_ESPERA segundos). Circuito aberto
+    ou tentativas esgotadas viram ApiIndisponivel. Toda tentativa, inclusive
+    as repetições, passa pelo limite de taxa do host (classe "api").
+    """
+
+    def __init__(self):
+        self.tentativas = max(int(os.getenv("BEMTEVI_HTTP_TENTATIVAS", "3")), 1)
+        self.backoff = float(os.getenv("BEMTEVI_HTTP_BACKOFF", "0.5"))
+        self.backoff_max = float(os.getenv("BEMTEVI_HTTP_BACKOFF_MAX", "4"))
+        self.prazo = float(os.getenv("BEMTEVI_HTTP_PRAZO", "30"))
+        self.tentativa_minima = float(os.getenv("BEMTEVI_HTTP_TENTATIVA_MIN", "2"))
+        self.conexao = float(os.getenv("BEMTEVI_HTTP_CONNECT_TIMEOUT", "10"))
+        self.limite_falhas = int(os.getenv("BEMTEVI_DISJUNTOR_FALHAS", "5"))
+        self.espera_aberto = float(os.getenv("BEMTEVI_DISJUNTOR_ESPERA", "30"))
+        self.logger = logging.getLogger(__name__)
+        self._disjuntores = {}
+        self._lock = threading.Lock()
+
+    def timeout(self, endpoint, restante=None):
+        """Timeout de leitura do endpoint (segundos), limitado ao `restante` do prazo"""
+        padrao = TIMEOUTS_PADRAO.get(endpoint, 30.0)
+        timeout = float(os.getenv(f"BEMTEVI_TIMEOUT_{endpoint.upper()}", str(padrao)))
+        return timeout if restante is None else min(timeout, restante)
+
+    def timeout_requests(self, endpoint, restante=None):
+        """Timeout no formato do requests: (conexão, leitura)"""
+        conexao = self.conexao if restante is None else min(self.conexao, restante)
+        return (conexao, self.timeout(endpoint, restante))
+
+    def _restante(self, endpoint, inicio, tentativa):
+        """Tempo restante do prazo para esta tentativa, ou ApiIndisponivel se não couber"""
+        restante = self.prazo - (time.monotonic() - inicio)
+        if restante < self.tentativa_minima:
+            raise ApiIndisponivel(endpoint, f"prazo de {self.prazo:.0f}s esgotado após {tentativa} tentativa(s)")
+        return restante
+
+    def disjuntor(self, endpoint):
+        with self._lock:
+            disjuntor = self._disjuntores.get(endpoint)
+            if disjuntor is None:
+                disjuntor = self._disjuntores[endpoint] = Disjuntor(
+                    endpoint, self.limite_falhas, self.espera_aberto, self.prazo
+                )
+            return disjuntor
+
+    def _espera(self, tentativa, response):
+        """Backoff com jitter completo (ou o Retry-After da resposta, limitado ao teto)"""
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.strip().isdigit():
+            return min(float(retry_after), self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff * 2 ** tentativa))
+
+    def _avaliar(self, disjuntor, response, erro):
+        """Registrar o resultado da tentativa; True se ela deve ser repetida"""
+        if erro is None and response.status_code not in STATUS_REPETIVEIS:
+            disjuntor.sucesso()
+            return False
+        disjuntor.falha()
+        return True
+
+    def _proxima(self, endpoint, tentativa, inicio, response, erro):
+        """Espera antes da próxima tentativa, ou ApiIndisponivel se não houver outra"""
+        motivo = str(erro) if erro is not None else f"HTTP {response.status_code}"
+        espera = self._espera(tentativa, response)
+        # Depois da espera precisa sobrar tempo para uma tentativa útil
+        if tentativa + 1 >= self.tentativas or time.monotonic() - inicio + espera + self.tentativa_minima > self.prazo:
+            raise ApiIndisponivel(endpoint, f"{motivo} após {tentativa + 1} tentativa(s)")
+        metricas.contar("resiliencia", f"{endpoint}.repeticao")
+        self.logger.info(f"GET {endpoint} falhou ({motivo}); nova tentativa em {espera:.2f}s")
+        return espera
+
+    def get(self, endpoint, url, funcao):
+        """Executar `funcao(timeout)` (GET síncrono em `url` que devolve a resposta) com repetição e disjuntor"""
+        disjuntor = self.disjuntor(endpoint)
+        inicio = time.monotonic()
+        for tentativa in range(self.tentativas):
+            permitido = disjuntor.permitir()
+            if not permitido:
+                raise ApiIndisponivel(endpoint, "circuito aberto")
+            response, erro, concluida = None, None, False
+            try:
+                limitador_taxa.aguardar(url, "api")
+                restante = self._restante(endpoint, inicio, tentativa)
+                try:
+                    response = funcao(self.timeout_requests(endpoint, restante))
+                except Exception as e:
+                    erro = e
+                concluida = True
+            finally:
+                if not concluida and permitido == Disjuntor.SONDA:
+                    disjuntor.abortar()
+            if not self._avaliar(disjuntor, response, erro):
+                return response
+            time.sleep(self._proxima(endpoint, tentativa, inicio, response, erro))
+
+    async def get_async(self, endpoint, url, funcao):
+        """Versão assíncrona de `get`: `funcao(timeout)` é uma corrotina"""
+        disjuntor = self.disjuntor(endpoint)
+        inicio = time.monotonic()
+        for tentativa in range(self.tentativas):
+            permitido = disjuntor.permitir()
+            if not permitido:
+                raise ApiIndisponivel(endpoint, "circuito aberto")
+            response, erro, concluida = None, None, False
+            try:
+                await limitador_taxa.aguardar_async(url, "api")
+                restante = self._restante(endpoint, inicio, tentativa)
+                try:
+                    response = await funcao(self.timeout(endpoint, restante))
+                except Exception as e:
+                    erro = e
+                concluida = True
+            finally:
+                # CancelledError não é Exception: sonda cancelada não pode deixar o circuito meio-aberto
+                if not concluida and permitido == Disjuntor.SONDA:
+                    disjuntor.abortar()
+            if not self._avaliar(disjuntor, response, erro):
+                return response
+            await asyncio.sleep(self._proxima(endpoint, tentativa, inicio, response, erro))
+
+    def status(self):
+        with self._lock:
+            disjuntores = dict(self._disjuntores)
+        return {endpoint: disjuntor.status() for endpoint, disjuntor in sorted(disjuntores.items())}
+
+
+# Compartilhado por todos os clientes: o estado do circuito é do endpoint, não do navegador
+resiliencia_api = ResilienciaApi()
@@ -0,0 +1,154 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from bemtevi_pool import tamanho_pool_padrao
+from bemtevi_metricas import metricas
+
+
+class FaixaExecucao:
+    """Faixa (lane) de execução com threads fixas e fila limitada
+
+    A capacidade total é `max_workers + max_fila`; acima disso as chamadas
+    aguardam vaga por até `timeout_fila` segundos (backpressure) e então são
+    rejeitadas, em vez de acumular trabalho sem limite. A vaga só é
+    devolvida quando a thread termina: cancelar quem aguarda não libera
+    espaço enquanto o trabalho ainda ocupa uma thread.
+    """
+
+    def __init__(self, nome, max_workers, max_fila, timeout_fila):
+        self.nome = nome
+        self.max_workers = max_workers
+        self.max_fila = max_fila
+        self.timeout_fila = timeout_fila
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"bemtevi-{nome}")
+        self._vagas = asyncio.Semaphore(max_workers + max_fila)
+        self._lock = threading.Lock()
+        self._pendentes = 0         # Com vaga: na fila do executor ou em execução
+        self._aguardando_vaga = 0   # Bloqueados em _vagas.acquire()
+        self._em_execucao = 0
+        self._concluidas = 0
+        self._rejeitadas = 0
+        self._espera_total = 0.0
+        self._espera_max = 0.0
+        self._execucao_total = 0.0
+        self._execucao_max = 0.0
+
+    async def executar(self, funcao, *args):
+        """Executar `funcao(*args)` numa thread da faixa sem bloquear o event loop"""
+        enfileirado_em = time.monotonic()
+        with self._lock:
+            self._aguardando_vaga += 1
+        try:
+            await asyncio.wait_for(self._vagas.acquire(), timeout=self.timeout_fila)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self._rejeitadas += 1
+            raise RuntimeError(f"Fila '{self.nome}' saturada: tente novamente em instantes")
+        finally:
+            with self._lock:
+                self._aguardando_vaga -= 1
+
+        def tarefa():
+            inicio = time.monotonic()
+            espera = inicio - enfileirado_em
+            with self._lock:
+                self._em_execucao += 1
+                self._espera_total += espera
+                self._espera_max = max(self._espera_max, espera)
+            metricas.observar("fase", f"fila.{self.nome}", espera)
+            try:
+                return funcao(*args)
+            finally:
+                duracao = time.monotonic() - inicio
+                with self._lock:
+                    self._em_execucao -= 1
+                    self._concluidas += 1
+                    self._execucao_total += duracao
+                    self._execucao_max = max(self._execucao_max, duracao)
+
+        loop = asyncio.get_running_loop()
+
+        def liberar(_futuro):
+            # Thread terminou (ou a tarefa foi cancelada antes de começar): só agora a vaga volta
+            with self._lock:
+                self._pendentes -= 1
+            try:
+                loop.call_soon_threadsafe(self._vagas.release)
+            except RuntimeError:
+                pass  # Event loop já encerrado
+
+        with self._lock:
+            self._pendentes += 1
+        try:
+            futuro = self.executor.submit(tarefa)
+        except RuntimeError:  # Executor encerrado
+            with self._lock:
+                self._pendentes -= 1
+            self._vagas.release()
+            raise
+        futuro.add_done_callback(liberar)
+        return await asyncio.wrap_future(futuro)
+
+    def status(self):
+        """Métricas da faixa: fila, execução e tempos médios/máximos (segundos)"""
+        with self._lock:
+            concluidas = self._concluidas
+            return {
+                "workers": self.max_workers,
+                "limite_fila": self.max_fila,
+                "em_execucao": self._em_execucao,
+                "na_fila": self._aguardando_vaga + max(0, self._pendentes - self._em_execucao),
+                "concluidas": concluidas,
+                "rejeitadas": self._rejeitadas,
+                "espera_media": round(self._espera_total / concluidas, 3) if concluidas else 0.0,
+                "espera_max": round(self._espera_max, 3),
+                "execucao_media": round(self._execucao_total / concluidas, 3) if concluidas else 0.0,
+                "execucao_max": round(self._execucao_max, 3),
+            }
+
+    def encerrar(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class Agendador:
+    """Agendador único e de longa duração para o trabalho bloqueante do servidor
+
+    Separa o trabalho apenas HTTP (despacho/AIRR) do trabalho que ocupa um
+    navegador, para que chamadas de API não fiquem presas atrás de navegações.
+    """
+
+    def __init__(self):
+        timeout_fila = float(os.getenv("BEMTEVI_FILA_TIMEOUT", "30"))
+        self.logger = logging.getLogger(__name__)
+        self.faixas = {
+            "api": FaixaExecucao(
+                "api",
+                int(os.getenv("BEMTEVI_API_WORKERS", "8")),
+                int(os.getenv("BEMTEVI_API_FILA", "64")),
+                timeout_fila,
+            ),
+            "navegador": FaixaExecucao(
+                "navegador",
+                int(os.getenv("BEMTEVI_NAVEGADOR_WORKERS", str(tamanho_pool_padrao()))),
+                int(os.getenv("BEMTEVI_NAVEGADOR_FILA", "32")),
+                timeout_fila,
+            ),
+        }
+
+    async def executar(self, faixa, funcao, *args):
+        """Executar trabalho bloqueante na faixa indicada ('api' ou 'navegador')"""
+        return await self.faixas[faixa].executar(funcao, *args)
+
+    def capacidade(self, faixa):
+        """Quantas chamadas a faixa executa ao mesmo tempo (threads)"""
+        return self.faixas[faixa].max_workers
+
+    def status(self):
+        return {nome: faixa.status() for nome, faixa in self.faixas.items()}
+
+    def encerrar(self):
+        for faixa in self.faixas.values():
+            faixa.encerrar()
@@ -0,0 +1,121 @@
+import base64
+import hashlib
+import json
+import logging
+import os
+import time
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+except ImportError:  # Sem cryptography a sessão não é persistida (nunca em texto puro)
+    Fernet = None
+    InvalidToken = Exception
+
+
+class SessaoPersistida:
+    """Cookie jar autenticado salvo em disco, cifrado, com controle de expiração
+
+    Os cookies obtidos no login via Selenium são cifrados com Fernet usando
+    uma chave derivada (PBKDF2) de BEMTEVI_SESSAO_CHAVE ou, na falta dela, das
+    credenciais configuradas. A sessão expira no menor `expiry` dos cookies
+    de sessão (BEMTEVI_SESSAO_COOKIES, padrão JSESSIONID) ou, se nenhum tiver
+    validade, BEMTEVI_SESSAO_TTL segundos após o login. Os demais cookies
+    (analytics, preferências) vencem por conta própria e não derrubam o login.
+    """
+
+    ITERACOES_PBKDF2 = 200_000
+    TAMANHO_SALT = 16
+
+    def __init__(self, usuario="", senha="", caminho=None):
+        self.caminho = caminho or os.getenv(
+            "BEMTEVI_SESSAO_PATH", os.path.join(os.getcwd(), "cache", "sessao.bin")
+        )
+        self.ttl = float(os.getenv("BEMTEVI_SESSAO_TTL", str(8 * 3600)))
+        self.cookies_sessao = {
+            nome.strip() for nome in os.getenv("BEMTEVI_SESSAO_COOKIES", "JSESSIONID").split(",") if nome.strip()
+        }
+        self.usuario = usuario
+        self._segredo = (os.getenv("BEMTEVI_SESSAO_CHAVE") or f"{usuario}:{senha}").encode("utf-8")
+        self.logger = logging.getLogger(__name__)
+        self.expira_em = None
+
+    @property
+    def disponivel(self):
+        return Fernet is not None and self._segredo != b":"
+
+    def _fernet(self, salt):
+        chave = hashlib.pbkdf2_hmac("sha256", self._segredo, salt, self.ITERACOES_PBKDF2)
+        return Fernet(base64.urlsafe_b64encode(chave))
+
+    def _calcular_expiracao(self, cookies):
+        validades = [
+            c["expiry"] for c in cookies
+            if c.get("name") in self.cookies_sessao and isinstance(c.get("expiry"), (int, float))
+        ]
+        limite_ttl = time.time() + self.ttl
+        return min(validades + [limite_ttl]) if validades else limite_ttl
+
+    def salvar(self, cookies):
+        """Cifrar e gravar os cookies da sessão autenticada"""
+        self.expira_em = self._calcular_expiracao(cookies)  # Conhecida mesmo sem persistir
+        if not self.disponivel:
+            self.logger.warning("Sessão não persistida: cryptography ausente ou credenciais não configuradas")
+            return False
+        try:
+            conteudo = json.dumps({
+                "usuario": self.usuario,
+                "salvo_em": time.time(),
+                "expira_em": self.expira_em,
+                "cookies": cookies,
+            }).encode("utf-8")
+            salt = os.urandom(self.TAMANHO_SALT)
+            dados = salt + self._fernet(salt).encrypt(conteudo)
+
+            diretorio = os.path.dirname(self.caminho)
+            if diretorio and not os.path.exists(diretorio):
+                os.makedirs(diretorio)
+            temporario = f"{self.caminho}.tmp"
+            with open(temporario, "wb") as arquivo:
+                arquivo.write(dados)
+            os.chmod(temporario, 0o600)
+            os.replace(temporario, self.caminho)
+            self.logger.info("Sessão autenticada salva em disco")
+            return True
+        except Exception as e:
+            self.logger.error(f"Erro ao salvar sessão: {e}")
+            return False
+
+    def carregar(self):
+        """Cookies da sessão salva, ou None se ausente, expirada, de outro usuário ou ilegível"""
+        if not self.disponivel or not os.path.exists(self.caminho):
+            return None
+        try:
+            with open(self.caminho, "rb") as arquivo:
+                dados = arquivo.read()
+            salt, token = dados[:self.TAMANHO_SALT], dados[self.TAMANHO_SALT:]
+            conteudo = json.loads(self._fernet(salt).decrypt(token))
+        except (InvalidToken, ValueError, OSError) as e:
+            self.logger.warning(f"Sessão salva ilegível, descartando: {e}")
+            self.descartar()
+            return None
+
+        if conteudo.get("usuario") != self.usuario:
+            self.logger.info("Sessão salva pertence a outro usuário; ignorando")
+            return None
+        if conteudo.get("expira_em", 0) <= time.time():
+            self.logger.info("Sessão salva expirada")
+            self.descartar()
+            return None
+
+        self.expira_em = conteudo["expira_em"]
+        self.logger.info(f"Sessão restaurada do disco (expira em {self.expira_em - time.time():.0f}s)")
+        return conteudo.get("cookies") or None
+
+    def descartar(self):
+        """Remover a sessão salva (ex.: rejeitada pelo servidor)"""
+        self.expira_em = None
+        try:
+            if os.path.exists(self.caminho):
+                os.remove(self.caminho)
+        except OSError as e:
+            self.logger.error(f"Erro ao remover sessão salva: {e}")
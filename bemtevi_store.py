@@ -0,0 +1,142 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+
+class StoreDocumentos:
+    """Armazenamento local persistente (SQLite) de documentos já obtidos
+
+    Cada documento é identificado por (numero_processo, tipo, doc_id) e guarda
+    o corpo comprimido com zlib, os validadores HTTP (ETag/Last-Modified) e o
+    momento da última validação. Um documento é considerado fresco por
+    `ttl` segundos; depois disso deve ser revalidado (GET condicional quando
+    há validadores, nova busca caso contrário). O arquivo sobrevive a
+    reinícios do servidor.
+    """
+
+    def __init__(self, caminho=None, ttl=None):
+        self.caminho = caminho or os.getenv(
+            "BEMTEVI_STORE_PATH", os.path.join(os.getcwd(), "cache", "bemtevi_store.sqlite3")
+        )
+        self.ttl = ttl if ttl is not None else float(os.getenv("BEMTEVI_STORE_TTL", "86400"))
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+
+        diretorio = os.path.dirname(self.caminho)
+        if diretorio and not os.path.exists(diretorio):
+            os.makedirs(diretorio)
+
+        self._conexao = sqlite3.connect(self.caminho, check_same_thread=False)
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.execute("PRAGMA synchronous=NORMAL")
+        self._conexao.execute("""
+            CREATE TABLE IF NOT EXISTS documentos (
+                numero_processo TEXT NOT NULL,
+                tipo TEXT NOT NULL,
+                doc_id TEXT NOT NULL,
+                corpo BLOB NOT NULL,
+                content_type TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                tamanho INTEGER NOT NULL,
+                obtido_em REAL NOT NULL,
+                validado_em REAL NOT NULL,
+                PRIMARY KEY (numero_processo, tipo, doc_id)
+            )
+        """)
+        self._conexao.commit()
+        self.logger.info(f"Store de documentos em {self.caminho}")
+
+    def obter(self, numero_processo, tipo, doc_id="todos"):
+        """Documento armazenado (corpo descomprimido + validadores), ou None"""
+        with self._lock:
+            linha = self._conexao.execute(
+                "SELECT corpo, content_type, etag, last_modified, obtido_em, validado_em "
+                "FROM documentos WHERE numero_processo = ? AND tipo = ? AND doc_id = ?",
+                (numero_processo, tipo, doc_id)
+            ).fetchone()
+        if not linha:
+            return None
+        corpo, content_type, etag, last_modified, obtido_em, validado_em = linha
+        return {
+            "corpo": zlib.decompress(corpo).decode("utf-8"),
+            "content_type": content_type,
+            "etag": etag,
+            "last_modified": last_modified,
+            "obtido_em": obtido_em,
+            "validado_em": validado_em,
+            "fresco": time.time() - validado_em < self.ttl,
+        }
+
+    def guardar(self, numero_processo, tipo, doc_id, corpo, content_type=None, etag=None, last_modified=None):
+        """Guardar (ou substituir) um documento"""
+        dados = corpo.encode("utf-8")
+        agora = time.time()
+        with self._lock:
+            self._conexao.execute(
+                "INSERT OR REPLACE INTO documentos "
+                "(numero_processo, tipo, doc_id, corpo, content_type, etag, last_modified, tamanho, obtido_em, validado_em) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (numero_processo, tipo, doc_id, zlib.compress(dados, 6), content_type,
+                 etag, last_modified, len(dados), agora, agora)
+            )
+            self._conexao.commit()
+
+    def revalidado(self, numero_processo, tipo, doc_id="todos"):
+        """Marcar documento como revalidado (ex.: resposta 304 Not Modified)"""
+        with self._lock:
+            self._conexao.execute(
+                "UPDATE documentos SET validado_em = ? WHERE numero_processo = ? AND tipo = ? AND doc_id = ?",
+                (time.time(), numero_processo, tipo, doc_id)
+            )
+            self._conexao.commit()
+
+    def invalidar(self, numero_processo=None, tipo=None):
+        """Remover documentos de um processo (opcionalmente de um tipo) ou todos"""
+        condicoes, parametros = [], []
+        if numero_processo:
+            condicoes.append("numero_processo = ?")
+            parametros.append(numero_processo)
+        if tipo:
+            condicoes.append("tipo = ?")
+            parametros.append(tipo)
+        sql = "DELETE FROM documentos"
+        if condicoes:
+            sql += " WHERE " + " AND ".join(condicoes)
+        with self._lock:
+            removidos = self._conexao.execute(sql, parametros).rowcount
+            self._conexao.commit()
+        return removidos
+
+    def status(self):
+        with self._lock:
+            total, tamanho, comprimido = self._conexao.execute(
+                "SELECT COUNT(*), COALESCE(SUM(tamanho), 0), COALESCE(SUM(LENGTH(corpo)), 0) FROM documentos"
+            ).fetchone()
+        return {
+            "documentos": total,
+            "bytes": tamanho,
+            "bytes_comprimidos": comprimido,
+            "ttl": self.ttl,
+            "caminho": self.caminho,
+        }
+
+    def fechar(self):
+        with self._lock:
+            self._conexao.close()
+
+
+_store_padrao = None
+_store_lock = threading.Lock()
+
+
+def store_padrao():
+    """Instância única do store, compartilhada por todos os clientes do processo"""
+    global _store_padrao
+    with _store_lock:
+        if _store_padrao is None:
+            _store_padrao = StoreDocumentos()
+        return _store_padrao
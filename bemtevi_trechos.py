@@ -0,0 +1,48 @@
+import os
+import re
+
+# Tamanho (em caracteres) de cada trecho endereçável por índice
+TAMANHO_TRECHO = int(os.getenv("BEMTEVI_TAMANHO_TRECHO", "50000"))
+
+# Separadores gerados ao concatenar vários AIRR (TipoDocumentoApi) e as partes do dossiê
+PADRAO_SECAO = re.compile(r"^=== (.+?) ===$", re.MULTILINE)
+
+
+def total_trechos(conteudo, tamanho_trecho=None):
+    tamanho_trecho = tamanho_trecho or TAMANHO_TRECHO
+    return max(1, -(-len(conteudo) // tamanho_trecho))
+
+
+def manifesto(conteudo, tamanho_trecho=None):
+    """Tamanho total, quantidade de trechos e seções (=== AIRR n ===) de um documento"""
+    tamanho_trecho = tamanho_trecho or TAMANHO_TRECHO
+    return {
+        "caracteres": len(conteudo),
+        "bytes": len(conteudo.encode("utf-8")),
+        "tamanho_trecho": tamanho_trecho,
+        "total_trechos": total_trechos(conteudo, tamanho_trecho),
+        "secoes": [
+            {"titulo": m.group(1), "inicio": m.start(), "trecho": m.start() // tamanho_trecho}
+            for m in PADRAO_SECAO.finditer(conteudo)
+        ],
+    }
+
+
+def recortar(conteudo, trecho=None, inicio=None, fim=None, tamanho_trecho=None):
+    """Parte do documento por índice de trecho ou intervalo de caracteres [inicio, fim)
+
+    Retorna (texto, inicio, fim). Sem trecho nem intervalo, o documento
+    inteiro. Lança ValueError para trecho ou intervalo fora do documento.
+    """
+    tamanho_trecho = tamanho_trecho or TAMANHO_TRECHO
+    if trecho is not None:
+        total = total_trechos(conteudo, tamanho_trecho)
+        if not 0 <= trecho < total:
+            raise ValueError(f"Trecho {trecho} inválido: o documento tem {total} trechos (0 a {total - 1})")
+        inicio = trecho * tamanho_trecho
+        fim = inicio + tamanho_trecho
+    inicio = 0 if inicio is None else inicio
+    fim = len(conteudo) if fim is None else min(fim, len(conteudo))
+    if inicio < 0 or inicio >= max(len(conteudo), 1) or fim <= inicio:
+        raise ValueError(f"Intervalo {inicio}–{fim} inválido: o documento tem {len(conteudo)} caracteres")
+    return conteudo[inicio:fim], inicio, fim
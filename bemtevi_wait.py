@@ -0,0 +1,217 @@
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from bemtevi_metricas import metricas
+
+
+def _ler_limites(valor):
+    """Converter 'etapa=segundos,etapa2=segundos' em dicionário de limites"""
+    limites = {}
+    for item in (valor or "").split(","):
+        if "=" not in item:
+            continue
+        etapa, segundos = item.split("=", 1)
+        try:
+            limites[etapa.strip()] = float(segundos)
+        except ValueError:
+            continue
+    return limites
+
+
+class EsperaPagina:
+    """Motor de espera orientado a eventos (substitui os time.sleep fixos)
+
+    Cada espera consulta um sinal concreto de prontidão (condição no DOM,
+    document.readyState, spinner ausente, rede ociosa via CDP) e termina assim
+    que ele é satisfeito, respeitando um limite superior configurável por etapa.
+    O tempo gasto em cada etapa fica registrado em `self.tempos`.
+    """
+
+    SCRIPT_SPINNER_AUSENTE = """
+        var el = document.querySelector(arguments[0]);
+        if (!el) { return true; }
+        var estilo = window.getComputedStyle(el);
+        return el.offsetParent === null || estilo.display === 'none' ||
+               estilo.visibility === 'hidden' || estilo.opacity === '0';
+    """
+
+    SCRIPT_TOTAL_RECURSOS = "return performance.getEntriesByType('resource').length;"
+
+    # Conexões que ficam abertas por natureza: nunca deixariam a rede "ociosa"
+    TIPOS_PERSISTENTES = ("WebSocket", "EventSource")
+
+    def __init__(self, driver, logger=None, espera_implicita=0):
+        self.driver = driver
+        self.logger = logger or logging.getLogger(__name__)
+        self.espera_implicita = espera_implicita
+        self.timeout_padrao = float(os.getenv("WAIT_TIMEOUT", "15"))
+        self.intervalo = float(os.getenv("WAIT_POLL_INTERVAL", "0.1"))
+        self.ocioso_ms = int(os.getenv("WAIT_NETWORK_IDLE_MS", "500"))
+        self.requisicao_longa_ms = int(os.getenv("WAIT_LONG_REQUEST_MS", "5000"))
+        self.seletor_spinner = os.getenv("WAIT_SPINNER_SELECTOR", "#spinner")
+        self.limites = _ler_limites(os.getenv("WAIT_LIMITES", ""))
+        self.tempos = {}
+        self._requisicoes_em_voo = {}  # requestId -> início (monotonic)
+        self._cdp_disponivel = True
+
+    def _limite(self, etapa, timeout):
+        """Resolver o limite superior de uma etapa (argumento > WAIT_LIMITES > padrão)"""
+        if timeout is not None:
+            return timeout
+        return self.limites.get(etapa, self.timeout_padrao)
+
+    def _registrar(self, etapa, duracao, ok):
+        """Registrar tempo gasto em uma etapa de espera"""
+        estatistica = self.tempos.setdefault(etapa, {
+            "chamadas": 0, "total": 0.0, "maximo": 0.0, "estouros": 0
+        })
+        estatistica["chamadas"] += 1
+        estatistica["total"] += duracao
+        estatistica["maximo"] = max(estatistica["maximo"], duracao)
+        metricas.observar("fase", f"espera.{etapa}", duracao)
+        if not ok:
+            estatistica["estouros"] += 1
+            self.logger.warning(f"Espera '{etapa}' atingiu o limite após {duracao:.2f}s")
+
+    @contextmanager
+    def sem_espera_implicita(self):
+        """Desligar temporariamente a espera implícita para sondagens rápidas"""
+        try:
+            self.driver.implicitly_wait(0)
+        except Exception:
+            pass
+        try:
+            yield
+        finally:
+            try:
+                self.driver.implicitly_wait(self.espera_implicita)
+            except Exception:
+                pass
+
+    def aguardar(self, condicao, etapa, timeout=None):
+        """Sondar `condicao(driver)` até ser verdadeira ou atingir o limite da etapa"""
+        limite = self._limite(etapa, timeout)
+        inicio = time.monotonic()
+        resultado = None
+        with self.sem_espera_implicita():
+            while True:
+                try:
+                    resultado = condicao(self.driver)
+                except Exception:
+                    resultado = None
+                if resultado or time.monotonic() - inicio >= limite:
+                    break
+                time.sleep(self.intervalo)
+        self._registrar(etapa, time.monotonic() - inicio, bool(resultado))
+        return resultado
+
+    def documento_pronto(self, etapa="documento_pronto", timeout=None):
+        """Aguardar document.readyState == 'complete'"""
+        return self.aguardar(
+            lambda d: d.execute_script("return document.readyState;") == "complete",
+            etapa, timeout
+        )
+
+    def spinner_ausente(self, etapa="spinner", timeout=None, seletor=None):
+        """Aguardar o spinner de carregamento sumir (ou não existir)"""
+        seletor = seletor or self.seletor_spinner
+        return self.aguardar(
+            lambda d: d.execute_script(self.SCRIPT_SPINNER_AUSENTE, seletor),
+            etapa, timeout
+        )
+
+    def elementos_presentes(self, by, valor, etapa="elementos", timeout=None):
+        """Aguardar ao menos um elemento do localizador e devolver a lista"""
+        return self.aguardar(lambda d: d.find_elements(by, valor), etapa, timeout) or []
+
+    def _consumir_eventos_rede(self):
+        """Atualizar o conjunto de requisições em voo a partir do log de performance (CDP)"""
+        for entrada in self.driver.get_log("performance"):
+            try:
+                mensagem = json.loads(entrada["message"])["message"]
+            except (KeyError, ValueError, TypeError):
+                continue
+            metodo = mensagem.get("method", "")
+            request_id = mensagem.get("params", {}).get("requestId")
+            if not request_id:
+                continue
+            if metodo == "Network.requestWillBeSent":
+                if mensagem["params"].get("type") not in self.TIPOS_PERSISTENTES:
+                    self._requisicoes_em_voo.setdefault(request_id, time.monotonic())
+            elif metodo in ("Network.loadingFinished", "Network.loadingFailed"):
+                self._requisicoes_em_voo.pop(request_id, None)
+
+    def _em_voo(self, agora):
+        """Requisições em voo que contam para a ociosidade
+
+        Abertas há mais de WAIT_LONG_REQUEST_MS são tratadas como long-poll
+        (ou conexão persistente) e deixam de segurar a espera.
+        """
+        limite = self.requisicao_longa_ms / 1000.0
+        return sum(1 for inicio in self._requisicoes_em_voo.values() if agora - inicio < limite)
+
+    def rede_ociosa(self, etapa="rede_ociosa", timeout=None):
+        """Aguardar a rede ficar ociosa por WAIT_NETWORK_IDLE_MS
+
+        Usa os eventos Network.* do CDP quando o log de performance está
+        habilitado, ignorando WebSocket/EventSource e requisições abertas há
+        mais de WAIT_LONG_REQUEST_MS (long-poll); caso contrário, considera
+        ociosa a página cujo total de recursos carregados (Resource Timing)
+        não muda durante a janela.
+        """
+        janela = self.ocioso_ms / 1000.0
+        estado = {"ultimo_valor": None, "desde": time.monotonic()}
+
+        def condicao(driver):
+            agora = time.monotonic()
+            if self._cdp_disponivel:
+                try:
+                    self._consumir_eventos_rede()
+                    valor = self._em_voo(agora)
+                    if valor:
+                        estado["desde"] = agora
+                        return False
+                    return agora - estado["desde"] >= janela
+                except Exception:
+                    self._cdp_disponivel = False
+                    self.logger.info("Log de performance indisponível; usando Resource Timing")
+            valor = driver.execute_script(self.SCRIPT_TOTAL_RECURSOS)
+            if valor != estado["ultimo_valor"]:
+                estado["ultimo_valor"] = valor
+                estado["desde"] = agora
+                return False
+            return agora - estado["desde"] >= janela
+
+        self._requisicoes_em_voo.clear()
+        return self.aguardar(condicao, etapa, timeout)
+
+    def pagina_pronta(self, etapa="pagina", timeout=None):
+        """Aguardar documento completo, spinner ausente e rede ociosa
+
+        O limite da etapa vale para as três esperas juntas: cada uma recebe
+        só o tempo que sobrou do prazo.
+        """
+        prazo = time.monotonic() + self._limite(etapa, timeout)
+
+        def restante():
+            return max(prazo - time.monotonic(), 0.0)
+
+        ok = self.documento_pronto(f"{etapa}.documento", restante())
+        ok = self.spinner_ausente(f"{etapa}.spinner", restante()) and ok
+        ok = self.rede_ociosa(f"{etapa}.rede", restante()) and ok
+        return bool(ok)
+
+    def resumo(self):
+        """Resumo dos tempos de espera por etapa (segundos)"""
+        return {
+            etapa: {
+                "chamadas": e["chamadas"],
+                "total": round(e["total"], 3),
+                "media": round(e["total"] / e["chamadas"], 3) if e["chamadas"] else 0.0,
+                "maximo": round(e["maximo"], 3),
+                "estouros": e["estouros"],
+            }
+            for etapa, e in self.tempos.items()
+        }
@@ -0,0 +1,105 @@
+"""Benchmark: extração da tabela de peças elemento a elemento vs. execute_script único
+
+Mede, para tabelas de vários tamanhos, quantos comandos WebDriver (idas e
+voltas HTTP ao chromedriver) e quanto tempo cada estratégia de
+extrair_informacoes_processo gasta.
+
+Uso:
+    python benchmarks/bench_extracao_dom.py --linhas 20 100 500 --repeticoes 5
+
+Requer Chrome e ChromeDriver (mesma configuração de BemTeviClient.iniciar_navegador).
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bemtevi_client import BemTeviClient
+
+
+def gerar_pagina(total_linhas):
+    """HTML com a mesma estrutura da página /report/processo/{numero}"""
+    linhas = []
+    for i in range(total_linhas):
+        linhas.append(
+            f"<tr><td>Petição {i:04d}</td><td>{(i % 28) + 1:02d}/03/2024</td>"
+            f"<td><a href='peca/{i}.html' target='_blank'>Documento {i}</a> conteúdo resumido da peça {i}</td></tr>"
+        )
+    return (
+        "<html><body><h2>Processo 0000001-56.2024.5.08.0111</h2>"
+        "<table><tr><th>Tipo</th><th>Data</th><th>Conteúdo</th></tr>"
+        + "".join(linhas)
+        + "</table></body></html>"
+    )
+
+
+class ContadorComandos:
+    """Conta os comandos enviados ao chromedriver envolvendo driver.execute"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.original = driver.execute
+        self.total = 0
+
+    def __enter__(self):
+        def execute(*args, **kwargs):
+            self.total += 1
+            return self.original(*args, **kwargs)
+        self.driver.execute = execute
+        return self
+
+    def __exit__(self, *exc):
+        self.driver.execute = self.original
+
+
+def medir(client, extrator, limite, repeticoes):
+    tempos = []
+    comandos = 0
+    total_pecas = 0
+    for _ in range(repeticoes):
+        with ContadorComandos(client.driver) as contador:
+            inicio = time.perf_counter()
+            _, pecas, _, _, _ = extrator(0, limite)
+            tempos.append((time.perf_counter() - inicio) * 1000)
+        comandos = contador.total
+        total_pecas = len(pecas)
+    return comandos, statistics.median(tempos), total_pecas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--linhas", type=int, nargs="+", default=[20, 100, 500])
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    client = BemTeviClient()
+    if not client.iniciar_navegador():
+        print("Não foi possível iniciar o navegador", file=sys.stderr)
+        return 1
+
+    try:
+        with tempfile.TemporaryDirectory() as diretorio:
+            print(f"{'linhas':>7} | {'estratégia':<12} | {'comandos':>9} | {'mediana ms':>10} | {'peças':>6}")
+            print("-" * 58)
+            for total in args.linhas:
+                caminho = os.path.join(diretorio, f"processo_{total}.html")
+                with open(caminho, "w", encoding="utf-8") as arquivo:
+                    arquivo.write(gerar_pagina(total))
+                client.driver.get(f"file://{caminho}")
+                client.espera.documento_pronto("bench.pagina")
+
+                for nome, extrator in (("legado", client._extrair_pecas_legado),
+                                       ("script", client._extrair_pecas_script)):
+                    comandos, mediana, pecas = medir(client, extrator, total, args.repeticoes)
+                    print(f"{total:>7} | {nome:<12} | {comandos:>9} | {mediana:>10.1f} | {pecas:>6}")
+    finally:
+        client.fechar_navegador()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""Benchmark: custo de inicialização do servidor MCP e das primeiras chamadas
+
+Cada repetição roda num interpretador novo (num diretório temporário) e mede:
+
+- import de bemtevi_mcp_server (o que o processo paga antes do handshake);
+- primeira chamada a list_tools e a primeira ferramenta (status_bemtevi);
+- quais módulos pesados (selenium, webdriver_manager, requests, httpx) já
+  estavam carregados depois disso;
+- o primeiro uso da pilha do navegador (import de selenium/webdriver_manager);
+- com --chromedriver, a resolução do ChromeDriver sem cache (WebDriver
+  Manager, rede) e com o cache em disco.
+
+Uso:
+    python benchmarks/bench_inicializacao.py --repeticoes 5
+    python benchmarks/bench_inicializacao.py --importtime   # 15 módulos mais caros no import
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULOS_PESADOS = ("selenium", "webdriver_manager", "requests", "httpx")
+
+SCRIPT_MEDICAO = """
+import asyncio, json, sys, time
+sys.path.insert(0, {raiz!r})
+medidas = {{}}
+
+inicio = time.perf_counter()
+import bemtevi_mcp_server as servidor
+medidas["import_servidor"] = time.perf_counter() - inicio
+
+inicio = time.perf_counter()
+asyncio.run(servidor.handle_list_tools())
+medidas["list_tools"] = time.perf_counter() - inicio
+medidas["carregados_list_tools"] = [m for m in {pesados!r} if m in sys.modules]
+
+inicio = time.perf_counter()
+asyncio.run(servidor.handle_call_tool("status_bemtevi", {{}}))
+medidas["primeira_ferramenta"] = time.perf_counter() - inicio
+medidas["carregados_ferramenta"] = [m for m in {pesados!r} if m in sys.modules]
+
+inicio = time.perf_counter()
+try:
+    import selenium.webdriver, webdriver_manager.chrome
+    medidas["import_navegador"] = time.perf_counter() - inicio
+except ImportError:
+    medidas["import_navegador"] = None
+
+if {chromedriver!r}:
+    from bemtevi_chromedriver import CacheChromeDriver
+    cache = CacheChromeDriver()
+    cache.descartar()
+    for rotulo in ("chromedriver_sem_cache", "chromedriver_com_cache"):
+        inicio = time.perf_counter()
+        cache.resolver()
+        medidas[rotulo] = time.perf_counter() - inicio
+
+servidor.auditoria.fechar()
+print(json.dumps(medidas))
+"""
+
+ROTULOS = (
+    ("import_servidor", "import bemtevi_mcp_server"),
+    ("list_tools", "primeiro list_tools"),
+    ("primeira_ferramenta", "primeira ferramenta (status_bemtevi)"),
+    ("import_navegador", "primeiro uso: import selenium + webdriver_manager"),
+    ("chromedriver_sem_cache", "resolver ChromeDriver (WebDriver Manager)"),
+    ("chromedriver_com_cache", "resolver ChromeDriver (cache em disco)"),
+)
+
+
+def executar_medicao(chromedriver):
+    script = SCRIPT_MEDICAO.format(raiz=RAIZ, pesados=MODULOS_PESADOS, chromedriver=chromedriver)
+    ambiente = dict(os.environ, BEMTEVI_AUDIT_STDERR="0")
+    ambiente.pop("CHROMEDRIVER_PATH", None)  # Medir a resolução, não o caminho fixo do container
+    with tempfile.TemporaryDirectory() as diretorio:
+        saida = subprocess.run(
+            [sys.executable, "-c", script], cwd=diretorio, env=ambiente,
+            capture_output=True, text=True, timeout=600,
+        )
+    if saida.returncode != 0:
+        raise RuntimeError(saida.stderr.strip().splitlines()[-1] if saida.stderr.strip() else "falha sem saída")
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+
+def imprimir_importtime(quantidade=15):
+    """Módulos com maior tempo cumulativo de import (python -X importtime)"""
+    with tempfile.TemporaryDirectory() as diretorio:
+        saida = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import sys; sys.path.insert(0, {RAIZ!r}); import bemtevi_mcp_server"],
+            cwd=diretorio, capture_output=True, text=True, timeout=300,
+        )
+    linhas = []
+    for linha in saida.stderr.splitlines():
+        m = re.match(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)", linha)
+        if m:
+            linhas.append((int(m.group(2)), len(m.group(3)), m.group(4)))
+    print(f"\n{'cumulativo ms':>13} | módulo")
+    print("-" * 50)
+    for cumulativo, nivel, modulo in sorted(linhas, reverse=True)[:quantidade]:
+        print(f"{cumulativo / 1000:>13.1f} | {modulo}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--chromedriver", action="store_true", help="Medir a resolução do ChromeDriver (usa a rede)")
+    parser.add_argument("--importtime", action="store_true", help="Listar os imports mais caros")
+    args = parser.parse_args()
+
+    resultados = [executar_medicao(args.chromedriver) for _ in range(args.repeticoes)]
+
+    print(f"{'etapa':<52} | {'mediana ms':>10} | {'mín ms':>8} | {'máx ms':>8}")
+    print("-" * 88)
+    for chave, rotulo in ROTULOS:
+        valores = [r[chave] * 1000 for r in resultados if r.get(chave) is not None]
+        if valores:
+            print(f"{rotulo:<52} | {statistics.median(valores):>10.1f} | {min(valores):>8.1f} | {max(valores):>8.1f}")
+    ultimo = resultados[-1]
+    print(f"\nMódulos pesados carregados após list_tools: {', '.join(ultimo['carregados_list_tools']) or 'nenhum'}")
+    print(f"Módulos pesados carregados após a primeira ferramenta: {', '.join(ultimo['carregados_ferramenta']) or 'nenhum'}")
+
+    if args.importtime:
+        imprimir_importtime()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
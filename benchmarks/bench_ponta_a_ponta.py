@@ -0,0 +1,300 @@
+"""Benchmark ponta a ponta: BemTeviClient e ferramentas MCP contra o BemTevi local
+
+Sobe benchmarks/servidor_local.py numa thread, aponta BEMTEVI_URL e
+BEMTEVI_SERVICOS_URL para ele e roda, num diretório temporário (store, índice,
+auditoria e sessão isolados):
+
+1. BemTeviClient direto: listagem, despacho, AIRR e download de peça pela
+   API (e, com --navegador, login, página do processo e peça via Selenium);
+2. handle_call_tool do servidor MCP, processo a processo, numa passada fria
+   (nada em cache) e numa quente (mesmos processos de novo);
+3. uma passada extra, sequencial e com tracemalloc, para o pico de memória
+   por ferramenta (fora das passadas de latência, que ficariam distorcidas).
+
+Reporta latência (p50/p95/máx), vazão (chamadas/s e MB/s de texto devolvido),
+memória e quantas requisições chegaram ao servidor em cada passada.
+
+Uso:
+    python benchmarks/bench_ponta_a_ponta.py --processos 10 --concorrencia 4 --latencia 0.05
+    python benchmarks/bench_ponta_a_ponta.py --navegador   # requer Chrome e ChromeDriver
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from servidor_local import adicionar_argumentos, config_dos_argumentos, iniciar_servidor
+
+USUARIO = SENHA = "benchmark"
+
+
+def numero_processo(prefixo, i):
+    return f"{prefixo}{i:06d}-56.2024.5.08.0111"
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    if not ordenados:
+        return 0.0
+    return ordenados[min(len(ordenados) - 1, int(p * len(ordenados)))]
+
+
+def roteiro_ferramentas(numero):
+    """Sequência de chamadas de um usuário analisando um processo"""
+    return [
+        ("consultar_processo_bemtevi", {"numero_processo": numero}),
+        ("listar_pecas_bemtevi", {"numero_processo": numero}),
+        ("acessar_peca_bemtevi", {"numero_processo": numero, "indice_peca": 0}),
+        ("acessar_despacho_admissibilidade_bemtevi", {"numero_processo": numero}),
+        ("acessar_airr_bemtevi", {"numero_processo": numero, "trecho": 0}),
+        ("manifesto_documento_bemtevi", {"numero_processo": numero, "documento": "airr"}),
+        ("analisar_airr_bemtevi", {"numero_processo": numero, "tipo_analise": "argumentos"}),
+        ("buscar_texto_bemtevi", {"consulta": "Súmula", "numero_processo": numero}),
+        ("acessar_dossie_bemtevi", {"numero_processo": numero, "trecho": 0}),
+    ]
+
+
+class Medicoes:
+    """Tempos, bytes devolvidos, erros e pico de memória por rótulo"""
+
+    def __init__(self):
+        self.tempos = defaultdict(list)
+        self.bytes = Counter()
+        self.erros = Counter()
+        self.memoria = {}
+
+    def registrar(self, rotulo, segundos, tamanho, erro):
+        self.tempos[rotulo].append(segundos)
+        self.bytes[rotulo] += tamanho
+        if erro:
+            self.erros[rotulo] += 1
+
+    def imprimir(self, titulo, duracao):
+        chamadas = sum(len(t) for t in self.tempos.values())
+        total_bytes = sum(self.bytes.values())
+        print(f"\n== {titulo}: {chamadas} chamadas em {duracao:.2f}s "
+              f"({chamadas / duracao:.1f} chamadas/s, {total_bytes / 1_000_000 / duracao:.2f} MB/s)")
+        print(f"{'operação':<42} | {'n':>4} | {'erros':>5} | {'p50 ms':>8} | {'p95 ms':>8} | "
+              f"{'máx ms':>8} | {'KB/chamada':>10} | {'pico MB':>7}")
+        print("-" * 112)
+        for rotulo, tempos in self.tempos.items():
+            memoria = self.memoria.get(rotulo)
+            print(f"{rotulo:<42} | {len(tempos):>4} | {self.erros[rotulo]:>5} | "
+                  f"{percentil(tempos, 0.50) * 1000:>8.1f} | {percentil(tempos, 0.95) * 1000:>8.1f} | "
+                  f"{max(tempos) * 1000:>8.1f} | {self.bytes[rotulo] / len(tempos) / 1000:>10.1f} | "
+                  f"{f'{memoria / 1_000_000:.1f}' if memoria is not None else '-':>7}")
+
+
+def imprimir_requisicoes(servidor, antes):
+    depois = Counter(servidor.requisicoes)
+    diferenca = {rota: total - antes.get(rota, 0) for rota, total in sorted(depois.items()) if total - antes.get(rota, 0)}
+    print("   requisições ao servidor: " + (", ".join(f"{rota}={total}" for rota, total in diferenca.items()) or "nenhuma"))
+    return depois
+
+
+def tamanho_resultado(resultado):
+    if isinstance(resultado, dict):
+        return len(resultado.get("conteudo_completo") or "")
+    return 0
+
+
+def medir_cliente(client, numeros, medicoes, navegador=None):
+    """BemTeviClient direto: caminhos HTTP (e Selenium, se houver navegador)"""
+    for numero in numeros:
+        inicio = time.perf_counter()
+        listagem = client.listar_pecas_api(numero)
+        medicoes.registrar("cliente.listar_pecas_api", time.perf_counter() - inicio, 0, not listagem)
+
+        for rotulo, metodo in (("cliente.acessar_despacho_admissibilidade", client.acessar_despacho_admissibilidade),
+                               ("cliente.acessar_airr", client.acessar_airr)):
+            inicio = time.perf_counter()
+            resultado = metodo(numero)
+            medicoes.registrar(rotulo, time.perf_counter() - inicio, tamanho_resultado(resultado), not resultado.get("sucesso"))
+
+        if listagem:
+            inicio = time.perf_counter()
+            resultado = client.baixar_peca(listagem["pecas"][0])
+            medicoes.registrar("cliente.baixar_peca", time.perf_counter() - inicio,
+                               tamanho_resultado(resultado), not resultado.get("sucesso"))
+
+        if navegador:
+            inicio = time.perf_counter()
+            processo = navegador.consultar_processo(numero)
+            medicoes.registrar("cliente.consultar_processo (navegador)", time.perf_counter() - inicio, 0, not processo)
+            if processo and processo["pecas"]:
+                inicio = time.perf_counter()
+                resultado = navegador.acessar_peca_por_href(processo["pecas"][0])
+                medicoes.registrar("cliente.acessar_peca_por_href (navegador)", time.perf_counter() - inicio,
+                                   tamanho_resultado(resultado), not resultado.get("sucesso"))
+
+
+async def chamar(servidor_mcp, medicoes, nome, argumentos, medir_memoria=False):
+    if medir_memoria:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+    inicio = time.perf_counter()
+    resposta = await servidor_mcp.handle_call_tool(nome, argumentos)
+    duracao = time.perf_counter() - inicio
+    texto = "".join(item.text for item in resposta)
+    medicoes.registrar(nome, duracao, len(texto.encode("utf-8")), texto.startswith("❌"))
+    if medir_memoria:
+        pico = tracemalloc.get_traced_memory()[1] - base
+        medicoes.memoria[nome] = max(medicoes.memoria.get(nome, 0), pico)
+
+
+async def passada_ferramentas(servidor_mcp, numeros, concorrencia, medicoes, medir_memoria=False):
+    """Cada processo percorre o roteiro em sequência; até `concorrencia` processos ao mesmo tempo"""
+    limite = asyncio.Semaphore(concorrencia)
+
+    async def processar(numero):
+        async with limite:
+            for nome, argumentos in roteiro_ferramentas(numero):
+                await chamar(servidor_mcp, medicoes, nome, argumentos, medir_memoria)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(processar(numero) for numero in numeros))
+    return time.perf_counter() - inicio
+
+
+def login_http(url):
+    """Cookies de sessão do servidor local sem navegador (mesmo formato do Selenium)"""
+    import requests
+    sessao = requests.Session()
+    sessao.post(f"{url}/login", data={"usuario": USUARIO, "senha": SENHA}, allow_redirects=False, timeout=10)
+    return [{"name": cookie.name, "value": cookie.value, "path": "/"} for cookie in sessao.cookies]
+
+
+async def conectar(servidor_mcp, url, usar_navegador, medicoes):
+    """Autenticar o servidor MCP: login Selenium completo ou sessão salva (só HTTP)"""
+    if usar_navegador:
+        await chamar(servidor_mcp, medicoes, "conectar_bemtevi", {"forcar_login": True})
+        return servidor_mcp.bemtevi_pool is not None
+
+    from bemtevi_pool import PoolBemTevi
+    cookies = login_http(url)
+    pool = PoolBemTevi()
+    if pool.sessao.salvar(cookies):
+        await chamar(servidor_mcp, medicoes, "conectar_bemtevi", {})
+    else:
+        # Sem cryptography a sessão não vai para o disco: autenticar o pool diretamente
+        pool.restaurar(cookies)
+        servidor_mcp.bemtevi_pool = pool
+    return servidor_mcp.bemtevi_pool is not None
+
+
+async def executar(args, servidor):
+    import bemtevi_mcp_server as servidor_mcp
+    from bemtevi_client import BemTeviClient
+    from bemtevi_metricas import metricas
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    conexao = Medicoes()
+    inicio = time.perf_counter()
+    if not await conectar(servidor_mcp, servidor.url, args.navegador, conexao):
+        print("Falha ao autenticar no servidor local", file=sys.stderr)
+        return 1
+    conexao.imprimir("conexão", time.perf_counter() - inicio)
+    requisicoes = imprimir_requisicoes(servidor, Counter())
+
+    # 1. Cliente direto (processos próprios, para não aproveitar o store das ferramentas)
+    cliente = servidor_mcp.bemtevi_pool.cliente_api()
+    navegador = None
+    if args.navegador:
+        navegador = BemTeviClient()
+        if not navegador.fazer_login():
+            print("Falha no login via navegador", file=sys.stderr)
+            navegador.fechar_navegador()
+            navegador = None
+    medicoes = Medicoes()
+    inicio = time.perf_counter()
+    medir_cliente(cliente, [numero_processo("9", i) for i in range(args.processos)], medicoes, navegador)
+    medicoes.imprimir("BemTeviClient", time.perf_counter() - inicio)
+    requisicoes = imprimir_requisicoes(servidor, requisicoes)
+    if navegador:
+        navegador.fechar_navegador()
+
+    # 2. Ferramentas MCP: passada fria e passada quente sobre os mesmos processos
+    numeros = [numero_processo("1", i) for i in range(args.processos)]
+    for titulo in ("ferramentas (frio)", "ferramentas (quente)"):
+        medicoes = Medicoes()
+        duracao = await passada_ferramentas(servidor_mcp, numeros, args.concorrencia, medicoes)
+        medicoes.imprimir(f"{titulo}, concorrência {args.concorrencia}", duracao)
+        requisicoes = imprimir_requisicoes(servidor, requisicoes)
+
+    # 3. Memória por ferramenta: processo novo, sequencial, com tracemalloc
+    if not args.sem_memoria:
+        medicoes = Medicoes()
+        tracemalloc.start()
+        try:
+            duracao = await passada_ferramentas(servidor_mcp, [numero_processo("5", 0)], 1, medicoes, medir_memoria=True)
+        finally:
+            tracemalloc.stop()
+        medicoes.imprimir("memória (1 processo, frio, com tracemalloc)", duracao)
+        imprimir_requisicoes(servidor, requisicoes)
+
+    print("\n== fases internas (bemtevi_metricas)")
+    for rotulo, resumo in metricas.resumo("fase").items():
+        print(f"   {rotulo:<28} n={resumo['chamadas']:<5} p50={resumo['p50'] * 1000:8.1f} ms  "
+              f"p95={resumo['p95'] * 1000:8.1f} ms  máx={resumo['maximo'] * 1000:8.1f} ms")
+
+    try:
+        import resource
+        print(f"\nRSS máximo do processo: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+    except ImportError:
+        pass
+
+    servidor_mcp.auditoria.fechar()
+    if servidor_mcp.bemtevi_pool:
+        cliente_api = servidor_mcp.bemtevi_pool.cliente_api()
+        if cliente_api and cliente_api.http:
+            await cliente_api.http.fechar()
+        servidor_mcp.bemtevi_pool.fechar()
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--processos", type=int, default=5, help="Processos distintos por passada")
+    parser.add_argument("--concorrencia", type=int, default=1, help="Processos atendidos ao mesmo tempo")
+    parser.add_argument("--navegador", action="store_true", help="Incluir login e navegação via Selenium")
+    parser.add_argument("--sem-memoria", action="store_true", help="Pular a passada com tracemalloc")
+    parser.add_argument("--limitar", action="store_true", help="Manter o limite de taxa por host (BEMTEVI_LIMITE_*)")
+    adicionar_argumentos(parser)
+    args = parser.parse_args()
+
+    servidor = iniciar_servidor(config_dos_argumentos(args, USUARIO, SENHA))
+    print(f"BemTevi local em {servidor.url} (latência {args.latencia}s, {args.pecas} peças/processo)")
+
+    # Configuração lida na importação dos módulos: definir antes de importar o servidor MCP
+    os.environ.update({
+        "BEMTEVI_URL": servidor.url,
+        "BEMTEVI_SERVICOS_URL": servidor.url,
+        "BEMTEVI_USERNAME": USUARIO,
+        "BEMTEVI_PASSWORD": SENHA,
+        "BEMTEVI_AUDIT_STDERR": "0",
+    })
+    if not args.limitar:
+        # Servidor local: medir o teto do cliente, não o limite de cortesia ao TST
+        os.environ.update({"BEMTEVI_LIMITE_API": "0", "BEMTEVI_LIMITE_NAVEGADOR": "0"})
+    diretorio_original = os.getcwd()
+    with tempfile.TemporaryDirectory() as diretorio:
+        os.chdir(diretorio)  # cache/, logs/ e sessão do benchmark ficam isolados
+        try:
+            return asyncio.run(executar(args, servidor))
+        finally:
+            os.chdir(diretorio_original)
+            servidor.shutdown()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,339 @@
+"""Servidor local que imita o BemTevi e a API btv-servicos, para benchmarks offline
+
+Atende, num único endereço, as rotas usadas por BemTeviClient:
+
+    /                                   login (campos, spinner, botão Entrar) ou tela inicial
+    POST /login                         autentica e devolve o cookie de sessão
+    /report/processo/{n}                página do processo com a tabela de peças
+    /peca/{n}/{i}                       documento HTML de uma peça
+    /pecas/api/v1/processos/{n}/pecas                   listagem JSON
+    /pecas/api/v1/processos/{n}/decisoes-admissao/todos despacho de admissibilidade
+    /pecas/api/v1/processos/{n}/peticoesAIRR/todos      petições AIRR
+
+Latência, quantidade de peças e tamanho dos documentos são configuráveis; o
+conteúdo é determinístico por processo (mesma semente = mesmo texto, mesmo
+ETag). Para usar com o servidor MCP, aponte BEMTEVI_URL e
+BEMTEVI_SERVICOS_URL para o endereço impresso.
+
+Uso:
+    python benchmarks/servidor_local.py --porta 8765 --latencia 0.05 --pecas 200
+"""
+import argparse
+import hashlib
+import json
+import random
+import re
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+COOKIE_SESSAO = "JSESSIONID"
+
+PARAGRAFOS = [
+    "O reclamante interpõe agravo de instrumento em face da decisão que negou seguimento ao recurso de revista, "
+    "sustentando violação ao art. {a}, inciso {inc}, da CF e contrariedade à Súmula nº {s} do TST.",
+    "Nos autos do processo {cnj}, publicado em {d}/{m}/20{y}, a condenação foi arbitrada em R$ {v}.000,00, "
+    "com custas de R$ {c},00 e depósito recursal comprovado.",
+    "A parte alega ofensa ao artigo {b}, § 1º, da CLT e indica divergência com a OJ {o} da SBDI-1, "
+    "mas não transcreve o trecho do acórdão regional que consubstancia o prequestionamento.",
+    "Ante o exposto, e considerando a transcendência prevista no art. 896-A da CLT, o recurso não merece "
+    "processamento, nos termos da fundamentação supra, em {d} de março de 20{y}.",
+    "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor incididunt ut labore "
+    "et dolore magna aliqua, quis nostrud exercitation ullamco laboris nisi ut aliquip ex ea commodo.",
+]
+
+TIPOS_PECA = ["Petição Inicial", "Contestação", "Sentença", "Recurso Ordinário", "Acórdão",
+              "Recurso de Revista", "Despacho", "Agravo de Instrumento", "Contrarrazões", "Certidão"]
+
+PAGINA_LOGIN = """<html><head><title>BemTevi - Login</title></head><body>
+<div id="spinner">Carregando...</div>
+<form method="post" action="/login">
+  <input type="text" name="usuario">
+  <input type="password" name="senha">
+  <input type="submit" id="button-login" value="Entrar">
+</form>
+<script>setTimeout(function () {{ var s = document.getElementById('spinner'); if (s) s.remove(); }}, {spinner_ms});</script>
+</body></html>"""
+
+PAGINA_INICIAL = """<html><head><title>BemTevi</title></head><body>
+<h2>BemTevi - 5ª Turma</h2><p>Servidor local de benchmark.</p>
+</body></html>"""
+
+
+class ConfigServidor:
+    """Parâmetros do servidor (latência em segundos, tamanhos em caracteres)"""
+
+    def __init__(self, latencia=0.0, jitter=0.0, pecas=50, tamanho_peca=20_000,
+                 tamanho_despacho=30_000, tamanho_airr=200_000, airr=2, spinner=0.0,
+                 usuario="", senha=""):
+        self.latencia = latencia
+        self.jitter = jitter
+        self.pecas = pecas
+        self.tamanho_peca = tamanho_peca
+        self.tamanho_despacho = tamanho_despacho
+        self.tamanho_airr = tamanho_airr
+        self.airr = airr
+        self.spinner = spinner
+        self.usuario = usuario
+        self.senha = senha
+
+
+@lru_cache(maxsize=256)
+def gerar_texto(semente, tamanho):
+    """Texto jurídico sintético com ~`tamanho` caracteres (determinístico pela semente)"""
+    aleatorio = random.Random(semente)
+    partes, total = [], 0
+    while total < tamanho:
+        paragrafo = aleatorio.choice(PARAGRAFOS).format(
+            a=aleatorio.randint(1, 250), inc=aleatorio.choice(["II", "XXXV", "LV"]),
+            s=aleatorio.choice([126, 221, 297, 333, 422]), b=aleatorio.randint(1, 922),
+            o=aleatorio.randint(1, 420), cnj=f"{aleatorio.randint(0, 9999999):07d}-56.2023.5.08.0111",
+            d=aleatorio.randint(1, 28), m=aleatorio.randint(1, 12), y=aleatorio.randint(10, 25),
+            v=aleatorio.randint(1, 999), c=aleatorio.randint(10, 999),
+        )
+        partes.append(paragrafo)
+        total += len(paragrafo) + 1
+    return "\n".join(partes)[:tamanho]
+
+
+class ServidorBemTeviLocal(ThreadingHTTPServer):
+    """HTTP server com a configuração, as sessões emitidas e a contagem de requisições"""
+
+    daemon_threads = True
+
+    def __init__(self, endereco, config):
+        super().__init__(endereco, ManipuladorBemTevi)
+        self.config = config
+        self.sessoes = set()
+        self.requisicoes = Counter()  # rota -> total
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, porta = self.server_address[:2]
+        return f"http://{host}:{porta}"
+
+    def contar(self, rota):
+        with self._lock:
+            self.requisicoes[rota] += 1
+
+    def nova_sessao(self):
+        token = secrets.token_hex(16)
+        with self._lock:
+            self.sessoes.add(token)
+        return token
+
+    def expirar_sessoes(self):
+        """Invalidar todas as sessões emitidas (simula sessão expirada no BemTevi)"""
+        with self._lock:
+            self.sessoes.clear()
+
+
+class ManipuladorBemTevi(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, como o servidor real
+
+    ROTA_PROCESSO = re.compile(r"^/report/processo/(?P<numero>[^/]+)$")
+    ROTA_PECA = re.compile(r"^/peca/(?P<numero>[^/]+)/(?P<indice>\d+)$")
+    ROTA_API = re.compile(r"^/pecas/api/v1/processos/(?P<numero>[^/]+)/(?P<recurso>.+)$")
+
+    def log_message(self, formato, *args):
+        pass  # Sem uma linha por requisição no stderr durante o benchmark
+
+    # ---- utilitários ----
+
+    def _atrasar(self):
+        config = self.server.config
+        atraso = config.latencia + (random.uniform(0, config.jitter) if config.jitter else 0.0)
+        if atraso > 0:
+            time.sleep(atraso)
+
+    def _autenticado(self):
+        cookies = self.headers.get("Cookie", "")
+        return any(
+            parte.strip().startswith(f"{COOKIE_SESSAO}=") and parte.strip().split("=", 1)[1] in self.server.sessoes
+            for parte in cookies.split(";")
+        )
+
+    def _responder(self, status, corpo, content_type="text/html; charset=utf-8", headers=None):
+        dados = corpo.encode("utf-8") if isinstance(corpo, str) else corpo
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(dados)))
+        for nome, valor in (headers or {}).items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(dados)
+
+    def _redirecionar(self, destino, headers=None):
+        self._responder(303, "", headers={"Location": destino, **(headers or {})})
+
+    def _responder_json(self, dados):
+        """JSON com ETag; If-None-Match igual ao ETag devolve 304 sem corpo"""
+        corpo = json.dumps(dados, ensure_ascii=False)
+        etag = '"' + hashlib.sha1(corpo.encode("utf-8")).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self._responder(200, corpo, "application/json; charset=utf-8", {"ETag": etag})
+
+    # ---- rotas ----
+
+    def do_GET(self):
+        self._atrasar()
+        caminho = urlsplit(self.path).path
+        config = self.server.config
+
+        if caminho in ("/", "/login"):
+            self.server.contar("login.pagina")
+            if caminho == "/" and self._autenticado():
+                return self._responder(200, PAGINA_INICIAL)
+            return self._responder(200, PAGINA_LOGIN.format(spinner_ms=int(config.spinner * 1000)))
+
+        m = self.ROTA_API.match(caminho)
+        if m:
+            return self._api(m.group("numero"), m.group("recurso"))
+
+        if not self._autenticado():
+            self.server.contar("nao_autenticado")
+            return self._redirecionar("/login")
+
+        m = self.ROTA_PROCESSO.match(caminho)
+        if m:
+            self.server.contar("processo.pagina")
+            return self._responder(200, self._pagina_processo(m.group("numero")))
+
+        m = self.ROTA_PECA.match(caminho)
+        if m:
+            indice = int(m.group("indice"))
+            if indice >= config.pecas:
+                return self._responder(404, "Peça não encontrada")
+            self.server.contar("peca.documento")
+            texto = gerar_texto(f"{m.group('numero')}|peca|{indice}", config.tamanho_peca)
+            paragrafos = "".join(f"<p>{escape(linha)}</p>" for linha in texto.split("\n"))
+            return self._responder(
+                200,
+                f"<html><head><title>Peça {indice}</title></head><body>"
+                f"<div class=\"cabecalho\">BemTevi</div><div class=\"documento\">{paragrafos}</div></body></html>"
+            )
+
+        self._responder(404, "Não encontrado")
+
+    def do_POST(self):
+        self._atrasar()
+        if urlsplit(self.path).path != "/login":
+            return self._responder(404, "Não encontrado")
+        self.server.contar("login.envio")
+        tamanho = int(self.headers.get("Content-Length") or 0)
+        campos = parse_qs(self.rfile.read(tamanho).decode("utf-8"))
+        usuario = (campos.get("usuario") or [""])[0]
+        senha = (campos.get("senha") or [""])[0]
+        config = self.server.config
+        if not usuario or not senha or (config.usuario and (usuario, senha) != (config.usuario, config.senha)):
+            return self._responder(200, PAGINA_LOGIN.format(spinner_ms=0))
+        token = self.server.nova_sessao()
+        self._redirecionar("/", {"Set-Cookie": f"{COOKIE_SESSAO}={token}; Path=/; HttpOnly"})
+
+    def _pagina_processo(self, numero):
+        config = self.server.config
+        linhas = []
+        for i in range(config.pecas):
+            tipo = TIPOS_PECA[i % len(TIPOS_PECA)]
+            linhas.append(
+                f"<tr><td>{tipo} {i:04d}</td><td>{(i % 28) + 1:02d}/{(i % 12) + 1:02d}/2024</td>"
+                f"<td><a href=\"/peca/{escape(numero)}/{i}\" target=\"_blank\">Documento {i}</a> "
+                f"{escape(tipo.lower())} juntado ao processo</td></tr>"
+            )
+        return (
+            f"<html><head><title>Processo {escape(numero)}</title></head><body>"
+            f"<h2>Processo {escape(numero)}</h2>"
+            "<table><tr><th>Tipo</th><th>Data</th><th>Conteúdo</th></tr>"
+            + "".join(linhas)
+            + "</table></body></html>"
+        )
+
+    def _api(self, numero, recurso):
+        if not self._autenticado():
+            self.server.contar("api.nao_autenticado")
+            return self._responder(401, '{"erro": "não autenticado"}', "application/json")
+        config = self.server.config
+        base = f"http://{self.headers.get('Host') or self.server.url.split('//', 1)[1]}"
+
+        if recurso == "pecas":
+            self.server.contar("api.listagem")
+            return self._responder_json([
+                {
+                    "tipo": f"{TIPOS_PECA[i % len(TIPOS_PECA)]} {i:04d}",
+                    "data": f"{(i % 28) + 1:02d}/{(i % 12) + 1:02d}/2024",
+                    "url": f"{base}/peca/{numero}/{i}",
+                }
+                for i in range(config.pecas)
+            ])
+        if recurso == "decisoes-admissao/todos":
+            self.server.contar("api.despacho")
+            return self._responder_json([{"texto": gerar_texto(f"{numero}|despacho", config.tamanho_despacho)}])
+        if recurso == "peticoesAIRR/todos":
+            self.server.contar("api.airr")
+            return self._responder_json([
+                {"texto": gerar_texto(f"{numero}|airr|{i}", config.tamanho_airr)} for i in range(config.airr)
+            ])
+        self._responder(404, '{"erro": "recurso desconhecido"}', "application/json")
+
+
+def iniciar_servidor(config=None, host="127.0.0.1", porta=0):
+    """Subir o servidor numa thread daemon; retorna a instância (url em `.url`)"""
+    servidor = ServidorBemTeviLocal((host, porta), config or ConfigServidor())
+    threading.Thread(target=servidor.serve_forever, name="bemtevi-local", daemon=True).start()
+    return servidor
+
+
+def adicionar_argumentos(parser):
+    """Opções de configuração do servidor (compartilhadas com o executor de benchmark)"""
+    parser.add_argument("--latencia", type=float, default=0.0, help="Atraso fixo por requisição (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Atraso adicional aleatório máximo (s)")
+    parser.add_argument("--pecas", type=int, default=50, help="Peças por processo")
+    parser.add_argument("--tamanho-peca", type=int, default=20_000, help="Caracteres por peça")
+    parser.add_argument("--tamanho-despacho", type=int, default=30_000, help="Caracteres do despacho")
+    parser.add_argument("--tamanho-airr", type=int, default=200_000, help="Caracteres por petição AIRR")
+    parser.add_argument("--airr", type=int, default=2, help="Petições AIRR por processo")
+    parser.add_argument("--spinner", type=float, default=0.0, help="Tempo até o spinner do login sumir (s)")
+
+
+def config_dos_argumentos(args, usuario="", senha=""):
+    return ConfigServidor(
+        latencia=args.latencia, jitter=args.jitter, pecas=args.pecas, tamanho_peca=args.tamanho_peca,
+        tamanho_despacho=args.tamanho_despacho, tamanho_airr=args.tamanho_airr, airr=args.airr,
+        spinner=args.spinner, usuario=usuario, senha=senha,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8765)
+    adicionar_argumentos(parser)
+    args = parser.parse_args()
+
+    servidor = ServidorBemTeviLocal((args.host, args.porta), config_dos_argumentos(args))
+    print(f"BemTevi local em {servidor.url}")
+    print(f"  BEMTEVI_URL={servidor.url} BEMTEVI_SERVICOS_URL={servidor.url}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())